@@ -3,18 +3,26 @@ import logging
 import time
 from functools import wraps
 from http import HTTPStatus
-from typing import Any, Callable, List, Literal, Optional, Tuple, Union, cast
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, Union, cast
 from pydantic import BaseModel, Extra, Field, HttpUrl, root_validator, validator
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import Body, FastAPI, Depends, HTTPException, Query
 from fastapi.responses import ORJSONResponse
 from fastapi.middleware.wsgi import WSGIMiddleware
 from itsdangerous import URLSafeTimedSerializer
 from loguru import logger
-from celery import Celery
-from redis import Redis
-from itsdangerous import URLSafeTimedSerializer
+from starlette.concurrency import run_in_threadpool
+
+from bettr.api import datasets, players
+from bettr.api.ratelimit import RateLimitMiddleware
+from bettr.config.settings import settings
+from bettr.core.security import (create_access_token, create_refresh_token, get_current_claims, identify_user,
+                                 revoke_refresh_tokens, revoke_token, rotate_refresh_token)
+from bettr.database.engine import pool_metrics
+from bettr.database.redis_client import close_redis, delete_many, get_redis, mget, mset, redis_pool_metrics
+from bettr.services.tasks import (add, ingest_player_game_logs_task, refresh_player_prop_aggregates_task,
+                                  sync_team_game_logs_task, task_status)
 
 
 class AppConfig(BaseModel):
@@ -57,23 +65,12 @@ class Dependency(object):
     def __init__(self, request: Request) -> None:
         self.request = request
 
-    async def authenticate(self) -> User:
-        if 'username' not in self.request.session:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED,
-                detail="Invalid authentication credentials"
-            )
-        username = self.request.session['username']
-        password = self.request.session['password']
-        user = authenticate_user(username, password)
-        if user is None:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED,
-                detail="Invalid authentication credentials"
-            )
-        return user
+    @staticmethod
+    async def authenticate(claims: Dict[str, Any] = Depends(get_current_claims)) -> User:
+        # The verified token is the proof of identity, the user store is not consulted per request
+        return User(username=claims['sub'], password='')
 
-    async def login(self, username: str, password: str) -> User:
+    async def login(self, username: str, password: str) -> Dict[str, str]:
         user = get_user(username)
         if user is None:
             raise HTTPException(
@@ -85,18 +82,25 @@ class Dependency(object):
                 status_code=HTTPStatus.UNAUTHORIZED,
                 detail="Invalid authentication credentials"
             )
-        self.request.session['username'] = username
-        self.request.session['password'] = password
-        return user
+        return {
+            "access_token": create_access_token(user.username),
+            "refresh_token": await create_refresh_token(user.username),
+            "token_type": "bearer",
+        }
+
+    async def refresh(self, refresh_token: str) -> Dict[str, str]:
+        access_token, refresh_token = await rotate_refresh_token(refresh_token)
+        return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
-    async def logout(self) -> None:
-        if 'username' in self.request.session:
-            del self.request.session['username']
-        if 'password' in self.request.session:
-            del self.request.session['password']
+    async def logout(self, claims: Dict[str, Any]) -> None:
+        await revoke_token(claims)
+        await revoke_refresh_tokens(claims['sub'])
 
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+if settings.LIMITER_ENABLED:
+    app.add_middleware(RateLimitMiddleware, identify=identify_user)
 
 # Loguru setup
 logger.remove()
@@ -114,65 +118,119 @@ async def add_process_time_header(request: Request, call_next):
 
 
 @app.get("/users/me")
-async def read_users_me(current_user: User = Depends(Dependency(Request).authenticate)):
+async def read_users_me(current_user: User = Depends(Dependency.authenticate)):
     return current_user
 
 
 @app.post("/users/login")
 async def login_for_access_token(request: Request, form_data: User):
-    user = await Dependency(request).login(form_data.username, form_data.password)
-    return {"username": user.username}
+    return await Dependency(request).login(form_data.username, form_data.password)
+
+
+@app.post("/users/refresh")
+async def refresh_access_token(request: Request, refresh_token: str = Body(..., embed=True)):
+    return await Dependency(request).refresh(refresh_token)
 
 
 @app.post("/users/logout")
-async def logout_for_access_token(request: Request):
-    await Dependency(request).logout()
+async def logout_for_access_token(request: Request, claims: Dict[str, Any] = Depends(get_current_claims)):
+    await Dependency(request).logout(claims)
     return {"message": "logout success"}
 
 
-# Celery setup
-celery = Celery("tasks", broker=config.CELERY_BROKER_URL)
+# Celery dispatch: publish and return the task id, workers do the work (see bettr.services.tasks)
+@app.get("/tasks/add")
+async def add_task(x: int, y: int):
+    result = await run_in_threadpool(add.delay, x, y)
+    return {"task_id": result.id}
 
 
-@celery.task
-def add(x: int, y: int) -> int:
-    return x + y
+@app.post("/tasks/ingest/player-game-logs", status_code=HTTPStatus.ACCEPTED)
+async def ingest_player_game_logs(seasons: List[str] = Query(...), season_type: str = 'Regular Season'):
+    result = await run_in_threadpool(ingest_player_game_logs_task.delay, seasons, season_type)
+    return {"task_id": result.id}
 
 
-@app.get("/tasks/add")
-async def add_task(x: int, y: int):
-    result = await asyncio.get_event_loop().run_in_executor(None, add, x, y)
-    return {"result": result}
+@app.post("/tasks/sync/team-game-logs", status_code=HTTPStatus.ACCEPTED)
+async def sync_team_game_logs(start_year: int = 2010, season_type: str = 'Regular Season'):
+    result = await run_in_threadpool(sync_team_game_logs_task.delay, start_year, season_type)
+    return {"task_id": result.id}
+
+
+@app.post("/tasks/refresh/prop-aggregates", status_code=HTTPStatus.ACCEPTED)
+async def refresh_prop_aggregates(game_ids: Optional[List[str]] = Query(None),
+                                  player_ids: Optional[List[int]] = Query(None)):
+    result = await run_in_threadpool(refresh_player_prop_aggregates_task.delay, game_ids, player_ids)
+    return {"task_id": result.id}
 
 
-# Redis setup
-redis = Redis.from_url(config.REDIS_URL)
 serializer = URLSafeTimedSerializer(config.SECRET_KEY)
 
 
+@app.on_event("shutdown")
+async def shutdown_redis() -> None:
+    await close_redis()
+
+
+@app.get("/tasks/cache")
+async def cache_items(items: List[str] = Query(...)):
+    values = await mget(items)
+    return {"items": {item: value for item, value in values.items() if value is not None},
+            "missing": [item for item, value in values.items() if value is None]}
+
+
+@app.put("/tasks/cache")
+async def set_items(items: Dict[str, str], ttl: Optional[int] = None):
+    await mset(items, ttl=ttl)
+    return {"items": items}
+
+
+@app.delete("/tasks/cache")
+async def delete_items(items: List[str] = Query(...)):
+    deleted = await delete_many(items)
+    return {"deleted": deleted}
+
+
 @app.get("/tasks/cache/{item}")
 async def cache_item(item: str):
-    result = redis.get(item)
+    result = await get_redis().get(item)
     if result is None:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail="Item not found in cache")
-    return {"item": item, "value": result.decode()}
+    return {"item": item, "value": result}
 
 
 @app.put("/tasks/cache/{item}")
 async def set_item(item: str, value: str):
-    redis.set(item, value)
+    await get_redis().set(item, value)
     return {"item": item, "value": value}
 
 
 @app.delete("/tasks/cache/{item}")
 async def delete_item(item: str):
-    result = redis.delete(item)
+    result = await get_redis().delete(item)
     if result == 0:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail="Item not found in cache")
     return {"item": item}
 
 
+@app.get("/tasks/{task_id}")
+async def get_task_status(task_id: str):
+    return await run_in_threadpool(task_status, task_id)
+
+
+@app.get("/metrics/redis")
+async def redis_metrics():
+    return redis_pool_metrics()
+
+
+@app.get("/metrics/db")
+async def db_metrics():
+    return pool_metrics()
+
+
 # Finalize and run the application
+app.include_router(players.router)
+app.include_router(datasets.router)
 app.include_router(api.router)
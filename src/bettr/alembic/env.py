@@ -6,6 +6,12 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
+from sqlmodel import SQLModel
+
+import bettr.models.nba  # noqa: F401 - registers the tables on SQLModel.metadata
+from bettr.config.settings import settings
+from bettr.config.urls import async_postgres_url
+from bettr.database.partitions import SEASON_PARTITIONED_TABLES
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -18,9 +24,30 @@ if config.config_file_name is not None:
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-target_metadata = None
+target_metadata = SQLModel.metadata
+
+# The placeholder url in alembic.ini is replaced by the app's settings, unless one is passed with -x url=...
+url = context.get_x_argument(as_dictionary=True).get('url') or async_postgres_url(
+    user=settings.POSTGRES_USER,
+    password=settings.POSTGRES_PASSWORD,
+    host=settings.POSTGRES_HOST,
+    port=settings.POSTGRES_PORT,
+    database=settings.POSTGRES_DB,
+)
+config.set_main_option("sqlalchemy.url", url.replace('%', '%%'))
+
+# Fail fast instead of queueing behind live traffic: a DDL lock waiting in line blocks every query behind it
+SERVER_SETTINGS = {
+    'lock_timeout': settings.POSTGRES_MIGRATION_LOCK_TIMEOUT,
+    'statement_timeout': settings.POSTGRES_MIGRATION_STATEMENT_TIMEOUT,
+}
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Keeps autogenerate from dropping the season partitions, which are not in the metadata."""
+    if type_ == 'table' and reflected and compare_to is None:
+        return not any(name.startswith(f"{table}_") for table in SEASON_PARTITIONED_TABLES)
+    return True
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -46,6 +73,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -53,7 +82,14 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # One transaction per revision, so a long migration does not hold its locks until the whole upgrade is done,
+    # and revisions can step out of it with op.get_context().autocommit_block() (see bettr.database.migrations)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        transaction_per_migration=True,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -69,6 +105,7 @@ async def run_async_migrations() -> None:
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        connect_args={'server_settings': SERVER_SETTINGS},
     )
 
     async with connectable.connect() as connection:
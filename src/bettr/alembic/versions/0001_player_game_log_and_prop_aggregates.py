@@ -0,0 +1,81 @@
+"""player game log and prop aggregates
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'player_game_log',
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.String(length=10), nullable=False),
+        sa.Column('season_year', sa.String(length=7), nullable=False),
+        sa.Column('season_type', sa.String(length=20), nullable=False),
+        sa.Column('player_name', sa.String(length=100), nullable=True),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('team_abbreviation', sa.String(length=3), nullable=True),
+        sa.Column('game_date', sa.Date(), nullable=False),
+        sa.Column('matchup', sa.String(length=20), nullable=True),
+        sa.Column('wl', sa.String(length=1), nullable=True),
+        sa.Column('min', sa.Float(), nullable=True),
+        sa.Column('fgm', sa.Integer(), nullable=True),
+        sa.Column('fga', sa.Integer(), nullable=True),
+        sa.Column('fg_pct', sa.Float(), nullable=True),
+        sa.Column('fg3m', sa.Integer(), nullable=True),
+        sa.Column('fg3a', sa.Integer(), nullable=True),
+        sa.Column('fg3_pct', sa.Float(), nullable=True),
+        sa.Column('ftm', sa.Integer(), nullable=True),
+        sa.Column('fta', sa.Integer(), nullable=True),
+        sa.Column('ft_pct', sa.Float(), nullable=True),
+        sa.Column('oreb', sa.Integer(), nullable=True),
+        sa.Column('dreb', sa.Integer(), nullable=True),
+        sa.Column('reb', sa.Integer(), nullable=True),
+        sa.Column('ast', sa.Integer(), nullable=True),
+        sa.Column('tov', sa.Integer(), nullable=True),
+        sa.Column('stl', sa.Integer(), nullable=True),
+        sa.Column('blk', sa.Integer(), nullable=True),
+        sa.Column('blka', sa.Integer(), nullable=True),
+        sa.Column('pf', sa.Integer(), nullable=True),
+        sa.Column('pfd', sa.Integer(), nullable=True),
+        sa.Column('pts', sa.Integer(), nullable=True),
+        sa.Column('plus_minus', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('player_id', 'game_id'),
+    )
+    # Serves the last-N-games window of the aggregate refresh and the game_id lookup of affected players
+    op.create_index('ix_player_game_log_player_id_game_date', 'player_game_log',
+                    ['player_id', sa.text('game_date DESC')])
+    op.create_index('ix_player_game_log_game_id', 'player_game_log', ['game_id'])
+
+    op.create_table(
+        'player_prop_aggregate',
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('stat', sa.String(length=20), nullable=False),
+        sa.Column('window_size', sa.Integer(), nullable=False),
+        sa.Column('games', sa.Integer(), nullable=False),
+        sa.Column('average', sa.Float(), nullable=True),
+        sa.Column('stat_values', postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column('last_game_date', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('player_id', 'stat', 'window_size'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('player_prop_aggregate')
+    op.drop_index('ix_player_game_log_game_id', table_name='player_game_log')
+    op.drop_index('ix_player_game_log_player_id_game_date', table_name='player_game_log')
+    op.drop_table('player_game_log')
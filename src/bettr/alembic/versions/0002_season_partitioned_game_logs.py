@@ -0,0 +1,129 @@
+"""season partitioned game logs
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Box score columns shared by both game log tables, in endpoint order
+STAT_COLUMNS = [
+    ('min', sa.Float), ('fgm', sa.Integer), ('fga', sa.Integer), ('fg_pct', sa.Float), ('fg3m', sa.Integer),
+    ('fg3a', sa.Integer), ('fg3_pct', sa.Float), ('ftm', sa.Integer), ('fta', sa.Integer), ('ft_pct', sa.Float),
+    ('oreb', sa.Integer), ('dreb', sa.Integer), ('reb', sa.Integer), ('ast', sa.Integer), ('tov', sa.Integer),
+    ('stl', sa.Integer), ('blk', sa.Integer), ('blka', sa.Integer), ('pf', sa.Integer), ('pfd', sa.Integer),
+    ('pts', sa.Integer), ('plus_minus', sa.Integer),
+]
+
+PROP_INDEX_COLUMNS = ['game_id', 'pts', 'reb', 'ast', 'fg3m', 'stl', 'blk', 'tov']
+
+# Fixed so replaying the revision always emits the same schema: from the first season the game log endpoints cover
+# up to the season open when the revision was written. Later seasons are created at runtime by
+# bettr.database.partitions.ensure_season_partitions.
+SEASONS = [f"{year}-{str(year + 1)[-2:]}" for year in range(1996, 2027)]
+
+
+def _stat_columns() -> List[sa.Column]:
+    return [sa.Column(name, type_(), nullable=True) for name, type_ in STAT_COLUMNS]
+
+
+def _create_partitions(table: str, seasons: Sequence[str]) -> None:
+    for season in seasons:
+        op.execute(f"CREATE TABLE {table}_{season.replace('-', '_')} PARTITION OF {table} FOR VALUES IN ('{season}')")
+
+
+def upgrade() -> None:
+    # Move the unpartitioned table aside; its indexes go with it and are recreated on the parent below
+    op.drop_index('ix_player_game_log_game_id', table_name='player_game_log')
+    op.drop_index('ix_player_game_log_player_id_game_date', table_name='player_game_log')
+    op.execute('ALTER TABLE player_game_log RENAME TO player_game_log_unpartitioned')
+    op.execute('ALTER TABLE player_game_log_unpartitioned RENAME CONSTRAINT player_game_log_pkey '
+               'TO player_game_log_unpartitioned_pkey')
+
+    op.create_table(
+        'player_game_log',
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.String(length=10), nullable=False),
+        sa.Column('season_year', sa.String(length=7), nullable=False),
+        sa.Column('season_type', sa.String(length=20), nullable=False),
+        sa.Column('player_name', sa.String(length=100), nullable=True),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('team_abbreviation', sa.String(length=3), nullable=True),
+        sa.Column('game_date', sa.Date(), nullable=False),
+        sa.Column('matchup', sa.String(length=20), nullable=True),
+        sa.Column('wl', sa.String(length=1), nullable=True),
+        *_stat_columns(),
+        sa.PrimaryKeyConstraint('player_id', 'game_id', 'season_year'),
+        postgresql_partition_by='LIST (season_year)',
+    )
+    op.create_table(
+        'team_game_log',
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.String(length=10), nullable=False),
+        sa.Column('season_year', sa.String(length=7), nullable=False),
+        sa.Column('season_type', sa.String(length=20), nullable=False),
+        sa.Column('team_abbreviation', sa.String(length=3), nullable=True),
+        sa.Column('team_name', sa.String(length=50), nullable=True),
+        sa.Column('game_date', sa.Date(), nullable=False),
+        sa.Column('matchup', sa.String(length=20), nullable=True),
+        sa.Column('wl', sa.String(length=1), nullable=True),
+        *_stat_columns(),
+        sa.PrimaryKeyConstraint('team_id', 'game_id', 'season_year'),
+        postgresql_partition_by='LIST (season_year)',
+    )
+
+    _create_partitions('player_game_log', SEASONS)
+    _create_partitions('team_game_log', SEASONS)
+
+    # Indexes on a partitioned parent are created on every partition, existing and future
+    op.create_index('ix_player_game_log_player_id_game_date', 'player_game_log',
+                    ['player_id', sa.text('game_date DESC')], postgresql_include=PROP_INDEX_COLUMNS)
+    op.create_index('ix_player_game_log_team_id_game_date', 'player_game_log', ['team_id', sa.text('game_date DESC')])
+    op.create_index('ix_player_game_log_game_id', 'player_game_log', ['game_id'])
+    op.create_index('ix_player_game_log_game_date_brin', 'player_game_log', ['game_date'], postgresql_using='brin')
+    op.create_index('ix_team_game_log_team_id_game_date', 'team_game_log', ['team_id', sa.text('game_date DESC')],
+                    postgresql_include=['game_id', 'wl', 'pts', 'plus_minus'])
+    op.create_index('ix_team_game_log_game_id', 'team_game_log', ['game_id'])
+    op.create_index('ix_team_game_log_game_date_brin', 'team_game_log', ['game_date'], postgresql_using='brin')
+
+    # A row outside SEASONS has no partition and fails the insert, rolling the revision back
+    op.execute('INSERT INTO player_game_log SELECT * FROM player_game_log_unpartitioned')
+    op.drop_table('player_game_log_unpartitioned')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE player_game_log RENAME TO player_game_log_partitioned')
+    op.create_table(
+        'player_game_log',
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.String(length=10), nullable=False),
+        sa.Column('season_year', sa.String(length=7), nullable=False),
+        sa.Column('season_type', sa.String(length=20), nullable=False),
+        sa.Column('player_name', sa.String(length=100), nullable=True),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('team_abbreviation', sa.String(length=3), nullable=True),
+        sa.Column('game_date', sa.Date(), nullable=False),
+        sa.Column('matchup', sa.String(length=20), nullable=True),
+        sa.Column('wl', sa.String(length=1), nullable=True),
+        *_stat_columns(),
+        sa.PrimaryKeyConstraint('player_id', 'game_id', name='player_game_log_unpartitioned_pkey'),
+    )
+    op.execute('INSERT INTO player_game_log SELECT * FROM player_game_log_partitioned')
+    # Dropping the parent drops its partitions and partitioned indexes, freeing the index names
+    op.drop_table('player_game_log_partitioned')
+    op.drop_table('team_game_log')
+    op.execute('ALTER TABLE player_game_log RENAME CONSTRAINT player_game_log_unpartitioned_pkey '
+               'TO player_game_log_pkey')
+    op.create_index('ix_player_game_log_player_id_game_date', 'player_game_log',
+                    ['player_id', sa.text('game_date DESC')])
+    op.create_index('ix_player_game_log_game_id', 'player_game_log', ['game_id'])
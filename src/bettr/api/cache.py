@@ -0,0 +1,353 @@
+"""Two-tier response cache for read endpoints: an in-process TTL LRU in front of Redis.
+
+Keys are built from the route name and its normalized parameters, so identical requests share an entry regardless of
+query parameter order. A miss is computed once: concurrent requests in the same process await the same future, and
+other processes wait on a short Redis lock for the first one to publish the result. Entries are tagged (e.g. with the
+player they describe) and ingestion invalidates by tag. The local tier only keeps entries for a few seconds, which
+bounds how long another worker can serve an entry that was invalidated in Redis. If Redis is unavailable, responses
+are computed without caching, like the rate limiter and revocation check fail open."""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import date, time as dt_time
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache, wraps
+from typing import (Annotated, Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple,
+                    Union, get_args, get_origin)
+from uuid import UUID
+
+from fastapi import BackgroundTasks, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.params import Depends
+from pydantic import BaseModel as PydanticModel
+from redis import Redis as SyncRedis
+from starlette.requests import HTTPConnection
+
+from bettr.config.settings import settings
+from bettr.database.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+_KEY_TYPES = (str, int, float, bool, type(None))
+
+Tags = Union[Sequence[str], Callable[..., Iterable[str]]]
+
+
+def player_tag(player_id: int) -> str:
+    """Returns the invalidation tag of everything cached about a player."""
+    return f"player:{int(player_id)}"
+
+
+def _key_value(name: str, value: Any) -> Any:
+    """Turns a handler parameter into a JSON encodable cache key component, refusing types it cannot key on."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, _KEY_TYPES):
+        return value
+    if isinstance(value, (date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_key_value(name, item) for item in value]
+    if isinstance(value, PydanticModel):
+        return value.model_dump(mode='json')
+    raise TypeError(f"Cannot build a cache key from parameter {name!r} of type {type(value).__name__}")
+
+
+def _is_dependency(parameter: inspect.Parameter) -> bool:
+    """Returns whether FastAPI injects a handler parameter rather than reading it from the request's values."""
+    if isinstance(parameter.default, Depends):
+        return True
+    annotation = parameter.annotation
+    if get_origin(annotation) is Annotated:
+        if any(isinstance(metadata, Depends) for metadata in get_args(annotation)[1:]):
+            return True
+        annotation = get_args(annotation)[0]
+    return isinstance(annotation, type) and issubclass(annotation, (HTTPConnection, Response, BackgroundTasks))
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sorted((_normalize(item) for item in value), key=repr)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def cache_key(route: str, params: Mapping[str, Any]) -> str:
+    """Builds a stable cache key from a route and its parameters.
+
+    Parameters whose value is None are dropped, so an omitted optional parameter and an explicit default share a key.
+    Sequences are sorted, so ?stats=pts&stats=reb and ?stats=reb&stats=pts do too.
+
+    Args:
+        route (str): The route name.
+        params (Mapping[str, Any]): The path and query parameters.
+
+    Returns:
+        str: The Redis key of the cached response.
+    """
+    normalized = {name: _normalize(value) for name, value in params.items() if value is not None}
+    digest = hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{settings.CACHE_REDIS_PREFIX}:{route}:{digest}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"{settings.CACHE_REDIS_PREFIX}:tag:{tag}"
+
+
+class LocalTTLCache:
+    """A bounded, least recently used in-process cache whose entries expire."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Returns (found, value)."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def set(self, key: str, value: Any, ttl: float, tags: Sequence[str] = ()) -> None:
+        self._entries[key] = (time.monotonic() + min(ttl, self.ttl), value, tuple(tags))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = set(tags)
+        stale = [key for key, (_, _, entry_tags) in self._entries.items() if tags.intersection(entry_tags)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class ResponseCache:
+    """The two cache tiers plus in-flight computations, shared by every cached route of the process."""
+
+    def __init__(self, local: Optional[LocalTTLCache] = None, lock_ttl: float = 10.0) -> None:
+        self.local = local or LocalTTLCache(settings.CACHE_LOCAL_MAXSIZE, settings.CACHE_LOCAL_TTL)
+        self.lock_ttl = lock_ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: int,
+                             tags: Sequence[str] = ()) -> Any:
+        """Returns the cached value of a key, computing and storing it on a miss.
+
+        Args:
+            key (str): The cache key.
+            compute (Callable[[], Awaitable[Any]]): Produces the value. Must return JSON encodable data.
+            ttl (int): The Redis expiry in seconds.
+            tags (Sequence[str]): The invalidation tags of the value.
+
+        Returns:
+            Any: The value.
+        """
+        found, value = self.local.get(key)
+        if found:
+            return value
+
+        # Single flight within the process: later callers await the first caller's computation
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, compute, ttl, tags)
+            self.local.set(key, value, ttl, tags)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Nobody else may be waiting; retrieve it so asyncio does not log it as never retrieved
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: int, tags: Sequence[str]) -> Any:
+        try:
+            redis = get_redis()
+            cached, locked = await self._read_or_lock(redis, key)
+        except Exception as error:
+            logger.warning(f"Response cache unavailable, computing {key} uncached: {error}")
+            return jsonable_encoder(await compute())
+        if cached is not None:
+            return json.loads(cached)
+
+        try:
+            value = jsonable_encoder(await compute())
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.set(key, json.dumps(value), ex=ttl)
+                    for tag in tags:
+                        pipe.sadd(_tag_key(tag), key)
+                        pipe.expire(_tag_key(tag), max(ttl, settings.CACHE_DEFAULT_TTL) * 2)
+                    await pipe.execute()
+            except Exception as error:
+                logger.warning(f"Could not store {key} in the response cache: {error}")
+            return value
+        finally:
+            if locked:
+                try:
+                    await redis.delete(f"{key}:lock")
+                except Exception as error:
+                    logger.warning(f"Could not release the response cache lock of {key}: {error}")
+
+    async def _read_or_lock(self, redis, key: str) -> Tuple[Optional[str], bool]:
+        """Returns the cached entry of a key, or takes the key's lock, waiting up to lock_ttl for another process
+        holding it. The lock is taken over once the wait runs out."""
+        cached = await redis.get(key)
+        if cached is not None:
+            return cached, False
+
+        # Single flight across processes: the lock holder computes, the others poll for its result
+        lock = f"{key}:lock"
+        deadline = time.monotonic() + self.lock_ttl
+        locked = await redis.set(lock, '1', nx=True, px=int(self.lock_ttl * 1000))
+        while not locked and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            cached = await redis.get(key)
+            if cached is not None:
+                return cached, False
+            locked = await redis.set(lock, '1', nx=True, px=int(self.lock_ttl * 1000))
+        return None, bool(locked)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Drops every entry carrying one of the tags, in Redis and in this process.
+
+        Args:
+            tags (Iterable[str]): The tags to invalidate.
+
+        Returns:
+            int: The number of Redis entries removed.
+        """
+        tags = list(tags)
+        if not tags:
+            return 0
+        self.local.invalidate_tags(tags)
+        redis = get_redis()
+        keys = set()
+        for tag in tags:
+            keys.update(await redis.smembers(_tag_key(tag)))
+        removed = await redis.delete(*keys) if keys else 0
+        await redis.delete(*(_tag_key(tag) for tag in tags))
+        return removed
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """Get the process wide response cache."""
+    return ResponseCache()
+
+
+def cached(ttl: Optional[int] = None, tags: Tags = (), name: Optional[str] = None) -> Callable:
+    """Caches the JSON result of an async route handler.
+
+    The key is built from the handler's path, query and body values; dependencies such as sessions and the request
+    are ignored. Dates, Enums, UUIDs and pydantic models are keyed by their JSON value, and a parameter of any other
+    type raises TypeError rather than being left out of the key. Apply it below the route decorator, so FastAPI
+    registers the cached handler.
+
+    Usage:
+        @router.get('/players/{player_id}/props')
+        @cached(ttl=300, tags=lambda player_id, **_: [player_tag(player_id)])
+        async def player_props(player_id: int, session: AsyncSession = Depends(get_session)): ...
+
+    Args:
+        ttl (int): The Redis expiry in seconds. Defaults to CACHE_DEFAULT_TTL.
+        tags (Tags): The invalidation tags, or a function of the handler's parameters returning them.
+        name (str): The route name in the key. Defaults to the handler's qualified name.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        route = name or f"{handler.__module__}.{handler.__qualname__}"
+        key_params = frozenset(parameter.name for parameter in inspect.signature(handler).parameters.values()
+                               if not _is_dependency(parameter))
+
+        @wraps(handler)
+        async def wrapper(**kwargs) -> Any:
+            params = {key: _key_value(key, value) for key, value in kwargs.items() if key in key_params}
+            entry_tags = list(tags(**kwargs) if callable(tags) else tags)
+            return await get_response_cache().get_or_compute(
+                cache_key(route, params), lambda: handler(**kwargs), ttl or settings.CACHE_DEFAULT_TTL, entry_tags)
+
+        return wrapper
+
+    return decorator
+
+
+@lru_cache()
+def _sync_redis() -> SyncRedis:
+    return SyncRedis(
+        host=settings.REDIS_HOST,
+        port=int(settings.REDIS_PORT),
+        db=int(settings.REDIS_DB),
+        password=settings.REDIS_PASSWORD or None,
+        socket_timeout=settings.REDIS_TIMEOUT,
+        decode_responses=True,
+    )
+
+
+def invalidate_tags_sync(tags: Iterable[str]) -> int:
+    """Drops every Redis entry carrying one of the tags, for synchronous callers such as ingestion jobs.
+
+    Other processes' local tiers expire within CACHE_LOCAL_TTL. Redis errors are logged rather than raised, so a cache
+    outage never fails an ingestion run.
+
+    Args:
+        tags (Iterable[str]): The tags to invalidate.
+
+    Returns:
+        int: The number of entries removed.
+    """
+    tags = list(tags)
+    if not tags:
+        return 0
+
+    redis = _sync_redis()
+    try:
+        with redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.smembers(_tag_key(tag))
+            keys: List[str] = [key for members in pipe.execute() for key in members]
+
+        with redis.pipeline(transaction=False) as pipe:
+            for start in range(0, len(keys), 1000):
+                pipe.delete(*keys[start:start + 1000])
+            pipe.delete(*(_tag_key(tag) for tag in tags))
+            removed = sum(pipe.execute()[:-1])
+    except Exception as error:
+        logger.warning(f"Could not invalidate cache tags {tags[:5]}...: {error}")
+        return 0
+
+    logger.info(f"Invalidated {removed} cached responses for {len(tags)} tags")
+    return removed
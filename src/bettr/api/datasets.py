@@ -0,0 +1,34 @@
+"""Bulk dataset endpoints, streamed as NDJSON or Arrow IPC (?format=arrow).
+
+These serve multi-season exports to notebooks and downstream jobs. Filters are pushed into SQL, and season filters
+prune the game log partitions, so only the requested seasons are scanned."""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Query
+
+from bettr.api.streaming import StreamFormat, stream_model
+from bettr.models.nba import PlayerGameLog, TeamGameLog
+
+
+router = APIRouter(prefix='/datasets', tags=['datasets'])
+
+
+def _filters(**values: Any) -> Dict[str, Any]:
+    return {name: value for name, value in values.items() if value}
+
+
+@router.get('/player-game-logs')
+async def player_game_logs(seasons: Optional[List[str]] = Query(None), season_type: Optional[str] = None,
+                           player_ids: Optional[List[int]] = Query(None), team_ids: Optional[List[int]] = Query(None),
+                           columns: Optional[List[str]] = Query(None), format: StreamFormat = 'ndjson'):
+    filters = _filters(season_year=seasons, season_type=season_type, player_id=player_ids, team_id=team_ids)
+    return stream_model(PlayerGameLog, format, columns=columns, filters=filters, filename='player_game_logs')
+
+
+@router.get('/team-game-logs')
+async def team_game_logs(seasons: Optional[List[str]] = Query(None), season_type: Optional[str] = None,
+                         team_ids: Optional[List[int]] = Query(None), columns: Optional[List[str]] = Query(None),
+                         format: StreamFormat = 'ndjson'):
+    filters = _filters(season_year=seasons, season_type=season_type, team_id=team_ids)
+    return stream_model(TeamGameLog, format, columns=columns, filters=filters, filename='team_game_logs')
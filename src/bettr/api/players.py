@@ -0,0 +1,77 @@
+"""Player read endpoints: recent game logs, prop averages and hit rates.
+
+Every route is served through the response cache and tagged with the player, so ingesting new games for a player
+invalidates exactly their entries. Sessions are opened inside the handlers rather than injected, so cache hits never
+check a connection out of the pool."""
+
+from http import HTTPStatus
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from sqlmodel import select
+
+from bettr.api.cache import cached, player_tag
+from bettr.database.engine import session_scope
+from bettr.models.nba import PlayerGameLog
+from bettr.services.player_props import PROP_STATS, PROP_WINDOWS, get_player_prop, get_player_props
+
+
+router = APIRouter(prefix='/players', tags=['players'])
+
+
+def _player_tags(player_id: int, **_) -> List[str]:
+    return [player_tag(player_id)]
+
+
+def _check_stat(stat: str) -> None:
+    if stat not in PROP_STATS:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f"Unknown stat {stat!r}")
+
+
+@router.get('/{player_id}/game-logs')
+@cached(ttl=300, tags=_player_tags)
+async def player_game_logs(player_id: int, season: Optional[str] = None, season_type: Optional[str] = None,
+                           limit: int = Query(20, gt=0, le=100)):
+    statement = select(PlayerGameLog).where(PlayerGameLog.player_id == player_id)
+    if season is not None:
+        statement = statement.where(PlayerGameLog.season_year == season)
+    if season_type is not None:
+        statement = statement.where(PlayerGameLog.season_type == season_type)
+    statement = statement.order_by(PlayerGameLog.game_date.desc()).limit(limit)
+
+    async with session_scope() as session:
+        result = await session.execute(statement)
+        return [game_log.model_dump() for game_log in result.scalars()]
+
+
+@router.get('/{player_id}/props')
+@cached(ttl=300, tags=_player_tags)
+async def player_props(player_id: int, stats: Optional[List[str]] = Query(None)):
+    async with session_scope() as session:
+        aggregates = await get_player_props(session, player_id, stats)
+    return [aggregate.model_dump() for aggregate in aggregates]
+
+
+@router.get('/{player_id}/props/{stat}')
+@cached(ttl=300, tags=_player_tags)
+async def player_prop_hit_rate(player_id: int, stat: str, line: float,
+                               window: int = Query(PROP_WINDOWS[1], gt=0)):
+    _check_stat(stat)
+    if window not in PROP_WINDOWS:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f"window must be one of {PROP_WINDOWS}")
+
+    async with session_scope() as session:
+        aggregate = await get_player_prop(session, player_id, stat, window)
+    if aggregate is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="No games for this player")
+
+    return {
+        'player_id': player_id,
+        'stat': stat,
+        'window': window,
+        'line': line,
+        'games': aggregate.games,
+        'average': aggregate.average,
+        'hit_rate': aggregate.hit_rate(line),
+        'values': aggregate.stat_values,
+    }
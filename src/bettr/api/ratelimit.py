@@ -0,0 +1,257 @@
+"""Redis backed sliding window rate limiting as ASGI middleware.
+
+Each client is identified (by IP by default, see identify and client_ip), matched to a rule by path prefix
+(LIMITER_ROUTE_LIMITS) and counted with the sliding window counter algorithm: the previous fixed window's count,
+weighted by how much of it still overlaps the sliding window, plus the current window's count. The check and the
+increment run atomically in one Lua script.
+
+Clients far below their limit are admitted from a local budget without a Redis round trip. Every Redis check grants
+the worker LIMITER_LOCAL_FRACTION of the remaining quota, and the requests admitted from it are flushed with the next
+check. Each worker can over-admit by at most that fraction, and only when the client is already close to the limit.
+Responses carry the RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset and RateLimit-Policy headers, and rejected
+requests get a 429 with Retry-After. If Redis is unavailable, requests are let through."""
+
+import inspect
+import ipaddress
+import logging
+import math
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from bettr.config.settings import settings
+from bettr.database.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+Identify = Callable[[Scope], Union[Optional[str], Awaitable[Optional[str]]]]
+
+# KEYS: current window, previous window. ARGV: limit, window ms, ms elapsed in the current window, cost.
+# A rejected call still records the cost - 1 requests admitted locally since the last check.
+# Returns {allowed, estimated count after this call}.
+SLIDING_WINDOW_LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local estimate = previous * (window - elapsed) / window + current
+if estimate + cost > limit then
+    if cost > 1 then
+        redis.call('INCRBY', KEYS[1], cost - 1)
+        redis.call('PEXPIRE', KEYS[1], window * 2)
+    end
+    return {0, math.floor(estimate + cost - 1)}
+end
+redis.call('INCRBY', KEYS[1], cost)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return {1, math.floor(estimate + cost)}
+"""
+
+
+@dataclass
+class RateLimitRule:
+    """A limit of requests per window of seconds."""
+
+    name: str
+    limit: int
+    window: int
+
+    @property
+    def policy(self) -> str:
+        return f"{self.limit};w={self.window}"
+
+
+@dataclass
+class _LocalBudget:
+    window_id: int
+    expires: float
+    allowance: int = 0
+    pending: int = 0
+    remaining: int = 0
+
+
+@lru_cache(maxsize=1)
+def _trusted_networks(proxies: Tuple[str, ...]) -> Tuple[Union[ipaddress.IPv4Network, ipaddress.IPv6Network], ...]:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_networks(tuple(settings.LIMITER_TRUSTED_PROXIES)))
+
+
+def client_ip(scope: Scope) -> Optional[str]:
+    """Returns the client address of a request.
+
+    That is the connecting peer, unless the peer is one of the LIMITER_TRUSTED_PROXIES. Then X-Forwarded-For is read
+    from the right, skipping trusted proxies, and the first other hop is the client. Hops further left were written by
+    the client itself and are ignored.
+    """
+    client = scope.get('client')
+    ip = client[0] if client else None
+    if ip is None or not _is_trusted(ip):
+        return ip
+
+    hops = [hop.strip()
+            for name, value in scope.get('headers', []) if name == b'x-forwarded-for'
+            for hop in value.decode('latin-1').split(',')]
+    for hop in reversed(hops):
+        if hop and not _is_trusted(hop):
+            return hop
+    return ip
+
+
+def identify(scope: Scope) -> Optional[str]:
+    """The default identify function: limits per client IP. Returning None skips limiting for the request."""
+    ip = client_ip(scope)
+    return f"ip:{ip}" if ip else None
+
+
+class RateLimitMiddleware:
+    """Rejects requests over their rule's limit and adds RateLimit-* headers to every limited response."""
+
+    def __init__(self, app: ASGIApp, identify: Identify = identify,
+                 rules: Optional[Dict[str, Tuple[int, int]]] = None, default: Optional[Tuple[int, int]] = None,
+                 exempt_paths: Optional[List[str]] = None, local_fraction: Optional[float] = None) -> None:
+        """Initializes the RateLimitMiddleware class.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            identify (Identify): Maps a request scope to a client key, sync or async. Defaults to the client IP.
+            rules (Dict[str, Tuple[int, int]]): Path prefix to (limit, window seconds). Defaults to
+                LIMITER_ROUTE_LIMITS.
+            default (Tuple[int, int]): The rule for every other path. Defaults to the LIMITER_DEFAULT_* settings.
+            exempt_paths (List[str]): Path prefixes that are never limited. Defaults to LIMITER_EXEMPT_PATHS.
+            local_fraction (float): See the module docstring. Defaults to LIMITER_LOCAL_FRACTION.
+        """
+        self.app = app
+        self.identify = identify
+        routes = settings.LIMITER_ROUTE_LIMITS if rules is None else rules
+        self.rules = sorted(
+            (RateLimitRule(prefix, limit, window) for prefix, (limit, window) in routes.items()),
+            key=lambda rule: len(rule.name), reverse=True,
+        )
+        limit, window = default or (settings.LIMITER_DEFAULT_LIMIT, settings.LIMITER_DEFAULT_WINDOW)
+        self.default = RateLimitRule('default', limit, window)
+        self.exempt_paths = tuple(settings.LIMITER_EXEMPT_PATHS if exempt_paths is None else exempt_paths)
+        self.local_fraction = settings.LIMITER_LOCAL_FRACTION if local_fraction is None else local_fraction
+        self._budgets: Dict[str, _LocalBudget] = {}
+        self._script = None
+
+    def rule_for(self, path: str) -> RateLimitRule:
+        for rule in self.rules:
+            if path.startswith(rule.name):
+                return rule
+        return self.default
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        client = self.identify(scope)
+        if inspect.isawaitable(client):
+            client = await client
+        if client is None:
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.rule_for(scope['path'])
+        allowed, remaining, reset = await self.hit(client, rule)
+        headers = [
+            (b'ratelimit-limit', str(rule.limit).encode()),
+            (b'ratelimit-remaining', str(max(remaining, 0)).encode()),
+            (b'ratelimit-reset', str(reset).encode()),
+            (b'ratelimit-policy', rule.policy.encode()),
+        ]
+
+        if not allowed:
+            body = orjson.dumps({'detail': 'Too many requests'})
+            await send({
+                'type': 'http.response.start',
+                'status': 429,
+                'headers': headers + [(b'retry-after', str(reset).encode()), (b'content-type', b'application/json'),
+                                      (b'content-length', str(len(body)).encode())],
+            })
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                message['headers'] = list(message.get('headers', [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    async def hit(self, client: str, rule: RateLimitRule) -> Tuple[bool, int, int]:
+        """Counts one request of a client against a rule.
+
+        Args:
+            client (str): The client key.
+            rule (RateLimitRule): The matched rule.
+
+        Returns:
+            Tuple[bool, int, int]: Whether the request is allowed, the remaining quota and the seconds until the
+                current window ends.
+        """
+        now = time.time()
+        window_id = int(now // rule.window)
+        reset = max(1, math.ceil((window_id + 1) * rule.window - now))
+
+        key = f"{rule.name}:{client}"
+        budget = self._budgets.get(key)
+        if budget is None or budget.window_id != window_id:
+            # Requests admitted locally in an earlier window are still flushed with the next check
+            budget = _LocalBudget(window_id, (window_id + 2) * rule.window, pending=budget.pending if budget else 0)
+            self._budgets[key] = budget
+
+        if budget.allowance > 0:
+            budget.allowance -= 1
+            budget.pending += 1
+            return True, budget.remaining - budget.pending, reset
+
+        try:
+            allowed, count = await self._check(client, rule, window_id, now, cost=budget.pending + 1)
+        except Exception as error:
+            logger.warning(f"Rate limiter unavailable, letting the request through: {error}")
+            return True, rule.limit, reset
+
+        # Either way the script recorded the requests admitted locally since the last check
+        budget.pending = 0
+        if not allowed:
+            return False, 0, reset
+
+        budget.remaining = rule.limit - count
+        budget.allowance = int(budget.remaining * self.local_fraction)
+        self._evict(now)
+        return True, budget.remaining, reset
+
+    async def _check(self, client: str, rule: RateLimitRule, window_id: int, now: float,
+                     cost: int) -> Tuple[bool, int]:
+        if self._script is None:
+            self._script = get_redis().register_script(SLIDING_WINDOW_LUA)
+
+        prefix = f"{settings.LIMITER_REDIS_PREFIX}:ratelimit:{rule.name}:{client}"
+        window_ms = rule.window * 1000
+        elapsed_ms = int(now * 1000) - window_id * window_ms
+        allowed, count = await self._script(
+            keys=[f"{prefix}:{window_id}", f"{prefix}:{window_id - 1}"],
+            args=[rule.limit, window_ms, elapsed_ms, cost],
+        )
+        return bool(allowed), int(count)
+
+    def _evict(self, now: float) -> None:
+        # Keeps the local budgets bounded by the clients active in the last couple of windows
+        if len(self._budgets) > 10_000:
+            self._budgets = {key: budget for key, budget in self._budgets.items()
+                             if budget.expires > now or budget.pending}
@@ -0,0 +1,147 @@
+"""Streaming responses for large result sets: NDJSON lines or an Arrow IPC stream.
+
+Rows are read through BaseModel.iter_frames, i.e. a server-side cursor, and each chunk is encoded and sent before the
+next one is fetched. Time to first byte and peak memory therefore depend on the chunk size, not on the result size.
+The generators are synchronous, so Starlette runs each step in its threadpool and the event loop never blocks on the
+database."""
+
+import io
+from datetime import date, datetime
+from http import HTTPStatus
+from typing import Any, Dict, Iterator, Literal, Optional, Sequence, Type
+
+import orjson
+import pandas as pd
+import pyarrow as pa
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement
+from starlette.responses import StreamingResponse
+
+from bettr.models.base import BaseModel, restore_dtypes
+
+
+StreamFormat = Literal['ndjson', 'arrow']
+
+MEDIA_TYPES: Dict[str, str] = {
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+STREAM_CHUNK_SIZE = 10_000
+
+# Matches the JSON responses: naive datetimes are UTC, numpy scalars are encoded natively, one record per line
+NDJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+
+_ARROW_TYPES = {
+    bool: pa.bool_(),
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+    date: pa.date32(),
+    datetime: pa.timestamp('us', tz='UTC'),
+    list: pa.list_(pa.float64()),
+}
+
+
+def arrow_schema(model: Type[BaseModel], columns: Optional[Sequence[str]] = None,
+                 sample: Optional[pd.DataFrame] = None) -> pa.Schema:
+    """Builds the Arrow schema of a model's columns.
+
+    The schema comes from the model rather than from the first chunk, so a chunk in which a column happens to be all
+    null cannot change the stream's types. Columns without a known Python type are inferred from the sample.
+
+    Args:
+        model (Type[BaseModel]): The model.
+        columns (Sequence[str]): The selected columns. Defaults to every column.
+        sample (pd.DataFrame): A chunk to infer the remaining types from.
+
+    Returns:
+        pa.Schema: The schema.
+    """
+    inferred = pa.Schema.from_pandas(sample, preserve_index=False) if sample is not None else None
+    fields = []
+    for name in columns or model.model_meta.columns:
+        arrow_type = _ARROW_TYPES.get(model.model_meta.dtypes.get(name))
+        if arrow_type is None:
+            arrow_type = inferred.field(name).type if inferred is not None else pa.string()
+        fields.append(pa.field(name, arrow_type, nullable=name in model.model_meta.nullable))
+    return pa.schema(fields)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def iter_ndjson(model: Type[BaseModel], frames: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Encodes DataFrame chunks as newline delimited JSON, one record per line.
+
+    Integer columns are restored to the model's types first, so a chunk with a null count still sends 5 rather than
+    5.0, and every value is encoded by orjson like the JSON responses.
+    """
+    for df in frames:
+        if df.empty:
+            continue
+        df = restore_dtypes(df, model.model_meta.dtypes)
+        records = df.astype(object).where(df.notna(), None).to_dict(orient='records')
+        yield b''.join(orjson.dumps(record, default=_json_default, option=NDJSON_OPTIONS) for record in records)
+
+
+def iter_arrow_ipc(model: Type[BaseModel], frames: Iterator[pd.DataFrame],
+                   columns: Optional[Sequence[str]] = None) -> Iterator[bytes]:
+    """Encodes DataFrame chunks as an Arrow IPC stream: the schema message, then one record batch per chunk."""
+    buffer = io.BytesIO()
+
+    def drain() -> bytes:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    first = next(frames, None)
+    schema = arrow_schema(model, columns, first)
+    with pa.ipc.new_stream(buffer, schema) as writer:
+        yield drain()
+        if first is not None:
+            writer.write_batch(pa.RecordBatch.from_pandas(first, schema=schema, preserve_index=False))
+            yield drain()
+        for df in frames:
+            writer.write_batch(pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False))
+            yield drain()
+    yield drain()
+
+
+def stream_model(model: Type[BaseModel], format: StreamFormat = 'ndjson', columns: Optional[Sequence[str]] = None,
+                 filters: Optional[Dict[str, Any]] = None, where: Optional[Sequence[ColumnElement]] = None,
+                 order_by: Optional[Sequence[str]] = None, chunk_size: int = STREAM_CHUNK_SIZE,
+                 filename: Optional[str] = None) -> StreamingResponse:
+    """Streams a model's matching rows as NDJSON or Arrow IPC.
+
+    Args:
+        model (Type[BaseModel]): The model to read.
+        format (StreamFormat): 'ndjson' or 'arrow'.
+        columns (Sequence[str]): The columns to read. Defaults to every column.
+        filters (Dict[str, Any]): Column filters, see BaseModel.iter_frames.
+        where (Sequence[ColumnElement]): Extra SQLAlchemy where expressions.
+        order_by (Sequence[str]): The columns to order by. Ordering forces a sort before the first row unless an
+            index provides it.
+        chunk_size (int): The number of rows fetched and sent at a time.
+        filename (str): If set, the response is sent as an attachment with this name.
+
+    Returns:
+        StreamingResponse: The response.
+    """
+    # Checked up front: once streaming has started, an error can no longer become a proper error response
+    unknown = sorted(set(columns or ()) - model.model_meta.column_set)
+    if unknown:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f"Unknown columns: {', '.join(unknown)}")
+
+    frames = model.iter_frames(columns, filters, where, order_by, chunk_size)
+    body = iter_arrow_ipc(model, frames, columns) if format == 'arrow' else iter_ndjson(model, frames)
+
+    headers = {}
+    if filename:
+        extension = 'arrows' if format == 'arrow' else 'ndjson'
+        headers['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers=headers)
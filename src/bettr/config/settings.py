@@ -2,7 +2,7 @@
 
 import os
 from functools import lru_cache
-from typing import Any, List, Literal, Union
+from typing import Any, Dict, List, Literal, Tuple, Union
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -49,6 +49,10 @@ class Settings(BaseSettings):
     POSTGRES_DB_POOL_SIZE: int = 10
     POSTGRES_DB_MAX_OVERFLOW: int = 10
     POSTGRES_DB_POOL_PRE_PING: bool = True
+    POSTGRES_DB_POOL_TIMEOUT: int = 30
+    POSTGRES_DB_POOL_RECYCLE: int = 60 * 30
+    POSTGRES_MIGRATION_LOCK_TIMEOUT: str = '5s'
+    POSTGRES_MIGRATION_STATEMENT_TIMEOUT: str = '0'
 
     # Supabase
     SUPABASE_DB_PASSWORD: str = os.getenv('SUPABASE_DB_PASSWORD', 'postgres')
@@ -69,9 +73,31 @@ class Settings(BaseSettings):
     REDIS_DB: Union[str, int] = os.getenv('REDIS_DB', 0)
     LIMITER_REDIS_PREFIX: str = 'bettr'
     LIMITER_ENABLED: bool = True
+    LIMITER_DEFAULT_LIMIT: int = 120
+    LIMITER_DEFAULT_WINDOW: int = 60
+    # Path prefix -> (limit, window seconds), the longest matching prefix wins
+    LIMITER_ROUTE_LIMITS: Dict[str, Tuple[int, int]] = {
+        '/datasets': (10, 60),
+        '/tasks/ingest': (5, 60),
+        '/tasks/sync': (5, 60),
+        '/tasks/refresh': (5, 60),
+    }
+    LIMITER_EXEMPT_PATHS: List[str] = ['/favicon.ico', '/metrics']
+    # Share of the remaining quota a worker may admit locally before checking in with Redis again
+    LIMITER_LOCAL_FRACTION: float = 0.1
+    # Addresses or networks of the reverse proxies whose X-Forwarded-For is trusted, e.g. ['10.0.0.0/8']
+    LIMITER_TRUSTED_PROXIES: List[str] = []
     REDIS_TIMEOUT: int = 5
+    REDIS_MAX_CONNECTIONS: int = 256
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
     LOG_TRACES: bool = True
 
+    # Response cache
+    CACHE_REDIS_PREFIX: str = 'bettr:cache'
+    CACHE_DEFAULT_TTL: int = 60
+    CACHE_LOCAL_TTL: int = 5
+    CACHE_LOCAL_MAXSIZE: int = 4096
+
     # Datetime
     DATETIME_FORMAT: str = "%Y-%m-%d %H:%M:%S"
     DATE_FORMAT: str = "%Y-%m-%d"
@@ -96,6 +122,8 @@ class Settings(BaseSettings):
     TOKEN_URL_SWAGGER: str = f'{API_V1_STR}/auth/swagger_login'
     TOKEN_REDIS_PREFIX: str = 'bettr'
     TOKEN_REDIS_REFRESH_PREFIX: str = 'bettr_refresh_token'
+    TOKEN_VERIFY_CACHE_SIZE: int = 10_000
+    TOKEN_REVOCATION_CACHE_SECONDS: int = 5
     TOKEN_EXCLUDE: List[str] = [
         f'{API_V1_STR}/auth/login',
     ]
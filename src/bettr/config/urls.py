@@ -1,40 +1,37 @@
-from getpass import getuser
 import os
-from pathlib import Path
+from getpass import getuser
 from typing import List, Optional
+from urllib.parse import quote_plus
 
 from dotenv import load_dotenv
-from pydantic import BaseSettings, Field
 
-from bettr.config.settings import Settings
 from bettr.utilities.paths import DATA_DIR
 
 load_dotenv()
 
 
-# def a postgres url function
-def sync_postgres_url(
-    user: str = getuser(),
-    fallback_hosts: Optional[List[str]] | None = None,
-    driver: str = 'psycopg2',
-    password: str = os.getenv.get('POSTGRES_PASSWORD'),
-    host: str = os.getenv.get('POSTGRES_HOST'),
-    port: str = os.getenv.get('POSTGRES_PORT'),
-    database: str = os.getenv.get('POSTGRES_DB'),
+def _postgres_url(
+    driver: str,
+    user: Optional[str],
+    password: Optional[str],
+    host: Optional[str],
+    port: Optional[str],
+    database: Optional[str],
+    fallback_hosts: Optional[List[str]],
     **kwargs,
 ) -> str:
-    """Returns a postgres url."""
-    url = f"postgresql+{driver}://{user}:{password}@{host}:{port}/{database}"
+    """Builds a postgres url, leaving out the parts that are not set."""
+    url = f"postgresql+{driver}://{quote_plus(user or getuser())}"
 
     if password is not None:
-        url += f":{password}"
+        url += f":{quote_plus(password)}"
 
-    url += f"@{host}"
+    url += f"@{host or 'localhost'}"
 
     if port is not None:
         url += f":{port}"
 
-    url += f"/{database}"
+    url += f"/{database or 'postgres'}"
     options = [f'host={host}' for host in fallback_hosts or []]
     options.extend(f'{key}={value}' for key, value in kwargs.items())
 
@@ -43,41 +40,58 @@ def sync_postgres_url(
     return url
 
 
+# def a postgres url function
+def sync_postgres_url(
+    user: Optional[str] = None,
+    fallback_hosts: Optional[List[str]] | None = None,
+    driver: str = 'psycopg2',
+    password: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[str] = None,
+    database: Optional[str] = None,
+    **kwargs,
+) -> str:
+    """Returns a postgres url. Unset parts default to the POSTGRES_* environment variables."""
+    return _postgres_url(
+        driver,
+        user or os.getenv('POSTGRES_USER'),
+        password or os.getenv('POSTGRES_PASSWORD'),
+        host or os.getenv('POSTGRES_HOST'),
+        port or os.getenv('POSTGRES_PORT'),
+        database or os.getenv('POSTGRES_DB'),
+        fallback_hosts,
+        **kwargs,
+    )
+
+
 # Define a sqlite url function
 def sqlite_url(dbfile: str = 'bettr.db') -> Optional[str]:
     """Returns a sqlite url."""
-    url = f"sqlite:///{DATA_DIR}/{dbfile}"
-    if os.path.exists(url):
-        return url
+    path = os.path.join(DATA_DIR, dbfile)
+    if os.path.exists(path):
+        return f"sqlite:///{path}"
     return None
 
 
 # Define an async postgres url function
 def async_postgres_url(
-    user: str = getuser(),
+    user: Optional[str] = None,
     fallback_hosts: Optional[List[str]] | None = None,
     driver: str = 'asyncpg',
-    password: str = os.getenv.get('POSTGRES_PASSWORD'),
-    host: str = os.getenv.get('POSTGRES_HOST'),
-    port: str = os.getenv.get('POSTGRES_PORT'),
-    database: str = os.getenv.get('POSTGRES_DB'),
+    password: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[str] = None,
+    database: Optional[str] = None,
     **kwargs,
 ) -> str:
-    """Returns an async postgres url."""
-    url = f"postgresql+{driver}://{user}:{password}@{host}:{port}/{database}"
-
-    if password is not None:
-        url += f":{password}"
-
-    url += f"@{host}"
-
-    if port is not None:
-        url += f":{port}"
-
-    url += f"/{database}"
-    options = [f'host={host}' for host in fallback_hosts or []]
-    options.extend(f'{key}={value}' for key, value in kwargs.items())
-
-    if len(options) > 0:
-        url += f"?{'&'.join(options)}"
-    return url
+    """Returns an async postgres url. Unset parts default to the POSTGRES_* environment variables."""
+    return _postgres_url(
+        driver,
+        user or os.getenv('POSTGRES_USER'),
+        password or os.getenv('POSTGRES_PASSWORD'),
+        host or os.getenv('POSTGRES_HOST'),
+        port or os.getenv('POSTGRES_PORT'),
+        database or os.getenv('POSTGRES_DB'),
+        fallback_hosts,
+        **kwargs,
+    )
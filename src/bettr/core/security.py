@@ -0,0 +1,301 @@
+"""Stateless JWT authentication: access and refresh tokens, cached verification and revocation.
+
+Access tokens are verified from their signature alone, so authenticating a request never touches the user store. A
+verified token's claims are kept in an in-process LRU until the token expires, so repeated requests with the same
+token skip the signature check. Revoked token ids (jti) live in a Redis sorted set scored by expiry. A token that was
+found not revoked is trusted locally for TOKEN_REVOCATION_CACHE_SECONDS, which bounds how long a logout takes to reach
+other workers. Refresh tokens are also registered in Redis, with a per-user set of their ids, so they can be rotated
+and revoked per user."""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from typing import Any, Dict, Literal, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+from starlette.types import Scope
+
+from bettr.api.ratelimit import identify as identify_client
+from bettr.config.settings import settings
+from bettr.database.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+TokenType = Literal['access', 'refresh']
+
+REVOKED_KEY = f"{settings.TOKEN_REDIS_PREFIX}:revoked_tokens"
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str = "Invalid authentication credentials") -> HTTPException:
+    return HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail=detail, headers={'WWW-Authenticate': 'Bearer'})
+
+
+class ExpiringLRU:
+    """A bounded LRU whose entries carry their own expiry time (epoch seconds)."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, expires: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+# Token -> verified claims, until the token expires
+_verified = ExpiringLRU(settings.TOKEN_VERIFY_CACHE_SIZE)
+# jti -> True (revoked, until the token expires) or False (not revoked, for TOKEN_REVOCATION_CACHE_SECONDS)
+_revocations = ExpiringLRU(settings.TOKEN_VERIFY_CACHE_SIZE)
+
+
+def _create_token(subject: str, token_type: TokenType, expires_minutes: int,
+                  claims: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    payload = {
+        **(claims or {}),
+        'sub': subject,
+        'type': token_type,
+        'jti': uuid.uuid4().hex,
+        'iat': int(now.timestamp()),
+        'exp': int((now + timedelta(minutes=expires_minutes)).timestamp()),
+    }
+    return jwt.encode(payload, settings.TOKEN_SECRET_KEY, algorithm=settings.TOKEN_ALGORITHM), payload
+
+
+def create_access_token(subject: str, claims: Optional[Dict[str, Any]] = None) -> str:
+    """Issues an access token for a user.
+
+    Args:
+        subject (str): The user, stored as the sub claim.
+        claims (Dict[str, Any]): Extra claims, e.g. roles.
+
+    Returns:
+        str: The encoded token.
+    """
+    token, _ = _create_token(subject, 'access', settings.ACCESS_TOKEN_EXPIRE_MINUTES, claims)
+    return token
+
+
+def _refresh_key(subject: str, jti: str) -> str:
+    return f"{settings.TOKEN_REDIS_REFRESH_PREFIX}:{subject}:{jti}"
+
+
+def _refresh_index_key(subject: str) -> str:
+    # The set of a user's refresh token ids. Listing them never pattern matches on the subject, which may contain
+    # glob characters
+    return f"{settings.TOKEN_REDIS_PREFIX}:refresh_tokens:{subject}"
+
+
+async def create_refresh_token(subject: str) -> str:
+    """Issues a refresh token for a user and registers it in Redis.
+
+    Args:
+        subject (str): The user, stored as the sub claim.
+
+    Returns:
+        str: The encoded token.
+    """
+    token, payload = _create_token(subject, 'refresh', settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.set(_refresh_key(subject, payload['jti']), '1', exat=payload['exp'])
+        pipe.sadd(_refresh_index_key(subject), payload['jti'])
+        # Every refresh token lives equally long, so the newest one outlives the others
+        pipe.expireat(_refresh_index_key(subject), payload['exp'])
+        await pipe.execute()
+    return token
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """Verifies a token's signature and expiry, serving repeated tokens from the verified LRU.
+
+    Args:
+        token (str): The encoded token.
+
+    Returns:
+        Dict[str, Any]: The claims.
+
+    Raises:
+        HTTPException: 401 if the token is malformed, forged or expired.
+    """
+    claims = _verified.get(token)
+    if claims is not None:
+        return claims
+
+    try:
+        claims = jwt.decode(token, settings.TOKEN_SECRET_KEY, algorithms=[settings.TOKEN_ALGORITHM],
+                            options={'require_exp': True, 'require_sub': True, 'require_jti': True})
+    except JWTError:
+        raise _unauthorized()
+    if not isinstance(claims['exp'], (int, float)):
+        raise _unauthorized()
+
+    _verified.set(token, claims, claims['exp'])
+    return claims
+
+
+async def is_revoked(claims: Dict[str, Any]) -> bool:
+    """Returns whether a token has been revoked, consulting Redis at most every TOKEN_REVOCATION_CACHE_SECONDS.
+
+    If Redis is unavailable the token is treated as not revoked, like the rate limiter and response cache do.
+    """
+    jti = claims['jti']
+    revoked = _revocations.get(jti)
+    if revoked is not None:
+        return revoked
+
+    try:
+        revoked = await get_redis().zscore(REVOKED_KEY, jti) is not None
+    except Exception as error:
+        logger.warning(f"Revocation list unavailable, accepting token: {error}")
+        return False
+
+    expires = claims['exp'] if revoked else min(claims['exp'], time.time() + settings.TOKEN_REVOCATION_CACHE_SECONDS)
+    _revocations.set(jti, revoked, expires)
+    return revoked
+
+
+async def verify_token(token: str, token_type: TokenType = 'access') -> Dict[str, Any]:
+    """Verifies a token and checks it against the revocation list.
+
+    Args:
+        token (str): The encoded token.
+        token_type (TokenType): The expected type.
+
+    Returns:
+        Dict[str, Any]: The claims.
+
+    Raises:
+        HTTPException: 401 if the token is invalid, of the wrong type or revoked.
+    """
+    claims = decode_token(token)
+    if claims.get('type') != token_type:
+        raise _unauthorized()
+    if await is_revoked(claims):
+        raise _unauthorized("Token has been revoked")
+    return claims
+
+
+async def revoke_token(claims: Dict[str, Any]) -> None:
+    """Revokes a token until it would have expired anyway.
+
+    Args:
+        claims (Dict[str, Any]): The verified claims of the token.
+    """
+    redis = get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.zadd(REVOKED_KEY, {claims['jti']: claims['exp']})
+        # Expired tokens fail verification on their own, so their ids no longer need to be listed
+        pipe.zremrangebyscore(REVOKED_KEY, '-inf', time.time())
+        await pipe.execute()
+    _revocations.set(claims['jti'], True, claims['exp'])
+
+
+async def revoke_refresh_tokens(subject: str) -> int:
+    """Revokes every refresh token of a user.
+
+    Args:
+        subject (str): The user.
+
+    Returns:
+        int: The number of refresh tokens revoked.
+    """
+    redis = get_redis()
+    # Reads and clears the set in one transaction, so a token issued meanwhile is either revoked or kept listed
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.smembers(_refresh_index_key(subject))
+        pipe.delete(_refresh_index_key(subject))
+        jtis, _ = await pipe.execute()
+    keys = [_refresh_key(subject, jti) for jti in jtis]
+    return await redis.delete(*keys) if keys else 0
+
+
+async def rotate_refresh_token(token: str) -> Tuple[str, str]:
+    """Exchanges a refresh token for a new access and refresh token pair. The old refresh token stops working.
+
+    Args:
+        token (str): The encoded refresh token.
+
+    Returns:
+        Tuple[str, str]: The new access token and refresh token.
+
+    Raises:
+        HTTPException: 401 if the refresh token is invalid, already used or revoked.
+    """
+    claims = decode_token(token)
+    if claims.get('type') != 'refresh':
+        raise _unauthorized()
+    # Deleting the registration is the atomic "use once" check
+    redis = get_redis()
+    if not await redis.delete(_refresh_key(claims['sub'], claims['jti'])):
+        raise _unauthorized("Refresh token has been revoked")
+    await redis.srem(_refresh_index_key(claims['sub']), claims['jti'])
+    _verified.discard(token)
+    return create_access_token(claims['sub']), await create_refresh_token(claims['sub'])
+
+
+async def get_current_claims(request: Request,
+                             credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)) -> Dict[str, Any]:
+    """FastAPI dependency that authenticates the request's bearer access token.
+
+    Usage:
+        @app.get('/users/me')
+        async def me(claims: Dict[str, Any] = Depends(get_current_claims)): ...
+    """
+    if credentials is None:
+        raise _unauthorized()
+    claims = await verify_token(credentials.credentials)
+    request.state.claims = claims
+    return claims
+
+
+def _bearer_token(scope: Scope) -> Optional[str]:
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            scheme, _, token = value.decode('latin-1').partition(' ')
+            return token.strip() if scheme.lower() == 'bearer' and token else None
+    return None
+
+
+def identify_user(scope: Scope) -> Optional[str]:
+    """Rate limiter identify function: the user of a valid bearer access token, otherwise the client IP.
+
+    Uses the verified claims cache, so identifying a returning client costs a dictionary lookup. Refresh tokens are
+    not accepted as an identity, as they are not accepted as credentials either.
+    """
+    token = _bearer_token(scope)
+    if token is not None:
+        try:
+            claims = decode_token(token)
+        except HTTPException:
+            claims = None
+        if claims is not None and claims.get('type') == 'access':
+            return f"user:{claims['sub']}"
+    return identify_client(scope)
@@ -0,0 +1,199 @@
+"""Persistent on-disk cache for nba_api endpoint responses.
+
+Responses are content addressed by the endpoint name plus its parameters and stored as gzip compressed JSON. Each
+entry carries its own TTL: closed seasons never expire, while the open season only lives for a short while. Setting
+BETTR_NBA_CACHE_OFFLINE=1 turns every cache miss into an error instead of a network call, so ingestion code can be
+run fully offline against a warm cache."""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from pandas import DataFrame
+
+from bettr.data.nba.seasons import is_closed_season
+from bettr.utilities.paths import DATA_DIR
+
+
+logger = logging.getLogger(__name__)
+
+# TTL for data that is still changing, e.g. the open season's game logs and rosters
+CURRENT_SEASON_TTL: int = 60 * 60
+
+# TTL for season independent reference data, e.g. team info
+STATIC_TTL: int = 60 * 60 * 24 * 7
+
+
+class CacheMissError(LookupError):
+    """Raised on a cache miss while the cache is in offline mode."""
+
+
+def season_ttl(season: Optional[str]) -> Optional[int]:
+    """
+    Returns the cache TTL for data belonging to a season.
+
+    Parameters:
+    season (str): The season string, e.g. '2010-11'. None for season independent data.
+
+    Returns:
+    Optional[int]: None (never expire) for closed seasons, otherwise a TTL in seconds.
+    """
+    if season is None:
+        return STATIC_TTL
+    return None if is_closed_season(season) else CURRENT_SEASON_TTL
+
+
+class ResponseCache:
+    """Content addressed, gzip compressed cache of raw endpoint responses."""
+
+    def __init__(self, cache_dir: Optional[str] = None, offline: Optional[bool] = None) -> None:
+        """Initializes the ResponseCache class.
+
+        Parameters:
+        cache_dir (str): The directory to store entries in. Defaults to DATA_DIR/nba/.cache.
+        offline (bool): Whether to raise CacheMissError instead of allowing network calls on a miss.
+            Defaults to the BETTR_NBA_CACHE_OFFLINE environment variable.
+        """
+        self.cache_dir = cache_dir or os.path.join(DATA_DIR, 'nba', '.cache')
+        if offline is None:
+            offline = os.getenv('BETTR_NBA_CACHE_OFFLINE', '0').lower() in ('1', 'true', 'yes')
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Returns the content address for an endpoint call."""
+        raw = json.dumps({'endpoint': endpoint, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[dict]:
+        """
+        Returns the cached response for an endpoint call, or None if it is missing or expired.
+
+        Parameters:
+        endpoint (str): The endpoint name.
+        params (Dict[str, Any]): The parameters the endpoint was called with.
+
+        Returns:
+        Optional[dict]: The raw endpoint response.
+        """
+        path = self._path(self.key(endpoint, params))
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            self._count(hit=False)
+            return None
+
+        if entry['expires'] is not None and entry['expires'] < time.time():
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        return entry['payload']
+
+    def set(self, endpoint: str, params: Dict[str, Any], payload: dict, ttl: Optional[int] = None) -> None:
+        """
+        Stores an endpoint response.
+
+        Parameters:
+        endpoint (str): The endpoint name.
+        params (Dict[str, Any]): The parameters the endpoint was called with.
+        payload (dict): The raw endpoint response.
+        ttl (int): Seconds until the entry expires. None never expires.
+        """
+        path = self._path(self.key(endpoint, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        now = time.time()
+        entry = {
+            'endpoint': endpoint,
+            'params': params,
+            'created': now,
+            'expires': None if ttl is None else now + ttl,
+            'payload': payload,
+        }
+
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, path)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit and miss counters."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """Get the shared response cache.
+
+    Returns:
+        ResponseCache: The process wide response cache.
+    """
+    return ResponseCache()
+
+
+def frames_from_payload(payload: dict) -> List[DataFrame]:
+    """
+    Builds DataFrames from a raw stats.nba.com response, mirroring Endpoint.get_data_frames.
+
+    Parameters:
+    payload (dict): The raw endpoint response.
+
+    Returns:
+    List[DataFrame]: One DataFrame per result set.
+    """
+    result_sets = payload.get('resultSets', payload.get('resultSet', []))
+    if isinstance(result_sets, dict):
+        result_sets = [result_sets]
+    return [pd.DataFrame(result_set['rowSet'], columns=result_set['headers']) for result_set in result_sets]
+
+
+def fetch_endpoint(endpoint_cls, ttl: Optional[int] = None, cache: Optional[ResponseCache] = None,
+                   refresh: bool = False, **params) -> List[DataFrame]:
+    """
+    Calls an nba_api endpoint through the response cache.
+
+    Parameters:
+    endpoint_cls: The nba_api endpoint class, e.g. TeamGameLogs.
+    ttl (int): Seconds until a freshly fetched response expires. None never expires.
+    cache (ResponseCache): The cache to use. Defaults to the shared cache.
+    refresh (bool): Whether to skip the cached entry and call the endpoint again. Defaults to False.
+    **params: The parameters to pass to the endpoint.
+
+    Returns:
+    List[DataFrame]: The endpoint's data frames.
+    """
+    cache = cache or get_response_cache()
+    endpoint = endpoint_cls.__name__
+
+    payload = None if refresh else cache.get(endpoint, params)
+    if payload is None:
+        if cache.offline:
+            raise CacheMissError(f"No cached {endpoint} response for {params}")
+        logger.debug(f"Cache miss for {endpoint} {params}, calling stats.nba.com")
+        payload = endpoint_cls(**params).get_dict()
+        cache.set(endpoint, params, payload, ttl=ttl)
+
+    return frames_from_payload(payload)
@@ -0,0 +1,327 @@
+"""Polite asyncio crawler for the Basketball Reference schedule pages.
+
+Basketball Reference splits each season's schedule into monthly pages (NBA_{year}_games-{month}.html) and bans clients
+that exceed its rate limit of 20 requests per minute. The crawler shares one keep-alive session, spaces requests with a
+token bucket, and keeps every raw page in a gzip compressed on-disk cache so that re-parsing never refetches. Only the
+schedule table is parsed, straight from the lxml tree."""
+
+import asyncio
+import gzip
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+import pandas as pd
+from lxml import html as lxml_html
+from pandas import DataFrame
+
+from bettr.data.nba.cache import CURRENT_SEASON_TTL
+from bettr.data.nba.seasons import is_closed_season
+from bettr.utilities.paths import DATA_DIR
+
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://www.basketball-reference.com"
+
+RAW_HTML_DIR: str = os.path.join(DATA_DIR, 'nba', 'bball_ref', 'raw')
+
+# Basketball Reference allows 20 requests per minute per client
+REQUESTS_PER_MINUTE: int = 20
+
+USER_AGENT = "bettr/0.1.0 (+https://github.com/ReAXET/bettr)"
+
+# Back off this long after a 429 without a usable Retry-After header
+DEFAULT_RETRY_AFTER: int = 60
+
+
+class TokenBucket:
+    """Asyncio token bucket that limits how often requests to a host can start."""
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        """Initializes the TokenBucket class.
+
+        Parameters:
+        rate (float): The number of tokens added per second.
+        capacity (int): The maximum number of tokens that can be saved up for a burst.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Holds back every waiting request for the given number of seconds, e.g. after a 429."""
+        self._tokens = min(self._tokens, -seconds * self.rate)
+        self._updated = time.monotonic()
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> float:
+    """
+    Returns the seconds to wait from a Retry-After header, which holds either seconds or an HTTP date.
+
+    Parameters:
+    value (str): The header value, None if the header is missing.
+    now (datetime): The time to measure an HTTP date from. Defaults to now.
+
+    Returns:
+    float: The seconds to wait, never negative. DEFAULT_RETRY_AFTER if the header is missing or malformed.
+    """
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+def season_label(year: int) -> str:
+    """Returns the season string for a Basketball Reference season year, e.g. 2011 -> '2010-11'."""
+    return f"{year - 1}-{str(year)[-2:]}"
+
+
+def parse_schedule_table(page: str) -> DataFrame:
+    """
+    Parses the schedule table of a Basketball Reference schedule page.
+
+    Columns are named after the cells' data-stat attributes. The date cell's csk attribute is kept as
+    bbref_game_id, which identifies the game across pages.
+
+    Parameters:
+    page (str): The raw html of the page.
+
+    Returns:
+    DataFrame: One row per scheduled game. Empty if the page has no schedule table.
+    """
+    tree = lxml_html.fromstring(page)
+    tables = tree.xpath('//table[@id="schedule"]')
+    if not tables:
+        return pd.DataFrame()
+
+    rows = []
+    for tr in tables[0].xpath('./tbody/tr[not(contains(@class, "thead"))]'):
+        row = {cell.get('data-stat'): cell.text_content().strip() for cell in tr.xpath('./th|./td')}
+        date_cell = tr.xpath('./th[@data-stat="date_game"]')
+        if date_cell:
+            row['bbref_game_id'] = date_cell[0].get('csk')
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def parse_month_links(page: str) -> List[str]:
+    """
+    Returns the absolute urls of the monthly schedule pages linked from a season's schedule page.
+
+    Parameters:
+    page (str): The raw html of the season's schedule page.
+
+    Returns:
+    List[str]: The month page urls, in the order they are listed.
+    """
+    tree = lxml_html.fromstring(page)
+    return [urljoin(BASE_URL, href) for href in tree.xpath('//div[contains(@class, "filter")]//a/@href')]
+
+
+class BballRefCrawler:
+    """Rate limited, caching crawler for Basketball Reference schedule pages."""
+
+    def __init__(self, requests_per_minute: int = REQUESTS_PER_MINUTE, cache_dir: Optional[str] = None,
+                 max_retries: int = 3) -> None:
+        """Initializes the BballRefCrawler class.
+
+        Parameters:
+        requests_per_minute (int): The maximum number of requests started per minute.
+        cache_dir (str): The directory to keep raw pages in. Defaults to RAW_HTML_DIR.
+        max_retries (int): How often to retry a page after a 429 or a connection error.
+        """
+        self.bucket = TokenBucket(rate=requests_per_minute / 60, capacity=1)
+        self.cache_dir = cache_dir or RAW_HTML_DIR
+        self.max_retries = max_retries
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'BballRefCrawler':
+        # A single connection per host, kept alive across every request
+        connector = aiohttp.TCPConnector(limit_per_host=1, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=60),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _cache_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, f"{url.rsplit('/', 1)[-1]}.gz")
+
+    def _read_cache(self, url: str, season: str) -> Optional[str]:
+        path = self._cache_path(url)
+        if not os.path.exists(path):
+            return None
+        if not is_closed_season(season) and os.path.getmtime(path) + CURRENT_SEASON_TTL < time.time():
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def _write_cache(self, url: str, page: str) -> None:
+        path = self._cache_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            f.write(page)
+        os.replace(tmp_path, path)
+
+    async def fetch(self, url: str, season: str) -> Optional[str]:
+        """
+        Returns the html of a page, from the on-disk cache when possible.
+
+        Parameters:
+        url (str): The page url.
+        season (str): The season the page belongs to. Pages of closed seasons are never refetched.
+
+        Returns:
+        Optional[str]: The page html, or None if the page does not exist.
+        """
+        page = self._read_cache(url, season)
+        if page is not None:
+            return page
+
+        if self._session is None:
+            raise RuntimeError("BballRefCrawler must be used as an async context manager")
+
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                async with self._session.get(url) as response:
+                    if response.status == 404:
+                        return None
+                    if response.status == 429 and attempt < self.max_retries:
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        logger.warning(f"Rate limited by Basketball Reference, backing off {retry_after:.0f}s")
+                        self.bucket.pause(retry_after)
+                        continue
+                    response.raise_for_status()
+                    page = await response.text()
+            except aiohttp.ClientConnectionError as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Connection error for {url}: {e}, retrying")
+                continue
+
+            self._write_cache(url, page)
+            return page
+        return None
+
+    async def crawl_season(self, year: int) -> DataFrame:
+        """
+        Crawls every monthly schedule page of a season.
+
+        Parameters:
+        year (int): The Basketball Reference season year, i.e. the year the season ends.
+
+        Returns:
+        DataFrame: The season's schedule, tagged with a 'season' column.
+        """
+        season = season_label(year)
+        index_url = f"{BASE_URL}/leagues/NBA_{year}_games.html"
+        index_page = await self.fetch(index_url, season)
+        if index_page is None:
+            return pd.DataFrame()
+
+        # The season page links every month page. Seasons without month pages have the whole schedule on it
+        month_urls = parse_month_links(index_page)
+        pages = await asyncio.gather(*(self.fetch(url, season) for url in month_urls)) if month_urls else [index_page]
+
+        frames = [parse_schedule_table(page) for page in pages if page is not None]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if 'bbref_game_id' in df.columns:
+            df = df.drop_duplicates('bbref_game_id', ignore_index=True)
+        df['season'] = season
+        logger.info(f"Crawled {len(df)} Basketball Reference games for {season} season")
+        return df
+
+    async def iter_seasons(self, years: Sequence[int]) -> AsyncIterator[Tuple[int, DataFrame]]:
+        """
+        Crawls the schedules of several seasons, yielding each one as soon as it is complete.
+
+        Seasons are crawled one after another, in the given order. Every request goes through the shared token bucket
+        anyway, so crawling seasons concurrently would not be faster and would only hold more pages in memory.
+
+        Parameters:
+        years (Sequence[int]): The Basketball Reference season years.
+
+        Yields:
+        Tuple[int, DataFrame]: The year and schedule of each season.
+        """
+        for year in years:
+            yield year, await self.crawl_season(year)
+
+    async def crawl(self, years: Sequence[int]) -> Dict[int, DataFrame]:
+        """
+        Crawls the schedules of several seasons through the shared rate limit.
+
+        Parameters:
+        years (Sequence[int]): The Basketball Reference season years.
+
+        Returns:
+        Dict[int, DataFrame]: The schedule of each season, keyed by year.
+        """
+        return {year: df async for year, df in self.iter_seasons(years)}
+
+
+async def iter_schedules(years: Sequence[int], **kwargs) -> AsyncIterator[Tuple[int, DataFrame]]:
+    """
+    Crawls the Basketball Reference schedules of several seasons, yielding each season as soon as it is complete.
+
+    Parameters:
+    years (Sequence[int]): The Basketball Reference season years, i.e. the years the seasons end.
+    **kwargs: Passed to BballRefCrawler.
+
+    Yields:
+    Tuple[int, DataFrame]: The year and schedule of each season.
+    """
+    async with BballRefCrawler(**kwargs) as crawler:
+        async for year, df in crawler.iter_seasons(years):
+            yield year, df
+
+
+async def crawl_schedules(years: Sequence[int], **kwargs) -> Dict[int, DataFrame]:
+    """
+    Crawls the Basketball Reference schedules of several seasons.
+
+    Parameters:
+    years (Sequence[int]): The Basketball Reference season years, i.e. the years the seasons end.
+    **kwargs: Passed to BballRefCrawler.
+
+    Returns:
+    Dict[int, DataFrame]: The schedule of each season, keyed by year.
+    """
+    async with BballRefCrawler(**kwargs) as crawler:
+        return await crawler.crawl(years)
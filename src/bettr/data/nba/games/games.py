@@ -1,8 +1,13 @@
 """Functions and helpers for retrieving NBA game data for each of the NBA seasons and Teams."""
 
+import asyncio
+import json
 import logging
 import os
-from typing import List, Optional, Tuple
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 import pandas as pd
@@ -17,56 +22,169 @@ from nba_api.stats.static import teams
 from nba_api.stats.library.parameters import SeasonAll
 
 
+from bettr.data.nba.cache import fetch_endpoint, season_ttl
+from bettr.data.nba.games.bball_ref import iter_schedules
+from bettr.data.nba.games.schema import apply_game_log_schema
+from bettr.data.nba.games.store import GAME_LOG_DATASET_DIR, write_game_logs
+from bettr.data.nba.games.watermarks import WatermarkStore
+from bettr.data.nba.seasons import current_season_start_year, get_seasons
 from bettr.utilities.paths import DATA_DIR
 
 
 logger = logging.getLogger(__name__)
 
 
-def fetch_nba_game_data(start_year=2010, end_year=None, league_id='', team_id='', season_type='Regular Season') -> DataFrame:
+SEASON_TYPES = ('Regular Season', 'Playoffs', 'PlayIn')
+
+
+class SeasonFetchError(RuntimeError):
+    """Raised when one or more season pulls fail and errors are not being ignored."""
+
+    def __init__(self, failures: Dict[Tuple[str, str], BaseException]) -> None:
+        self.failures = failures
+        failed = ', '.join(f"{season} ({season_type})" for season, season_type in failures)
+        super().__init__(f"Failed to pull game data for: {failed}")
+
+
+def _fetch_season_game_logs(season: str, season_type: str, league_id: str = '', team_id: str = '',
+                            date_from: Optional[str] = None) -> DataFrame:
     """
-    Fetches NBA game data for a range of seasons and compiles it into a DataFrame.
+    Pulls the team game logs for a single season and season type.
 
     Parameters:
-    start_year (int): The starting year for the data pull. Defaults to 2010.
-    end_year (int): The ending year for the data pull. Defaults to the current year.
+    season (str): The season to pull, e.g. '2010-11'.
+    season_type (str): The type of season to pull, e.g. 'Regular Season'.
     league_id (str): The league ID for the data pull. Defaults to NBA.
     team_id (str): The team ID for the data pull. Defaults to all teams.
-    season_type (str): The type of season for the data pull. Defaults to 'Regular Season'.
+    date_from (str): Only pull games on or after this date (YYYY-MM-DD). Defaults to the whole season.
 
     Returns:
-    DataFrame: A pandas DataFrame containing the game data for the specified seasons.
+    DataFrame: The game logs in the compact GAME_LOG_DTYPES schema, tagged with a SEASON_TYPE column.
+    """
+    logger.info(f"Pulling {season_type} game data for {season} season")
+    games_season = fetch_endpoint(
+        TeamGameLogs,
+        ttl=season_ttl(season),
+        league_id_nullable=league_id,
+        team_id_nullable=team_id,
+        season_nullable=season,
+        season_type_nullable=season_type,
+        date_from_nullable=datetime.strptime(date_from, '%Y-%m-%d').strftime('%m/%d/%Y') if date_from else '',
+    )[0]
+    games_season['SEASON_TYPE'] = season_type
+    return apply_game_log_schema(games_season)
+
+
+def iter_nba_game_data(start_year=2010, end_year=None, league_id='', team_id='', season_type='Regular Season',
+                       max_workers=1, failures=None) -> Iterator[DataFrame]:
+    """
+    Yields NBA game data one season and season type at a time.
+
+    With max_workers > 1 up to that many pulls run concurrently. Frames are always yielded in season order,
+    then in the order the season types were given, so the output does not depend on which request finishes first.
+
+    Parameters:
+    start_year (int): The starting year for the data pull. Defaults to 2010.
+    end_year (int): The ending year for the data pull. Defaults to the current year.
+    league_id (str): The league ID for the data pull. Defaults to NBA.
+    team_id (str): The team ID for the data pull. Defaults to all teams.
+    season_type (str | List[str]): The type(s) of season for the data pull, see SEASON_TYPES.
+        Defaults to 'Regular Season'.
+    max_workers (int): The number of season pulls to run at the same time. Defaults to 1.
+    failures (dict): When given, failed pulls are logged, recorded here keyed by (season, season_type) and
+        skipped. Otherwise the first failure raises a SeasonFetchError.
+
+    Yields:
+    DataFrame: The game data for one season and season type.
     """
 
     if end_year is None:
         end_year = datetime.now().year
 
-    # Create a list of all the NBA Seasons needed to be pulled
-    seasons_years = list(range(start_year, end_year + 1))
-    seasons = [f"{year}-{str(year + 1)[-2:]}" for year in seasons_years]
+    season_types = [season_type] if isinstance(season_type, str) else list(season_type)
+
+    # Create a list of all the (season, season type) pulls needed, in output order
+    pulls = [(season, stype) for season in get_seasons(start_year, end_year) for stype in season_types]
+
+    max_workers = max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Keep at most max_workers pulls in flight so finished frames are not held in memory for long
+        in_flight: Deque[Tuple[Tuple[str, str], Future]] = deque()
+        pending = iter(pulls)
+
+        for season, stype in islice(pending, max_workers):
+            in_flight.append(((season, stype), executor.submit(
+                _fetch_season_game_logs, season, stype, league_id, team_id)))
+
+        while in_flight:
+            pull, future = in_flight.popleft()
+            for season, stype in islice(pending, 1):
+                in_flight.append(((season, stype), executor.submit(
+                    _fetch_season_game_logs, season, stype, league_id, team_id)))
 
-    # Create an empty dataframe to store all the game data
-    games_df = pd.DataFrame()
+            try:
+                games_season = future.result()
+            except Exception as e:
+                if failures is None:
+                    raise SeasonFetchError({pull: e}) from e
+                logger.error(f"Failed to pull {pull[1]} game data for {pull[0]} season: {e}")
+                failures[pull] = e
+                continue
 
-    # Loop through each season and pull the game data
-    for season in seasons:
-        logger.info(f"Pulling game data for {season} season")
-        games_datapull = TeamGameLogs(
-            league_id_nullable=league_id,
-            team_id_nullable=team_id,
-            season_nullable=season,
-            season_type_nullable=season_type,
-        )
+            yield games_season
+
+
+def fetch_nba_game_data(start_year=2010, end_year=None, league_id='', team_id='', season_type='Regular Season',
+                        max_workers=1, raise_errors=True) -> DataFrame:
+    """
+    Fetches NBA game data for a range of seasons and compiles it into a DataFrame.
 
-        games_season = games_datapull.get_data_frames()[0]
-        games_df = pd.concat([games_df, games_season], ignore_index=True)
+    This is a convenience wrapper around iter_nba_game_data for callers that want a single frame.
+
+    Parameters:
+    start_year (int): The starting year for the data pull. Defaults to 2010.
+    end_year (int): The ending year for the data pull. Defaults to the current year.
+    league_id (str): The league ID for the data pull. Defaults to NBA.
+    team_id (str): The team ID for the data pull. Defaults to all teams.
+    season_type (str | List[str]): The type(s) of season for the data pull, see SEASON_TYPES.
+        Defaults to 'Regular Season'.
+    max_workers (int): The number of season pulls to run at the same time. Defaults to 1.
+    raise_errors (bool): Whether to raise a SeasonFetchError when any season fails. When False the
+        failures are logged and stored in the returned frame's attrs['failures']. Defaults to True.
+
+    Returns:
+    DataFrame: A pandas DataFrame containing the game data for the specified seasons.
+    """
+
+    failures: Dict[Tuple[str, str], BaseException] = {}
+    frames = list(iter_nba_game_data(
+        start_year=start_year,
+        end_year=end_year,
+        league_id=league_id,
+        team_id=team_id,
+        season_type=season_type,
+        max_workers=max_workers,
+        failures=failures,
+    ))
+
+    if failures and raise_errors:
+        raise SeasonFetchError(failures)
+
+    # Categories differ between seasons, so concat falls back to object columns until the schema is re-applied
+    games_df = apply_game_log_schema(pd.concat(frames, ignore_index=True)) if frames else pd.DataFrame()
+    games_df.attrs['failures'] = {pull: repr(e) for pull, e in failures.items()}
+    logger.info(f"Fetched {len(games_df)} game log rows using {games_df.memory_usage(deep=True).sum() / 2 ** 20:.1f} MiB")
 
     return games_df
 
 
-def create_nba_csv_files(start_year=2010, end_year=None, league_id='', team_id='', season_type='Regular Season'):
+def create_nba_csv_files(start_year=2010, end_year=None, league_id='', team_id='', season_type='Regular Season',
+                         max_workers=1):
     """
-    Creates CSV files for the NBA game data for a range of seasons.
+    Creates CSV files for the NBA game data for a range of seasons. Prefer create_nba_parquet_dataset, which
+    keeps the dtypes and supports partition pruning on read.
+
+    The game data is streamed one season and season type at a time, so only a single season is held in memory.
 
     Parameters:
     start_year (int): The starting year for the data pull. Defaults to 2010.
@@ -74,96 +192,301 @@ def create_nba_csv_files(start_year=2010, end_year=None, league_id='', team_id='
     league_id (str): The league ID for the data pull. Defaults to NBA.
     team_id (str): The team ID for the data pull. Defaults to all teams.
     season_type (str): The type of season for the data pull. Defaults to 'Regular Season'.
+    max_workers (int): The number of season pulls to run at the same time. Defaults to 1.
 
     Returns:
     None
     """
 
-    # Fetch the game data
-    games_df = fetch_nba_game_data(
+    # Create a directory to store the CSV files
+    csv_dir = os.path.join(DATA_DIR, 'nba', 'games')
+    os.makedirs(csv_dir, exist_ok=True)
+
+    # Write each chunk as it arrives, starting a fresh file the first time a season is seen
+    written = set()
+    for games_season in iter_nba_game_data(
         start_year=start_year,
         end_year=end_year,
         league_id=league_id,
         team_id=team_id,
         season_type=season_type,
-    )
+        max_workers=max_workers,
+    ):
+        for season, season_games_df in games_season.groupby('SEASON_YEAR', sort=False, observed=True):
+            logger.info(f"Writing CSV rows for {season} season")
+            season_games_df.to_csv(
+                os.path.join(csv_dir, f"{season}.csv"),
+                mode='a' if season in written else 'w',
+                header=season not in written,
+                index=False,
+            )
+            written.add(season)
+
+
+def create_nba_parquet_dataset(start_year=2010, end_year=None, league_id='', team_id='',
+                               season_type='Regular Season', max_workers=1, incremental=False, root=None):
+    """
+    Writes the NBA game data for a range of seasons into the season partitioned Parquet dataset.
 
-    # Create a list of all the NBA Seasons needed to be pulled
-    seasons_years = list(range(start_year + 1))
-    seasons = [f"{year}-{str(year + 1)[-2:]}" for year in seasons_years]
+    Each season and season type is written to its own partition as soon as it arrives, replacing any data
+    previously stored for it.
+
+    Parameters:
+    start_year (int): The starting year for the data pull. Defaults to 2010.
+    end_year (int): The ending year for the data pull. Defaults to the current year.
+    league_id (str): The league ID for the data pull. Defaults to NBA.
+    team_id (str): The team ID for the data pull. Defaults to all teams.
+    season_type (str | List[str]): The type(s) of season for the data pull. Defaults to 'Regular Season'.
+    max_workers (int): The number of season pulls to run at the same time. Defaults to 1.
+    incremental (bool): Whether to only append games newer than the stored watermarks, see
+        sync_nba_game_data. Defaults to False.
+    root (str): The dataset directory. Defaults to DATA_DIR/nba/games/parquet.
+
+    Returns:
+    None
+    """
+
+    if incremental:
+        sync_nba_game_data(start_year=start_year, league_id=league_id, season_type=season_type, root=root)
+        return
+
+    for games_season in iter_nba_game_data(
+        start_year=start_year,
+        end_year=end_year,
+        league_id=league_id,
+        team_id=team_id,
+        season_type=season_type,
+        max_workers=max_workers,
+    ):
+        write_game_logs(games_season, root=root)
 
-    # Create a directory to store the CSV files
-    csv_dir = os.path.join(DATA_DIR, 'nba', 'games')
-    if csv_dir is not None:
-        os.makedirs(csv_dir, exist_ok=True)
 
-    if not os.path.exists(csv_dir):
-        os.makedirs(csv_dir)
+def sync_nba_game_data(start_year=2010, league_id='', season_type='Regular Season', root=None,
+                       watermark_path=None) -> DataFrame:
+    """
+    Incrementally syncs NBA game data into the Parquet dataset using per-team high-water marks.
+
+    Closed seasons are pulled in full once and then frozen, so they are never requested again. The open
+    season is pulled from the oldest team watermark onwards, or in full while any team has no watermark yet,
+    and only rows past each team's watermark are appended, which keeps an in-season refresh to a single
+    request per season type. A full season pull replaces its partition instead of appending to it, so syncing
+    over a dataset written by create_nba_parquet_dataset does not duplicate its rows.
+
+    Parameters:
+    start_year (int): The starting year for the data pull. Defaults to 2010.
+    league_id (str): The league ID for the data pull. Defaults to NBA.
+    season_type (str | List[str]): The type(s) of season for the data pull. Defaults to 'Regular Season'.
+    root (str): The dataset directory. Defaults to DATA_DIR/nba/games/parquet.
+    watermark_path (str): The path of the watermark file. Defaults to root/_watermarks.json.
+
+    Returns:
+    DataFrame: The newly ingested rows.
+    """
 
-    # Loop through each season and create a CSV file
-    for season in seasons:
-        logger.info(f"Creating CSV file for {season} season")
-        season_games_df = games_df[games_df['SEASON_ID'] == season]
-        season_games_df.to_csv(os.path.join(
-            csv_dir, f"{season}.csv"), index=False)
+    root = root or GAME_LOG_DATASET_DIR
+    store = WatermarkStore(watermark_path or os.path.join(root, '_watermarks.json'))
+
+    season_types = [season_type] if isinstance(season_type, str) else list(season_type)
+    open_season = get_seasons(current_season_start_year(), current_season_start_year())[0]
+    # The static team list only covers the NBA, other leagues always pull the open season in full
+    team_ids = [str(team['id']) for team in teams.get_teams()] if league_id in ('', '00') else []
+
+    new_frames = []
+    for season in get_seasons(start_year, current_season_start_year()):
+        for stype in season_types:
+            if store.is_frozen(season, stype):
+                continue
+
+            is_open = season == open_season
+            date_from = store.earliest_mark(season, stype, team_ids) if is_open else None
+            games_season = _fetch_season_game_logs(season, stype, league_id=league_id, date_from=date_from)
+            new_rows = store.new_rows(games_season, season, stype)
+
+            if not new_rows.empty:
+                if date_from is None:
+                    # A full season pull replaces the partition, so rows already in the dataset (e.g. written by
+                    # create_nba_parquet_dataset before any watermark existed) are not duplicated
+                    logger.info(f"Replacing {stype} partition for {season} season, {len(new_rows)} new rows")
+                    write_game_logs(games_season, root=root, append=False)
+                else:
+                    logger.info(f"Appending {len(new_rows)} {stype} rows for {season} season")
+                    write_game_logs(new_rows, root=root, append=True)
+                new_frames.append(new_rows)
+
+            store.advance(new_rows, season, stype, closed=not is_open)
+            store.save()
+
+    return pd.concat(new_frames, ignore_index=True) if new_frames else pd.DataFrame()
+
+
+FIVETHIRTYEIGHT_ELO_URL = "https://projects.fivethirtyeight.com/nba-model/nba_elo.csv"
+
+
+def _download_if_modified(url: str, path: str) -> bool:
+    """
+    Downloads a file only if it changed since the local copy, revalidating with ETag/If-Modified-Since.
+
+    The validators of the last download are kept next to the file in <path>.meta.json.
+
+    Parameters:
+    url (str): The url to download.
+    path (str): The local copy of the file.
+
+    Returns:
+    bool: True if a new copy was downloaded, False if the local copy is still current.
+    """
+    meta_path = f"{path}.meta.json"
+    headers = {}
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    response = requests.get(url, headers=headers, stream=True, timeout=60)
+    if response.status_code == 304:
+        logger.info(f"{url} not modified, using local copy")
+        return False
+    response.raise_for_status()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=1 << 20):
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}, f)
+
+    logger.info(f"Downloaded {url} to {path}")
+    return True
+
+
+def _load_538_data(start_year=2010) -> DataFrame:
+    """
+    Downloads the FiveThirtyEight Elo feed once (if changed) and labels each game with its season string.
+
+    Parameters:
+    start_year (int): The starting year of the first season to keep. Defaults to 2010.
+
+    Returns:
+    DataFrame: The Elo feed from start_year on, with 'season' relabelled to e.g. '2010-11'.
+    """
+    path = os.path.join(DATA_DIR, 'nba', 'fivethirtyeight', 'nba_elo.csv')
+    _download_if_modified(FIVETHIRTYEIGHT_ELO_URL, path)
+
+    df = pd.read_csv(path)
+
+    # The feed's season column is the year the season ends, e.g. 2011 for 2010-11
+    df = df[df['season'] > start_year].reset_index(drop=True)
+    end_years = df['season']
+    df['season'] = (end_years - 1).astype(str) + '-' + (end_years % 100).astype(str).str.zfill(2)
+    return df
 
 
 # Create a function to pull the nba data from five thirty eight
-def fetch_nba_538_data() -> DataFrame:
+def iter_nba_538_data(start_year=2010) -> Iterator[DataFrame]:
+    """
+    Yields NBA game data from FiveThirtyEight one season at a time.
+
+    Parameters:
+    start_year (int): The starting year of the first season. Defaults to 2010.
+
+    Yields:
+    DataFrame: The FiveThirtyEight game data for one season.
+    """
+    for season, df in _load_538_data(start_year).groupby('season', sort=True):
+        logger.info(f"Loaded FiveThirtyEight game data for {season} season")
+        yield df
+
+
+def fetch_nba_538_data(start_year=2010) -> DataFrame:
     """
     Fetches NBA game data from FiveThirtyEight and compiles it into a DataFrame.
 
     Parameters:
-    None
+    start_year (int): The starting year of the first season. Defaults to 2010.
 
     Returns:
     DataFrame: A pandas DataFrame containing the game data from FiveThirtyEight.
     """
+    return _load_538_data(start_year)
 
-    # Create a list of all the NBA Seasons needed to be pulled
-    seasons_years = list(range(2010, datetime.now().year + 1))
-    seasons = [f"{year}-{str(year + 1)[-2:]}" for year in seasons_years]
 
-    # Create an empty dataframe to store all the game data
-    games_df = pd.DataFrame()
+async def aiter_nba_bball_ref_data(start_year=2010, end_year=None) -> AsyncIterator[DataFrame]:
+    """
+    Yields NBA game data from Basketball Reference one season at a time, as each season's crawl finishes. This is the
+    variant for callers that already run an event loop.
 
-    # Loop through each season and pull the game data
-    for season in seasons:
-        logger.info(f"Pulling game data for {season} season")
-        url = f"https://projects.fivethirtyeight.com/nba-model/nba_elo.csv"
-        df = pd.read_csv(url)
-        df['season'] = season
-        games_df = pd.concat([games_df, df], ignore_index=True)
+    Every season is crawled through one rate limited session and the raw pages are cached on disk, see
+    bettr.data.nba.games.bball_ref.
 
-    return games_df
+    Parameters:
+    start_year (int): The starting year for the data pull. Defaults to 2010.
+    end_year (int): The ending year for the data pull. Defaults to the current year.
+
+    Yields:
+    DataFrame: The Basketball Reference game data for one season.
+    """
+
+    if end_year is None:
+        end_year = datetime.now().year
 
+    # Basketball Reference names seasons after the year they end in
+    years = list(range(start_year + 1, end_year + 2))
+    async for _, df in iter_schedules(years):
+        yield df
 
-# Would be nice to have a function that pulls the data from basketball reference
-def fetch_nba_bball_ref_data() -> DataFrame:
+
+def iter_nba_bball_ref_data(start_year=2010, end_year=None) -> Iterator[DataFrame]:
+    """
+    Yields NBA game data from Basketball Reference one season at a time, as each season's crawl finishes.
+
+    The crawl runs on a private event loop, so this cannot be called from a running one. Use
+    aiter_nba_bball_ref_data there.
+
+    Parameters:
+    start_year (int): The starting year for the data pull. Defaults to 2010.
+    end_year (int): The ending year for the data pull. Defaults to the current year.
+
+    Yields:
+    DataFrame: The Basketball Reference game data for one season.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("iter_nba_bball_ref_data cannot run inside an event loop, "
+                           "use aiter_nba_bball_ref_data instead")
+
+    loop = asyncio.new_event_loop()
+    seasons = aiter_nba_bball_ref_data(start_year, end_year)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(seasons.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        # Closes the crawler's session when the caller stops early
+        loop.run_until_complete(seasons.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def fetch_nba_bball_ref_data(start_year=2010, end_year=None) -> DataFrame:
     """
     Fetches NBA game data from Basketball Reference and compiles it into a DataFrame.
 
     Parameters:
-    None
+    start_year (int): The starting year for the data pull. Defaults to 2010.
+    end_year (int): The ending year for the data pull. Defaults to the current year.
 
     Returns:
     DataFrame: A pandas DataFrame containing the game data from Basketball Reference.
     """
-
-    # Create a list of all the NBA Seasons needed to be pulled
-    seasons_years = list(range(2010, datetime.now().year + 1))
-    seasons = [f"{year}-{str(year + 1)[-2:]}" for year in seasons_years]
-
-    # Create an empty dataframe to store all the game data
-    games_df = pd.DataFrame()
-
-    # Loop through each season and pull the game data
-    for season in seasons:
-        logger.info(f"Pulling game data for {season} season")
-        url = f"https://www.basketball-reference.com/leagues/NBA_{
-            season}_games.html"
-        df = pd.read_html(url)[0]
-        df['season'] = season
-        games_df = pd.concat([games_df, df], ignore_index=True)
-
-    return games_df
+    return pd.concat(iter_nba_bball_ref_data(start_year, end_year), ignore_index=True)
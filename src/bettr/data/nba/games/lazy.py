@@ -0,0 +1,178 @@
+"""Polars LazyFrame pipeline over the stored NBA game logs.
+
+Queries are built lazily on top of the season partitioned Parquet dataset written by bettr.data.nba.games.store, so
+filters are pushed down into the scan (pruning season partitions and row groups), only the referenced columns are read
+and the query runs multi-threaded on collect. to_pandas and from_pandas bridge to the existing pandas callers."""
+
+import os
+from datetime import date
+from typing import List, Optional, Sequence, Union
+
+import pandas as pd
+import polars as pl
+
+from bettr.data.nba.games.schema import COUNT_COLUMNS, PCT_COLUMNS
+from bettr.data.nba.games.store import GAME_LOG_DATASET_DIR
+from bettr.utilities import paths
+
+
+TEAMS_CSV: str = os.path.join(paths.DATA_DIR, 'nba', 'teams', 'teams.csv')
+ROSTERS_CSV: str = os.path.join(paths.DATA_DIR, 'nba', 'teams', 'rosters.csv')
+
+
+def scan_game_logs(root: Optional[str] = None) -> pl.LazyFrame:
+    """
+    Lazily scans the partitioned game log dataset.
+
+    Parameters:
+    root (str): The dataset directory. Defaults to GAME_LOG_DATASET_DIR.
+
+    Returns:
+    pl.LazyFrame: The game logs, including the season hive partition column.
+    """
+    root = root or GAME_LOG_DATASET_DIR
+    return pl.scan_parquet(os.path.join(root, '**', '*.parquet'), hive_partitioning=True)
+
+
+def from_pandas(df: pd.DataFrame) -> pl.LazyFrame:
+    """Wraps a pandas frame, e.g. the output of fetch_nba_game_data, as a LazyFrame."""
+    return pl.from_pandas(df).lazy()
+
+
+def to_pandas(lf: Union[pl.LazyFrame, pl.DataFrame]) -> pd.DataFrame:
+    """
+    Collects a query and converts the result for pandas callers.
+
+    Parameters:
+    lf (pl.LazyFrame | pl.DataFrame): The query or an already collected frame.
+
+    Returns:
+    pd.DataFrame: The result as a pandas frame.
+    """
+    df = lf.collect() if isinstance(lf, pl.LazyFrame) else lf
+    return df.to_pandas()
+
+
+def filter_game_logs(lf: pl.LazyFrame, seasons: Optional[Sequence[str]] = None,
+                     season_types: Optional[Sequence[str]] = None, team_ids: Optional[Sequence[int]] = None,
+                     date_from: Optional[date] = None, date_to: Optional[date] = None) -> pl.LazyFrame:
+    """
+    Filters game logs. On a scan the predicates are pushed down into the Parquet reader.
+
+    Parameters:
+    lf (pl.LazyFrame): The game logs.
+    seasons (Sequence[str]): The seasons to keep, e.g. ['2022-23', '2023-24']. Defaults to all.
+    season_types (Sequence[str]): The season types to keep. Defaults to all.
+    team_ids (Sequence[int]): The teams to keep. Defaults to all.
+    date_from (date): The first game date to keep. Defaults to no lower bound.
+    date_to (date): The last game date to keep. Defaults to no upper bound.
+
+    Returns:
+    pl.LazyFrame: The filtered game logs.
+    """
+    predicates = []
+    if seasons is not None:
+        predicates.append(pl.col('SEASON_YEAR').is_in(list(seasons)))
+        if 'season' in lf.collect_schema().names():
+            predicates.append(pl.col('season').is_in(list(seasons)))
+    if season_types is not None:
+        predicates.append(pl.col('SEASON_TYPE').is_in(list(season_types)))
+    if team_ids is not None:
+        predicates.append(pl.col('TEAM_ID').is_in([int(team_id) for team_id in team_ids]))
+    if date_from is not None:
+        predicates.append(pl.col('GAME_DATE') >= pl.lit(date_from).cast(pl.Datetime('ms')))
+    if date_to is not None:
+        predicates.append(pl.col('GAME_DATE') <= pl.lit(date_to).cast(pl.Datetime('ms')))
+
+    for predicate in predicates:
+        lf = lf.filter(predicate)
+    return lf
+
+
+def join_teams(lf: pl.LazyFrame, teams: Optional[pl.LazyFrame] = None,
+               columns: Sequence[str] = ('TEAM_CITY', 'TEAM_CONFERENCE', 'TEAM_DIVISION')) -> pl.LazyFrame:
+    """
+    Joins team attributes onto game logs.
+
+    Parameters:
+    lf (pl.LazyFrame): The game logs.
+    teams (pl.LazyFrame): The team info, as written to teams.csv. Defaults to scanning TEAMS_CSV.
+    columns (Sequence[str]): The team columns to add.
+
+    Returns:
+    pl.LazyFrame: The game logs with the team columns added.
+    """
+    teams = teams if teams is not None else pl.scan_csv(TEAMS_CSV)
+    teams = teams.select([pl.col('TEAM_ID').cast(pl.Int32), *[pl.col(column) for column in columns]])
+    return lf.join(teams, on='TEAM_ID', how='left')
+
+
+def join_rosters(lf: pl.LazyFrame, rosters: Optional[pl.LazyFrame] = None,
+                 columns: Sequence[str] = ('PLAYER_ID', 'PLAYER', 'POSITION')) -> pl.LazyFrame:
+    """
+    Expands game logs to one row per rostered player of the team in that season.
+
+    Parameters:
+    lf (pl.LazyFrame): The game logs.
+    rosters (pl.LazyFrame): The rosters, as written to rosters.csv. Defaults to scanning ROSTERS_CSV.
+    columns (Sequence[str]): The roster columns to add.
+
+    Returns:
+    pl.LazyFrame: The game logs joined to the rosters.
+    """
+    rosters = rosters if rosters is not None else pl.scan_csv(ROSTERS_CSV)
+
+    # Rosters are keyed by the season's starting year, e.g. 2023 for 2023-24
+    rosters = rosters.select([
+        pl.col('TeamID').cast(pl.Int32).alias('TEAM_ID'),
+        pl.col('SEASON').cast(pl.Utf8).alias('_season_start'),
+        *[pl.col(column) for column in columns],
+    ])
+    return (
+        lf.with_columns(pl.col('SEASON_YEAR').str.slice(0, 4).alias('_season_start'))
+        .join(rosters, on=['TEAM_ID', '_season_start'], how='inner')
+        .drop('_season_start')
+    )
+
+
+def team_season_aggregates(lf: pl.LazyFrame, stats: Optional[List[str]] = None) -> pl.LazyFrame:
+    """
+    Aggregates game logs into per team, season and season type totals and averages.
+
+    Parameters:
+    lf (pl.LazyFrame): The game logs.
+    stats (List[str]): The stats to average. Defaults to the box score counting stats and percentages.
+
+    Returns:
+    pl.LazyFrame: One row per team, season and season type.
+    """
+    stats = stats or [*COUNT_COLUMNS, *PCT_COLUMNS]
+    return (
+        lf.group_by(['TEAM_ID', 'TEAM_ABBREVIATION', 'SEASON_YEAR', 'SEASON_TYPE'])
+        .agg([
+            pl.len().alias('GP'),
+            (pl.col('WL') == 'W').sum().alias('W'),
+            (pl.col('WL') == 'L').sum().alias('L'),
+            *[pl.col(stat).cast(pl.Float64).mean().alias(f"{stat}_AVG") for stat in stats],
+        ])
+        .sort(['SEASON_YEAR', 'SEASON_TYPE', 'TEAM_ID'])
+    )
+
+
+def rolling_team_form(lf: pl.LazyFrame, window: int = 10, stats: Sequence[str] = ('PTS', 'PLUS_MINUS')) -> pl.LazyFrame:
+    """
+    Adds rolling per team averages over the previous games, in date order.
+
+    Parameters:
+    lf (pl.LazyFrame): The game logs.
+    window (int): The number of games to average over. Defaults to 10.
+    stats (Sequence[str]): The stats to average.
+
+    Returns:
+    pl.LazyFrame: The game logs with a {stat}_ROLL_{window} column per stat.
+    """
+    return lf.sort(['TEAM_ID', 'GAME_DATE']).with_columns([
+        pl.col(stat).cast(pl.Float64).rolling_mean(window_size=window, min_samples=1).over('TEAM_ID')
+        .alias(f"{stat}_ROLL_{window}")
+        for stat in stats
+    ])
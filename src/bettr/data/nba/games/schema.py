@@ -0,0 +1,159 @@
+"""Canonical compact schema for the team game logs returned by TeamGameLogs.
+
+GAME_LOG_DTYPES is applied to every frame at ingestion: categoricals for low cardinality strings, int16 for
+counting stats and ranks, float32 for percentages and minutes and a real datetime for GAME_DATE. GAME_LOG_SCHEMA is the
+matching Arrow schema used by the Parquet store."""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pandas import DataFrame
+
+
+# Counting stats from the box score
+COUNT_COLUMNS = [
+    'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'OREB', 'DREB', 'REB', 'AST', 'TOV', 'STL', 'BLK', 'BLKA',
+    'PF', 'PFD', 'PTS', 'PLUS_MINUS',
+]
+
+# Shooting percentages
+PCT_COLUMNS = ['FG_PCT', 'FG3_PCT', 'FT_PCT']
+
+# Ranks of each team-game row within the season, up to ~2460 in an 82 game season
+RANK_COLUMNS = [
+    'GP_RANK', 'W_RANK', 'L_RANK', 'W_PCT_RANK', 'MIN_RANK',
+    *[f"{column}_RANK" for column in COUNT_COLUMNS],
+    *[f"{column}_RANK" for column in PCT_COLUMNS],
+]
+
+GAME_LOG_SCHEMA = pa.schema(
+    [
+        ('SEASON_YEAR', pa.string()),
+        ('SEASON_TYPE', pa.string()),
+        ('TEAM_ID', pa.int32()),
+        ('TEAM_ABBREVIATION', pa.string()),
+        ('TEAM_NAME', pa.string()),
+        ('GAME_ID', pa.string()),
+        ('GAME_DATE', pa.timestamp('ms')),
+        ('MATCHUP', pa.string()),
+        ('WL', pa.string()),
+        ('MIN', pa.float32()),
+        *[(column, pa.int16()) for column in COUNT_COLUMNS],
+        *[(column, pa.float32()) for column in PCT_COLUMNS],
+        *[(column, pa.int16()) for column in RANK_COLUMNS],
+        ('AVAILABLE_FLAG', pa.int8()),
+    ]
+)
+
+CATEGORY_COLUMNS = ['SEASON_YEAR', 'SEASON_TYPE', 'TEAM_ABBREVIATION', 'TEAM_NAME', 'MATCHUP', 'WL']
+
+GAME_LOG_DTYPES: Dict[str, str] = {
+    **{column: 'category' for column in CATEGORY_COLUMNS},
+    'TEAM_ID': 'int32',
+    'GAME_ID': 'object',
+    'GAME_DATE': 'datetime64[ns]',
+    'MIN': 'float32',
+    **{column: 'int16' for column in COUNT_COLUMNS},
+    **{column: 'float32' for column in PCT_COLUMNS},
+    **{column: 'int16' for column in RANK_COLUMNS},
+    'AVAILABLE_FLAG': 'int8',
+}
+
+# Hive partition keys of the stored dataset, derived from SEASON_YEAR and SEASON_TYPE
+PARTITION_SCHEMA = pa.schema([('season', pa.string()), ('season_type', pa.string())])
+
+
+def to_arrow_table(df: DataFrame) -> pa.Table:
+    """
+    Converts a game log frame into an Arrow table that matches GAME_LOG_SCHEMA.
+
+    Columns missing from the frame are filled with nulls and columns outside the schema are dropped.
+
+    Parameters:
+    df (DataFrame): The game logs as returned by TeamGameLogs.
+
+    Returns:
+    pa.Table: The game logs in the canonical schema.
+    """
+    df = df.assign(GAME_DATE=pd.to_datetime(df['GAME_DATE']))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    columns = []
+    for field in GAME_LOG_SCHEMA:
+        if field.name in table.column_names:
+            columns.append(table[field.name].cast(field.type))
+        else:
+            columns.append(pa.nulls(table.num_rows, type=field.type))
+    return pa.Table.from_arrays(columns, schema=GAME_LOG_SCHEMA)
+
+
+def _check_int_range(values: pd.Series, dtype: str) -> None:
+    """Raises if a column cannot be cast to an integer dtype without wrapping."""
+    values = pd.to_numeric(values, errors='coerce')
+    if values.notna().any():
+        bounds = np.iinfo(dtype)
+        low, high = values.min(), values.max()
+        if low < bounds.min or high > bounds.max:
+            raise ValueError(f"{values.name} holds values in [{low}, {high}], outside the {dtype} range "
+                             f"[{bounds.min}, {bounds.max}]")
+
+
+def apply_game_log_schema(df: DataFrame) -> DataFrame:
+    """
+    Casts a game log frame to the compact GAME_LOG_DTYPES schema.
+
+    Integer columns that contain nulls use the matching nullable extension type (e.g. Int16). Columns outside
+    the schema are left untouched.
+
+    Raises:
+    ValueError: If an integer column holds values outside the range of its compact type, which a plain cast would
+        silently wrap.
+
+    Parameters:
+    df (DataFrame): The game logs, e.g. as returned by TeamGameLogs.
+
+    Returns:
+    DataFrame: The game logs in the compact schema.
+    """
+    dtypes = {}
+    for column, dtype in GAME_LOG_DTYPES.items():
+        if column not in df.columns or column == 'GAME_DATE':
+            continue
+        if dtype.startswith('int'):
+            _check_int_range(df[column], dtype)
+            if df[column].isna().any():
+                dtype = dtype.capitalize()
+        dtypes[column] = dtype
+
+    df = df.astype(dtypes)
+    if 'GAME_DATE' in df.columns:
+        df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+    return df
+
+
+def memory_report(df: DataFrame, baseline: Optional[DataFrame] = None) -> DataFrame:
+    """
+    Reports the memory used by each column of a frame, optionally against a baseline frame.
+
+    Parameters:
+    df (DataFrame): The frame to measure.
+    baseline (DataFrame): The same data in another schema, e.g. before apply_game_log_schema.
+
+    Returns:
+    DataFrame: One row per column plus a TOTAL row, with dtype and bytes, and when a baseline is given its
+    bytes and the reduction ratio.
+    """
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'bytes': df.memory_usage(index=False, deep=True),
+    })
+    report.loc['TOTAL'] = ['', report['bytes'].sum()]
+
+    if baseline is not None:
+        baseline_bytes = baseline.memory_usage(index=False, deep=True)
+        baseline_bytes['TOTAL'] = baseline_bytes.sum()
+        report['baseline_bytes'] = baseline_bytes.reindex(report.index)
+        report['ratio'] = report['baseline_bytes'] / report['bytes']
+    return report
@@ -0,0 +1,111 @@
+"""Season partitioned Parquet store for NBA team game logs.
+
+The dataset is Hive partitioned as season=<season>/season_type=<season type> under DATA_DIR/nba/games/parquet and every
+file follows GAME_LOG_SCHEMA. Rows are sorted by team and date and written in small row groups, so readers that
+filter on seasons, season types and teams only touch the partitions and row groups they need."""
+
+import logging
+import os
+import uuid
+from typing import List, Optional, Sequence
+
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from pandas import DataFrame
+
+from bettr.data.nba.games.schema import GAME_LOG_SCHEMA, PARTITION_SCHEMA, to_arrow_table
+from bettr.utilities.paths import DATA_DIR
+
+
+logger = logging.getLogger(__name__)
+
+GAME_LOG_DATASET_DIR: str = os.path.join(DATA_DIR, 'nba', 'games', 'parquet')
+
+# Small row groups keep per team reads down to a few kilobytes of a season file
+ROWS_PER_GROUP: int = 512
+
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+
+
+def write_game_logs(df: DataFrame, root: Optional[str] = None, append: bool = False) -> None:
+    """
+    Writes game logs into the partitioned Parquet dataset.
+
+    Parameters:
+    df (DataFrame): The game logs to write. Must contain SEASON_YEAR and SEASON_TYPE.
+    root (str): The dataset directory. Defaults to GAME_LOG_DATASET_DIR.
+    append (bool): Whether to add the rows as new files next to the existing ones. When False the partitions
+        present in df are replaced. Defaults to False.
+    """
+    if df.empty:
+        return
+
+    root = root or GAME_LOG_DATASET_DIR
+    table = to_arrow_table(df)
+    table = table.append_column('season', table['SEASON_YEAR']).append_column('season_type', table['SEASON_TYPE'])
+    table = table.sort_by([('TEAM_ID', 'ascending'), ('GAME_DATE', 'ascending')])
+
+    file_format = ds.ParquetFileFormat()
+    ds.write_dataset(
+        table,
+        root,
+        format=file_format,
+        partitioning=PARTITIONING,
+        file_options=file_format.make_write_options(compression='zstd'),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore' if append else 'delete_matching',
+        min_rows_per_group=ROWS_PER_GROUP,
+        max_rows_per_group=ROWS_PER_GROUP,
+    )
+    logger.info(f"Wrote {table.num_rows} game log rows to {root}")
+
+
+def game_log_dataset(root: Optional[str] = None) -> ds.Dataset:
+    """
+    Opens the partitioned game log dataset.
+
+    Parameters:
+    root (str): The dataset directory. Defaults to GAME_LOG_DATASET_DIR.
+
+    Returns:
+    ds.Dataset: The game log dataset, including the season and season_type partition columns.
+    """
+    schema = GAME_LOG_SCHEMA
+    for field in PARTITION_SCHEMA:
+        schema = schema.append(field)
+    return ds.dataset(root or GAME_LOG_DATASET_DIR, format='parquet', partitioning=PARTITIONING, schema=schema)
+
+
+def read_game_logs(root: Optional[str] = None, seasons: Optional[Sequence[str]] = None,
+                   season_types: Optional[Sequence[str]] = None, team_ids: Optional[Sequence[int]] = None,
+                   columns: Optional[List[str]] = None) -> DataFrame:
+    """
+    Reads game logs from the partitioned dataset.
+
+    Season and season type filters prune whole partitions, the team filter is checked against row group
+    statistics and only the requested columns are decoded.
+
+    Parameters:
+    root (str): The dataset directory. Defaults to GAME_LOG_DATASET_DIR.
+    seasons (Sequence[str]): The seasons to read, e.g. ['2022-23', '2023-24']. Defaults to all.
+    season_types (Sequence[str]): The season types to read. Defaults to all.
+    team_ids (Sequence[int]): The teams to read. Defaults to all.
+    columns (List[str]): The columns to read. Defaults to every GAME_LOG_SCHEMA column.
+
+    Returns:
+    DataFrame: The matching game logs.
+    """
+    filters = []
+    if seasons is not None:
+        filters.append(pc.field('season').isin(list(seasons)))
+    if season_types is not None:
+        filters.append(pc.field('season_type').isin(list(season_types)))
+    if team_ids is not None:
+        filters.append(pc.field('TEAM_ID').isin([int(team_id) for team_id in team_ids]))
+
+    expression = None
+    for condition in filters:
+        expression = condition if expression is None else expression & condition
+
+    table = game_log_dataset(root).to_table(columns=columns or GAME_LOG_SCHEMA.names, filter=expression)
+    return table.to_pandas()
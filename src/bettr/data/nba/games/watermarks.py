@@ -0,0 +1,128 @@
+"""High-water marks for incremental NBA game log syncs.
+
+Each season/season type pair records, per team, the latest GAME_DATE and GAME_ID that has been ingested, and
+whether the season is closed. Closed seasons are frozen and never requested again."""
+
+import json
+import logging
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+from pandas import DataFrame
+
+
+logger = logging.getLogger(__name__)
+
+
+class WatermarkStore:
+    """JSON backed store of per-season/per-team game log high-water marks."""
+
+    def __init__(self, path: str) -> None:
+        """Initializes the WatermarkStore class.
+
+        Parameters:
+        path (str): The path to the JSON file holding the watermarks.
+        """
+        self.path = path
+        self._marks: Dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self._marks = json.load(f)
+
+    @staticmethod
+    def _key(season: str, season_type: str) -> str:
+        return f"{season}|{season_type}"
+
+    def is_frozen(self, season: str, season_type: str) -> bool:
+        """Returns whether the season has been fully ingested and closed."""
+        return self._marks.get(self._key(season, season_type), {}).get('closed', False)
+
+    def team_marks(self, season: str, season_type: str) -> Dict[str, Tuple[str, str]]:
+        """Returns a mapping of team id to its (GAME_DATE, GAME_ID) watermark for the season."""
+        teams = self._marks.get(self._key(season, season_type), {}).get('teams', {})
+        return {team_id: (mark['game_date'], mark['game_id']) for team_id, mark in teams.items()}
+
+    def earliest_mark(self, season: str, season_type: str, team_ids: Iterable[str]) -> Optional[str]:
+        """Returns the oldest team watermark date for the season.
+
+        Parameters:
+        season (str): The season.
+        season_type (str): The season type.
+        team_ids (Iterable[str]): Every team that can appear in the season.
+
+        Returns:
+        Optional[str]: The oldest watermark, or None if any of the teams has none yet. Pulling from the oldest mark
+            would otherwise skip the earlier games of the teams without one.
+        """
+        marks = self.team_marks(season, season_type)
+        team_ids = [str(team_id) for team_id in team_ids]
+        if not team_ids or any(team_id not in marks for team_id in team_ids):
+            return None
+        return min(marks[team_id][0] for team_id in team_ids)
+
+    def new_rows(self, df: DataFrame, season: str, season_type: str) -> DataFrame:
+        """Filters a game log frame down to the rows past each team's watermark.
+
+        Parameters:
+        df (DataFrame): The game logs pulled for the season.
+        season (str): The season the game logs belong to.
+        season_type (str): The season type the game logs belong to.
+
+        Returns:
+        DataFrame: The rows that have not been ingested yet.
+        """
+        marks = self.team_marks(season, season_type)
+        if df.empty or not marks:
+            return df
+
+        game_dates = pd.to_datetime(df['GAME_DATE']).dt.strftime('%Y-%m-%d')
+        team_ids = df['TEAM_ID'].astype(str)
+        mark_dates = team_ids.map({team_id: mark[0] for team_id, mark in marks.items()})
+        mark_ids = team_ids.map({team_id: mark[1] for team_id, mark in marks.items()})
+
+        is_new = (
+            mark_dates.isna()
+            | (game_dates > mark_dates)
+            | ((game_dates == mark_dates) & (df['GAME_ID'].astype(str) > mark_ids))
+        )
+        return df[is_new]
+
+    def advance(self, df: DataFrame, season: str, season_type: str, closed: bool = False) -> None:
+        """Moves the team watermarks forward to the latest games in the frame.
+
+        Parameters:
+        df (DataFrame): The newly ingested game logs.
+        season (str): The season the game logs belong to.
+        season_type (str): The season type the game logs belong to.
+        closed (bool): Whether the season is over and should be frozen. Defaults to False.
+        """
+        entry = self._marks.setdefault(self._key(season, season_type), {'closed': False, 'teams': {}})
+
+        if not df.empty:
+            latest = (
+                df.assign(
+                    _date=pd.to_datetime(df['GAME_DATE']).dt.strftime('%Y-%m-%d'),
+                    _game_id=df['GAME_ID'].astype(str),
+                    _team_id=df['TEAM_ID'].astype(str),
+                )
+                .sort_values(['_date', '_game_id'])
+                .groupby('_team_id')
+                .last()
+            )
+            for team_id, row in latest.iterrows():
+                current = entry['teams'].get(team_id)
+                if current is None or (row['_date'], row['_game_id']) > (current['game_date'], current['game_id']):
+                    entry['teams'][team_id] = {'game_date': row['_date'], 'game_id': row['_game_id']}
+
+        if closed:
+            logger.info(f"Freezing {season_type} watermarks for {season} season")
+            entry['closed'] = True
+
+    def save(self) -> None:
+        """Writes the watermarks back to disk."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._marks, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,39 @@
+"""Module to retrieve player game logs from the nba_api library, one season and season type per request, through the
+on-disk response cache."""
+
+import logging
+
+import pandas as pd
+from pandas import DataFrame
+
+from nba_api.stats.endpoints import PlayerGameLogs
+
+from bettr.data.nba.cache import fetch_endpoint, season_ttl
+
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_player_game_logs(season: str, season_type: str = 'Regular Season', league_id: str = '') -> DataFrame:
+    """
+    Pulls every player's game logs for a single season and season type.
+
+    Parameters:
+    season (str): The season to pull, e.g. '2023-24'.
+    season_type (str): The type of season to pull, e.g. 'Regular Season'.
+    league_id (str): The league ID for the data pull. Defaults to NBA.
+
+    Returns:
+    DataFrame: The game logs as returned by the endpoint, tagged with a SEASON_TYPE column and with GAME_DATE as dates.
+    """
+    logger.info(f"Pulling {season_type} player game logs for {season} season")
+    logs = fetch_endpoint(
+        PlayerGameLogs,
+        ttl=season_ttl(season),
+        league_id_nullable=league_id,
+        season_nullable=season,
+        season_type_nullable=season_type,
+    )[0]
+    logs['SEASON_TYPE'] = season_type
+    logs['GAME_DATE'] = pd.to_datetime(logs['GAME_DATE']).dt.date
+    return logs
@@ -0,0 +1,46 @@
+"""Helpers for working with NBA season strings such as '2010-11'."""
+
+from datetime import datetime
+from typing import List, Optional
+
+
+def current_season_start_year(today: Optional[datetime] = None) -> int:
+    """
+    Returns the starting year of the season that is currently open. A new season opens in October.
+
+    Parameters:
+    today (datetime): The date to evaluate. Defaults to now.
+
+    Returns:
+    int: The starting year of the open season, e.g. 2024 for the 2024-25 season.
+    """
+    today = today or datetime.now()
+    return today.year if today.month >= 10 else today.year - 1
+
+
+def get_seasons(start_year: int, end_year: int) -> List[str]:
+    """
+    Builds the list of NBA season strings (e.g. '2010-11') for a range of starting years.
+
+    Parameters:
+    start_year (int): The starting year of the first season.
+    end_year (int): The starting year of the last season.
+
+    Returns:
+    List[str]: The season strings, in chronological order.
+    """
+    return [f"{year}-{str(year + 1)[-2:]}" for year in range(start_year, end_year + 1)]
+
+
+def is_closed_season(season: str, today: Optional[datetime] = None) -> bool:
+    """
+    Returns whether a season has finished, i.e. it started before the currently open season.
+
+    Parameters:
+    season (str): The season string, e.g. '2010-11'.
+    today (datetime): The date to evaluate. Defaults to now.
+
+    Returns:
+    bool: True if the season is over and its data will no longer change.
+    """
+    return int(season[:4]) < current_season_start_year(today)
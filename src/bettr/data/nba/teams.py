@@ -1,61 +1,240 @@
 """Module to retrieve the teams data from the nba_api library. As this is a mostly static dataset, we will only need to
-retrieve this data once and store it in our database. We will use the TeamInfoCommon endpoint to retrieve the data."""
+retrieve this data once and store it in our database. We will use the TeamInfoCommon endpoint to retrieve the data.
+
+Nothing is fetched at import time. Use TeamRepository.load_teams() / load_rosters(seasons), which fetch concurrently,
+memoize in memory and serve closed seasons from the on-disk response cache, or run this module as a script to write
+teams.csv and rosters.csv."""
 
-from nba_api.stats.endpoints import CommonTeamRoster
 import logging
-from typing import Any, Dict, List, Optional, Union
-from urllib.error import HTTPError
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
 import pandas as pd
-from pydantic import BaseModel, Field
-from pydantic.types import PositiveInt
 from tqdm import tqdm
-from bettr.config.settings import Settings
 
 from nba_api.stats.static import teams
-from nba_api.stats.endpoints import TeamInfoCommon
+from nba_api.stats.endpoints import CommonTeamRoster, TeamInfoCommon
 from nba_api.stats.library.parameters import SeasonAll
 
+from bettr.data.nba.cache import fetch_endpoint, season_ttl
+from bettr.data.nba.seasons import is_closed_season
 from bettr.utilities import paths
 
-settings = Settings()
-nba_teams = teams.get_teams()
 
-# Create a list of team ids
-team_ids_dict = {team['full_name']: team['id'] for team in nba_teams}
+logger = logging.getLogger(__name__)
 
-df = pd.DataFrame()
+# List of years to get the roster for
+DEFAULT_ROSTER_SEASONS = ['2019-20', '2020-21', '2021-22', '2022-23', '2023-24', '2024-25']
 
-for team_name, team_id in team_ids_dict.items():
-    team_info_common = TeamInfoCommon(team_id=team_id)
-    df_team = team_info_common.get_data_frames()[0]
-    df_team['TeamName'] = team_name
-    df_team['Season'] = SeasonAll.default
-    df = pd.concat([df, df_team], ignore_index=True)
+# stats.nba.com throttles aggressive clients, so keep the fan-out small
+DEFAULT_MAX_WORKERS = 4
 
 
-# Convert the dataframe to a csv file
-df.to_csv(paths.DATA_DIR + "/nba/teams/teams.csv", index=False)
+def get_team_ids() -> Dict[str, int]:
+    """Returns a mapping of team name to team id from the static nba_api team list.
 
+    Returns:
+        Dict[str, int]: The team ids keyed by full team name.
+    """
+    return {team['full_name']: team['id'] for team in teams.get_teams()}
 
-# Create a Roster for each team
 
-# Get the team ids from the teams.csv file
-df_teams = pd.read_csv(paths.DATA_DIR + "/nba/teams/teams.csv")
+def fetch_team_info(team_name: str, team_id: int, refresh: bool = False) -> pd.DataFrame:
+    """Fetches the TeamInfoCommon data for a single team.
 
-# Create a list of team ids
-team_ids = df_teams['TEAM_ID'].tolist()
+    Args:
+        team_name (str): The full team name.
+        team_id (int): The team id.
+        refresh (bool): Whether to bypass the response cache.
 
-# List of years to get the roster for
-seasons = ['2019-20', '2020-21', '2021-22', '2022-23', '2023-24', '2024-25']
+    Returns:
+        pd.DataFrame: The team info.
+    """
+    df_team = fetch_endpoint(TeamInfoCommon, ttl=season_ttl(None), refresh=refresh, team_id=team_id)[0]
+    df_team['TeamName'] = team_name
+    df_team['Season'] = SeasonAll.default
+    return df_team
+
+
+def fetch_team_roster(team_id: int, season: str, refresh: bool = False) -> pd.DataFrame:
+    """Fetches the CommonTeamRoster data for a single team and season.
+
+    Args:
+        team_id (int): The team id.
+        season (str): The season, e.g. '2023-24'.
+        refresh (bool): Whether to bypass the response cache.
+
+    Returns:
+        pd.DataFrame: The roster.
+    """
+    return fetch_endpoint(CommonTeamRoster, ttl=season_ttl(season), refresh=refresh, team_id=team_id,
+                          season=season)[0]
 
-# Create a dataframe to store the roster data
-df_roster = pd.DataFrame()
 
-for team_id in tqdm(team_ids):
-    for season in seasons:
-        common_team_roster = CommonTeamRoster(team_id=team_id, season=season)
-        df_roster_team = common_team_roster.get_data_frames()[0]
-        df_roster = pd.concat([df_roster, df_roster_team], ignore_index=True)
+def iter_team_info(team_ids_by_name: Dict[str, int]) -> Iterator[pd.DataFrame]:
+    """Yields the TeamInfoCommon data one team at a time.
 
-# Convert the dataframe to a csv file
-df_roster.to_csv(paths.DATA_DIR + "/nba/teams/rosters.csv", index=False)
+    Args:
+        team_ids_by_name (Dict[str, int]): Mapping of team name to team id.
+
+    Yields:
+        pd.DataFrame: The team info for a single team.
+    """
+    for team_name, team_id in team_ids_by_name.items():
+        yield fetch_team_info(team_name, team_id)
+
+
+def iter_team_rosters(team_ids: List[int], seasons: List[str]) -> Iterator[pd.DataFrame]:
+    """Yields the CommonTeamRoster data one team and season at a time.
+
+    Args:
+        team_ids (List[int]): The team ids to get rosters for.
+        seasons (List[str]): The seasons to get rosters for, e.g. '2023-24'.
+
+    Yields:
+        pd.DataFrame: The roster for a single team and season.
+    """
+    for team_id in tqdm(team_ids):
+        for season in seasons:
+            yield fetch_team_roster(team_id, season)
+
+
+def write_frames_to_csv(frames: Iterable[pd.DataFrame], path: str) -> None:
+    """Writes a stream of frames to a single csv file, one chunk at a time.
+
+    Args:
+        frames (Iterable[pd.DataFrame]): The frames to write.
+        path (str): The csv file to write to.
+    """
+    header = True
+    for frame in frames:
+        frame.to_csv(path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+
+
+def _digest(df: pd.DataFrame) -> int:
+    """Returns a content digest of a frame, used to detect roster changes."""
+    return int(pd.util.hash_pandas_object(df, index=False).sum())
+
+
+class TeamRepository:
+    """Lazy, memoized access to the NBA teams and their rosters."""
+
+    def __init__(self, data_dir: Optional[str] = None, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        """Initializes the TeamRepository class.
+
+        Args:
+            data_dir (str): The directory to write teams.csv and rosters.csv to. Defaults to DATA_DIR/nba/teams.
+            max_workers (int): The maximum number of endpoint calls to run at the same time.
+        """
+        self.data_dir = data_dir or os.path.join(paths.DATA_DIR, 'nba', 'teams')
+        self.max_workers = max_workers
+        self._teams: Optional[pd.DataFrame] = None
+        self._rosters: Dict[Tuple[int, str], pd.DataFrame] = {}
+        self._digests: Dict[Tuple[int, str], int] = {}
+        self._lock = threading.Lock()
+
+    def load_teams(self, refresh: bool = False) -> pd.DataFrame:
+        """Returns the TeamInfoCommon data for every team.
+
+        Args:
+            refresh (bool): Whether to refetch instead of using the memoized and cached data.
+
+        Returns:
+            pd.DataFrame: One row per team.
+        """
+        with self._lock:
+            if self._teams is not None and not refresh:
+                return self._teams
+
+        team_ids = get_team_ids()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            frames = list(executor.map(
+                lambda item: fetch_team_info(*item, refresh=refresh), team_ids.items()))
+
+        df_teams = pd.concat(frames, ignore_index=True)
+        with self._lock:
+            self._teams = df_teams
+        return df_teams
+
+    def team_ids(self) -> List[int]:
+        """Returns the ids of every team."""
+        return self.load_teams()['TEAM_ID'].tolist()
+
+    def _fetch_rosters(self, pairs: Sequence[Tuple[int, str]], refresh: bool) -> List[Tuple[int, str]]:
+        """Fetches rosters concurrently and stores the ones whose content changed.
+
+        Returns:
+            List[Tuple[int, str]]: The (team id, season) pairs that changed.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            frames = list(executor.map(
+                lambda pair: fetch_team_roster(*pair, refresh=refresh), pairs))
+
+        changed = []
+        with self._lock:
+            for pair, df_roster in zip(pairs, frames):
+                digest = _digest(df_roster)
+                if self._digests.get(pair) != digest:
+                    self._rosters[pair] = df_roster
+                    self._digests[pair] = digest
+                    changed.append(pair)
+        return changed
+
+    def load_rosters(self, seasons: Sequence[str] = DEFAULT_ROSTER_SEASONS,
+                     team_ids: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Returns the rosters of the given teams and seasons, fetching only what is not memoized yet.
+
+        Args:
+            seasons (Sequence[str]): The seasons to get rosters for, e.g. '2023-24'.
+            team_ids (Sequence[int]): The teams to get rosters for. Defaults to every team.
+
+        Returns:
+            pd.DataFrame: The rosters, one row per player per team and season.
+        """
+        team_ids = list(team_ids) if team_ids is not None else self.team_ids()
+        pairs = [(team_id, season) for team_id in team_ids for season in seasons]
+
+        with self._lock:
+            missing = [pair for pair in pairs if pair not in self._rosters]
+        if missing:
+            logger.info(f"Loading {len(missing)} rosters")
+            self._fetch_rosters(missing, refresh=False)
+
+        with self._lock:
+            return pd.concat([self._rosters[pair] for pair in pairs], ignore_index=True)
+
+    def refresh_rosters(self, seasons: Sequence[str] = DEFAULT_ROSTER_SEASONS,
+                        team_ids: Optional[Sequence[int]] = None) -> List[Tuple[int, str]]:
+        """Refetches the rosters of open seasons and keeps only the ones that changed.
+
+        Closed seasons cannot change and are never refetched.
+
+        Args:
+            seasons (Sequence[str]): The seasons to refresh.
+            team_ids (Sequence[int]): The teams to refresh. Defaults to every team.
+
+        Returns:
+            List[Tuple[int, str]]: The (team id, season) pairs whose roster changed.
+        """
+        team_ids = list(team_ids) if team_ids is not None else self.team_ids()
+        pairs = [(team_id, season) for team_id in team_ids for season in seasons if not is_closed_season(season)]
+        changed = self._fetch_rosters(pairs, refresh=True) if pairs else []
+        logger.info(f"{len(changed)} of {len(pairs)} open season rosters changed")
+        return changed
+
+    def write_csv(self, seasons: Sequence[str] = DEFAULT_ROSTER_SEASONS) -> None:
+        """Writes teams.csv and rosters.csv to the data directory.
+
+        Args:
+            seasons (Sequence[str]): The seasons to write rosters for.
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.load_teams().to_csv(os.path.join(self.data_dir, 'teams.csv'), index=False)
+        self.load_rosters(seasons).to_csv(os.path.join(self.data_dir, 'rosters.csv'), index=False)
+
+
+if __name__ == '__main__':
+    TeamRepository().write_csv()
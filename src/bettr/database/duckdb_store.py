@@ -0,0 +1,129 @@
+"""Optional embedded DuckDB backend for historical analytics.
+
+Heavy scans (career splits, multi-season rolling stats) run as vectorized DuckDB SQL directly over the season partitioned
+game log Parquet dataset, with no server and no copy into Postgres. Results come back as Arrow tables. Postgres stays the
+store for writes. Requires the optional 'duckdb' dependency (pip install bettr[analytics])."""
+
+import os
+from typing import Any, Optional, Sequence
+
+import pyarrow as pa
+
+from bettr.data.nba.games.store import GAME_LOG_DATASET_DIR
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+
+class DuckDBAnalytics:
+    """Embedded DuckDB session with the game log dataset attached as the game_logs view."""
+
+    def __init__(self, database: str = ':memory:', dataset_root: Optional[str] = None,
+                 threads: Optional[int] = None) -> None:
+        """Initializes the DuckDBAnalytics class.
+
+        Args:
+            database (str): The DuckDB database file, or ':memory:' for a throwaway session.
+            dataset_root (str): The game log Parquet dataset. Defaults to GAME_LOG_DATASET_DIR.
+            threads (int): The number of DuckDB worker threads. Defaults to every core.
+        """
+        if duckdb is None:
+            raise ImportError("DuckDB analytics require the optional 'duckdb' package: pip install bettr[analytics]")
+
+        self.connection = duckdb.connect(database)
+        if threads is not None:
+            self.connection.execute(f"SET threads = {int(threads)}")
+
+        self.dataset_root = dataset_root or GAME_LOG_DATASET_DIR
+        self.attach_game_logs(self.dataset_root)
+
+    def attach_game_logs(self, dataset_root: str) -> None:
+        """(Re)creates the game_logs view over a Parquet dataset.
+
+        Args:
+            dataset_root (str): The Hive partitioned game log dataset directory.
+        """
+        pattern = os.path.join(dataset_root, '**', '*.parquet').replace("'", "''")
+        self.connection.execute(
+            f"CREATE OR REPLACE VIEW game_logs AS "
+            f"SELECT * FROM read_parquet('{pattern}', hive_partitioning = true)"
+        )
+
+    def query(self, sql: str, params: Optional[Sequence[Any]] = None) -> pa.Table:
+        """Runs analytical SQL and returns the result as Arrow.
+
+        Args:
+            sql (str): The query, which can reference the game_logs view.
+            params (Sequence[Any]): Positional parameters for ? placeholders.
+
+        Returns:
+            pa.Table: The query result.
+        """
+        return self.connection.execute(sql, params or []).fetch_arrow_table()
+
+    def team_season_averages(self, seasons: Optional[Sequence[str]] = None,
+                             season_type: str = 'Regular Season') -> pa.Table:
+        """Returns per team and season records and scoring averages.
+
+        Args:
+            seasons (Sequence[str]): The seasons to include, e.g. ['2022-23', '2023-24']. Defaults to all.
+            season_type (str): The season type to include.
+
+        Returns:
+            pa.Table: One row per team and season.
+        """
+        seasons_filter = "AND season IN (SELECT unnest(?::VARCHAR[]))" if seasons else ""
+        params = [season_type, list(seasons)] if seasons else [season_type]
+        return self.query(
+            f"""
+            SELECT TEAM_ID, TEAM_ABBREVIATION, SEASON_YEAR,
+                   count(*) AS GP,
+                   count(*) FILTER (WHERE WL = 'W') AS W,
+                   avg(PTS) AS PTS_AVG,
+                   avg(PLUS_MINUS) AS PLUS_MINUS_AVG,
+                   avg(FG_PCT) AS FG_PCT_AVG,
+                   avg(FG3_PCT) AS FG3_PCT_AVG
+            FROM game_logs
+            WHERE SEASON_TYPE = ? {seasons_filter}
+            GROUP BY ALL
+            ORDER BY SEASON_YEAR, TEAM_ID
+            """,
+            params,
+        )
+
+    def rolling_team_form(self, window: int = 10, team_ids: Optional[Sequence[int]] = None) -> pa.Table:
+        """Returns each team's rolling scoring averages over its previous games, across seasons.
+
+        Args:
+            window (int): The number of games in the window.
+            team_ids (Sequence[int]): The teams to include. Defaults to all.
+
+        Returns:
+            pa.Table: One row per team game with PTS_ROLL and PLUS_MINUS_ROLL.
+        """
+        team_filter = "WHERE TEAM_ID IN (SELECT unnest(?::INTEGER[]))" if team_ids else ""
+        params = [list(team_ids)] if team_ids else []
+        return self.query(
+            f"""
+            SELECT TEAM_ID, GAME_ID, GAME_DATE, PTS, PLUS_MINUS,
+                   avg(PTS) OVER form AS PTS_ROLL,
+                   avg(PLUS_MINUS) OVER form AS PLUS_MINUS_ROLL
+            FROM game_logs
+            {team_filter}
+            WINDOW form AS (PARTITION BY TEAM_ID ORDER BY GAME_DATE ROWS BETWEEN {int(window) - 1} PRECEDING AND CURRENT ROW)
+            ORDER BY TEAM_ID, GAME_DATE
+            """,
+            params,
+        )
+
+    def close(self) -> None:
+        """Closes the DuckDB connection."""
+        self.connection.close()
+
+    def __enter__(self) -> 'DuckDBAnalytics':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,186 @@
+"""Process wide, pooled SQLAlchemy engines and session factories.
+
+The async engine (asyncpg) serves the API, the sync engine (psycopg2) serves the pandas bulk paths such as
+BaseModel.bulk_upsert. Both are created lazily, once per process, and sized from the POSTGRES_DB_POOL_* settings.
+pool_metrics() exposes checkout counts and checkout wait times for both pools."""
+
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Iterator, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from bettr.config.settings import settings
+from bettr.config.urls import async_postgres_url, sync_postgres_url
+
+
+class PoolMetrics:
+    """Counters for a connection pool, fed by pool events and timed checkouts."""
+
+    def __init__(self) -> None:
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Union[Engine, AsyncEngine]) -> None:
+        """Listens to the pool events of an engine."""
+        sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        event.listen(sync_engine, 'connect', self._on_connect)
+        event.listen(sync_engine, 'checkout', self._on_checkout)
+        event.listen(sync_engine, 'checkin', self._on_checkin)
+
+    def _on_connect(self, *args) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, *args) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, *args) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_wait(self, seconds: float) -> None:
+        """Records how long a caller waited to check a connection out."""
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, engine: Union[Engine, AsyncEngine]) -> Dict[str, Union[int, float]]:
+        """Returns the counters together with the current pool state."""
+        pool = engine.pool
+        with self._lock:
+            return {
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'wait_avg_ms': 1000 * self.wait_total / self.wait_count if self.wait_count else 0.0,
+                'wait_max_ms': 1000 * self.wait_max,
+            }
+
+
+async_metrics = PoolMetrics()
+sync_metrics = PoolMetrics()
+
+
+def _connection_settings() -> Dict[str, str]:
+    return {
+        'user': settings.POSTGRES_USER,
+        'password': settings.POSTGRES_PASSWORD,
+        'host': settings.POSTGRES_HOST,
+        'port': settings.POSTGRES_PORT,
+        'database': settings.POSTGRES_DB,
+    }
+
+
+def _pool_settings() -> Dict[str, Union[int, bool]]:
+    return {
+        'pool_size': settings.POSTGRES_DB_POOL_SIZE,
+        'max_overflow': settings.POSTGRES_DB_MAX_OVERFLOW,
+        'pool_pre_ping': settings.POSTGRES_DB_POOL_PRE_PING,
+        'pool_timeout': settings.POSTGRES_DB_POOL_TIMEOUT,
+        'pool_recycle': settings.POSTGRES_DB_POOL_RECYCLE,
+    }
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    """Get the process wide async engine.
+
+    Returns:
+        AsyncEngine: The pooled asyncpg engine.
+    """
+    engine = create_async_engine(async_postgres_url(**_connection_settings()), **_pool_settings())
+    async_metrics.attach(engine)
+    return engine
+
+
+@lru_cache()
+def get_sync_engine() -> Engine:
+    """Get the process wide sync engine, used by the pandas bulk paths.
+
+    Returns:
+        Engine: The pooled psycopg2 engine.
+    """
+    engine = create_engine(sync_postgres_url(**_connection_settings()), **_pool_settings())
+    sync_metrics.attach(engine)
+    return engine
+
+
+@lru_cache()
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Get the async session factory bound to the async engine.
+
+    Returns:
+        async_sessionmaker[AsyncSession]: The session factory.
+    """
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False)
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Opens an async session, committing on success and rolling back on error."""
+    async with get_sessionmaker()() as session:
+        started = time.perf_counter()
+        await session.connection()
+        async_metrics.record_wait(time.perf_counter() - started)
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency that provides an async session for the duration of a request.
+
+    Usage:
+        @app.get('/items')
+        async def items(session: AsyncSession = Depends(get_session)): ...
+    """
+    async with session_scope() as session:
+        yield session
+
+
+@contextmanager
+def sync_connection(engine: Optional[Engine] = None) -> Iterator[Connection]:
+    """Checks a connection out of the sync pool, recording the checkout wait.
+
+    Args:
+        engine (Engine): The engine to connect with. Defaults to the shared sync engine, the only one whose waits
+            are recorded.
+    """
+    started = time.perf_counter()
+    with (engine or get_sync_engine()).connect() as connection:
+        if engine is None:
+            sync_metrics.record_wait(time.perf_counter() - started)
+        yield connection
+
+
+def pool_metrics() -> Dict[str, Dict[str, Union[int, float]]]:
+    """Returns the metrics of the pools that have been created so far.
+
+    Returns:
+        Dict[str, Dict[str, Union[int, float]]]: The metrics keyed by 'async' and 'sync'.
+    """
+    metrics = {}
+    if get_async_engine.cache_info().currsize:
+        metrics['async'] = async_metrics.snapshot(get_async_engine())
+    if get_sync_engine.cache_info().currsize:
+        metrics['sync'] = sync_metrics.snapshot(get_sync_engine())
+    return metrics
@@ -0,0 +1,148 @@
+"""Online migration helpers for use inside Alembic revisions.
+
+Migrations run with one transaction per revision and a short lock_timeout (see alembic/env.py). These helpers cover the
+operations that must not hold locks for long on the game log tables while ingestion and the API keep running:
+concurrent index builds (including on partitioned tables, where Postgres has no CREATE INDEX CONCURRENTLY) and
+backfills that commit in small batches."""
+
+import logging
+import time
+from typing import Callable, List, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+logger = logging.getLogger(__name__)
+
+
+def _is_partitioned(table: str) -> bool:
+    return op.get_bind().execute(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = CAST(:table AS regclass))"),
+        {'table': table},
+    ).scalar()
+
+
+def _partitions(table: str) -> List[str]:
+    return sorted(op.get_bind().execute(
+        sa.text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = CAST(:table AS regclass)"),
+        {'table': table},
+    ).scalars())
+
+
+def _create_index_sql(index_name: str, table: str, columns: Sequence[str], only: bool = False,
+                      concurrently: bool = False, using: Optional[str] = None,
+                      include: Optional[Sequence[str]] = None, where: Optional[str] = None) -> str:
+    sql = (f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index_name} "
+           f"ON {'ONLY ' if only else ''}{table}")
+    if using:
+        sql += f" USING {using}"
+    sql += f" ({', '.join(columns)})"
+    if include:
+        sql += f" INCLUDE ({', '.join(include)})"
+    if where:
+        sql += f" WHERE {where}"
+    return sql
+
+
+def create_index_concurrently(index_name: str, table: str, columns: Sequence[str], using: Optional[str] = None,
+                              include: Optional[Sequence[str]] = None, where: Optional[str] = None) -> None:
+    """Builds an index without blocking writes to the table.
+
+    CREATE INDEX CONCURRENTLY cannot run inside a transaction, so the build runs in an autocommit block. Partitioned
+    tables do not support it at all; for those an invalid index is created ON ONLY the parent, each partition is
+    indexed concurrently and attached, which makes the parent index valid once every partition is attached.
+
+    Args:
+        index_name (str): The index name, e.g. 'ix_player_game_log_fg3m'.
+        table (str): The table to index.
+        columns (Sequence[str]): The column names or expressions, e.g. ['player_id', 'game_date DESC'].
+        using (str): The index method, e.g. 'brin'. Defaults to btree.
+        include (Sequence[str]): Columns to carry in the index for index only scans.
+        where (str): A predicate for a partial index.
+    """
+    options = {'using': using, 'include': include, 'where': where}
+    with op.get_context().autocommit_block():
+        if not _is_partitioned(table):
+            op.execute(_create_index_sql(index_name, table, columns, concurrently=True, **options))
+            return
+
+        op.execute(_create_index_sql(index_name, table, columns, only=True, **options))
+        for partition in _partitions(table):
+            partition_index = f"ix_{partition}_{index_name.removeprefix(f'ix_{table}_')}"
+            op.execute(_create_index_sql(partition_index, partition, columns, concurrently=True, **options))
+            op.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {partition_index}")
+        logger.info(f"Built {index_name} on {table} and its partitions")
+
+
+def drop_index_concurrently(index_name: str, table: str) -> None:
+    """Drops an index without blocking writes. Partitioned indexes are dropped normally, which Postgres requires.
+
+    Args:
+        index_name (str): The index name.
+        table (str): The indexed table.
+    """
+    if _is_partitioned(table):
+        op.drop_index(index_name, table_name=table, if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def batched_backfill(table: str, set_clause: str, where: str, batch_size: int = 10_000, pause: float = 0.1,
+                     key_columns: Optional[Sequence[str]] = None,
+                     progress: Optional[Callable[[int, Optional[int]], None]] = None) -> int:
+    """Updates matching rows in small, separately committed batches.
+
+    Each batch locks at most batch_size rows, skipping rows that ingestion currently holds, and commits before the next
+    one starts, so concurrent writers never wait long. The where clause has to stop matching a row once it has been
+    backfilled (e.g. 'new_column IS NULL'), otherwise the loop does not terminate.
+
+    Args:
+        table (str): The table to update.
+        set_clause (str): The SET expressions, e.g. 'fg3_rate = fg3a::float / NULLIF(fga, 0)'.
+        where (str): The condition selecting rows still to backfill.
+        batch_size (int): The number of rows per batch.
+        pause (float): The seconds to sleep between batches, to leave I/O headroom for live traffic.
+        key_columns (Sequence[str]): The columns identifying a row. Defaults to the primary key.
+        progress (Callable[[int, Optional[int]], None]): Called after every batch with the rows done so far and the
+            initial estimate of rows to do. Defaults to logging.
+
+    Returns:
+        int: The number of rows updated.
+    """
+    connection = op.get_bind()
+    key_columns = list(key_columns or sa.inspect(connection).get_pk_constraint(table)['constrained_columns'])
+    if not key_columns:
+        raise ValueError(f"{table} has no primary key, pass key_columns")
+
+    keys = ', '.join(key_columns)
+    statement = sa.text(
+        f"UPDATE {table} SET {set_clause} WHERE ({keys}) IN ("
+        f"SELECT {keys} FROM {table} WHERE {where} LIMIT :batch_size FOR UPDATE SKIP LOCKED)"
+    )
+    remaining = sa.text(f"SELECT EXISTS (SELECT 1 FROM {table} WHERE {where})")
+
+    with op.get_context().autocommit_block():
+        total = connection.execute(sa.text(f"SELECT count(*) FROM {table} WHERE {where}")).scalar()
+        done = 0
+        started = time.perf_counter()
+        while True:
+            rows = connection.execute(statement, {'batch_size': batch_size}).rowcount
+            if rows <= 0:
+                # Nothing claimable: either done, or every remaining row is locked by a writer right now
+                if not connection.execute(remaining).scalar():
+                    break
+                time.sleep(pause)
+                continue
+            done += rows
+
+            if progress is not None:
+                progress(done, total)
+            else:
+                rate = done / max(time.perf_counter() - started, 1e-9)
+                logger.info(f"Backfilled {done}/{total} rows of {table} ({rate:.0f} rows/s)")
+            time.sleep(pause)
+
+    return done
@@ -0,0 +1,144 @@
+"""Season partition maintenance for the list partitioned game log tables.
+
+player_game_log and team_game_log are PARTITION BY LIST (season_year) with one partition per season, e.g.
+player_game_log_2023_24. Partitions have to exist before rows for a season can be inserted, so ingestion calls
+ensure_season_partitions() first. Old seasons can be detached (and optionally moved to the archive schema) without
+rewriting any data."""
+
+import logging
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from bettr.database.engine import get_sync_engine
+
+
+logger = logging.getLogger(__name__)
+
+SEASON_PARTITIONED_TABLES = ('player_game_log', 'team_game_log')
+ARCHIVE_SCHEMA = 'archive'
+
+_SEASON_PATTERN = re.compile(r'^\d{4}-\d{2}$')
+
+
+def season_partition_name(table: str, season: str) -> str:
+    """Returns the partition name of a season, e.g. player_game_log_2023_24.
+
+    Args:
+        table (str): The partitioned parent table.
+        season (str): The season string, e.g. '2023-24'.
+
+    Returns:
+        str: The partition table name.
+    """
+    if not _SEASON_PATTERN.match(season):
+        raise ValueError(f"Invalid season {season!r}, expected e.g. '2023-24'")
+    return f"{table}_{season.replace('-', '_')}"
+
+
+def create_season_partition_sql(table: str, season: str) -> str:
+    """Returns the DDL that creates a season partition if it does not exist yet.
+
+    Args:
+        table (str): The partitioned parent table.
+        season (str): The season string, e.g. '2023-24'.
+
+    Returns:
+        str: The CREATE TABLE ... PARTITION OF statement.
+    """
+    return (f"CREATE TABLE IF NOT EXISTS {season_partition_name(table, season)} "
+            f"PARTITION OF {table} FOR VALUES IN ('{season}')")
+
+
+def existing_season_partitions(connection: Connection, table: str) -> List[str]:
+    """Returns the names of the partitions currently attached to a table.
+
+    Args:
+        connection (Connection): The connection to use.
+        table (str): The partitioned parent table.
+
+    Returns:
+        List[str]: The attached partition names.
+    """
+    result = connection.execute(
+        text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = CAST(:table AS regclass)"),
+        {'table': table},
+    )
+    return sorted(result.scalars())
+
+
+def ensure_season_partitions(table: str, seasons: Iterable[str], engine: Optional[Engine] = None) -> List[str]:
+    """Creates the partitions that are missing for the given seasons.
+
+    Args:
+        table (str): The partitioned parent table.
+        seasons (Iterable[str]): The seasons about to be written.
+        engine (Engine): The engine to use. Defaults to the shared sync engine.
+
+    Returns:
+        List[str]: The partitions that were created.
+    """
+    engine = engine or get_sync_engine()
+    created = []
+    with engine.begin() as connection:
+        existing = set(existing_season_partitions(connection, table))
+        for season in sorted(set(seasons)):
+            partition = season_partition_name(table, season)
+            if partition in existing:
+                continue
+            connection.execute(text(create_season_partition_sql(table, season)))
+            created.append(partition)
+
+    if created:
+        logger.info(f"Created partitions {', '.join(created)}")
+    return created
+
+
+def detach_season_partition(table: str, season: str, archive: bool = False,
+                            engine: Optional[Engine] = None) -> str:
+    """Detaches a season partition, leaving its data in a standalone table.
+
+    DETACH ... CONCURRENTLY only takes a SHARE UPDATE EXCLUSIVE lock on the parent, so reads and writes of the other
+    seasons keep running. It cannot run inside a transaction, hence the autocommit connection.
+
+    Args:
+        table (str): The partitioned parent table.
+        season (str): The season string, e.g. '2010-11'.
+        archive (bool): If True, move the detached table into the archive schema.
+        engine (Engine): The engine to use. Defaults to the shared sync engine.
+
+    Returns:
+        str: The qualified name of the detached table.
+    """
+    engine = engine or get_sync_engine()
+    partition = season_partition_name(table, season)
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition} CONCURRENTLY"))
+        if archive:
+            connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            connection.execute(text(f"ALTER TABLE {partition} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            partition = f"{ARCHIVE_SCHEMA}.{partition}"
+
+    logger.info(f"Detached {partition} from {table}")
+    return partition
+
+
+def attach_season_partition(table: str, season: str, archived: bool = False, engine: Optional[Engine] = None) -> None:
+    """Re-attaches a previously detached season partition.
+
+    Args:
+        table (str): The partitioned parent table.
+        season (str): The season string, e.g. '2010-11'.
+        archived (bool): If True, the detached table lives in the archive schema and is moved back first.
+        engine (Engine): The engine to use. Defaults to the shared sync engine.
+    """
+    engine = engine or get_sync_engine()
+    partition = season_partition_name(table, season)
+    with engine.begin() as connection:
+        if archived:
+            connection.execute(text(f"ALTER TABLE {ARCHIVE_SCHEMA}.{partition} SET SCHEMA public"))
+        connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {partition} FOR VALUES IN ('{season}')"))
+
+    logger.info(f"Attached {partition} to {table}")
@@ -0,0 +1,154 @@
+"""Process wide asyncio Redis client over a shared, bounded connection pool.
+
+All API handlers share one pool sized by REDIS_MAX_CONNECTIONS. When every connection is busy, callers wait up to
+REDIS_TIMEOUT for one to be released instead of failing or opening unbounded sockets. Multi-key reads and writes go
+through a single non-transactional pipeline, i.e. one round trip. redis_pool_metrics() exposes pool utilisation."""
+
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Optional, Union
+
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from bettr.config.settings import settings
+
+
+class MeteredConnectionPool(BlockingConnectionPool):
+    """A blocking connection pool that counts checkouts, connections in use and checkout wait times."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._metrics_lock = threading.Lock()
+
+    async def get_connection(self, *args, **kwargs):
+        started = time.perf_counter()
+        connection = await super().get_connection(*args, **kwargs)
+        waited = time.perf_counter() - started
+        with self._metrics_lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return connection
+
+    async def release(self, connection) -> None:
+        await super().release(connection)
+        with self._metrics_lock:
+            self.in_use -= 1
+
+    def snapshot(self) -> Dict[str, Union[int, float]]:
+        """Returns the counters together with the pool limits."""
+        with self._metrics_lock:
+            return {
+                'max_connections': self.max_connections,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'utilisation': self.in_use / self.max_connections,
+                'checkouts': self.checkouts,
+                'wait_avg_ms': 1000 * self.wait_total / self.checkouts if self.checkouts else 0.0,
+                'wait_max_ms': 1000 * self.wait_max,
+            }
+
+
+@lru_cache()
+def get_redis_pool() -> MeteredConnectionPool:
+    """Get the process wide Redis connection pool.
+
+    Returns:
+        MeteredConnectionPool: The pool, sized from the REDIS_* settings.
+    """
+    return MeteredConnectionPool(
+        host=settings.REDIS_HOST,
+        port=int(settings.REDIS_PORT),
+        db=int(settings.REDIS_DB),
+        password=settings.REDIS_PASSWORD or None,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_TIMEOUT,
+        socket_timeout=settings.REDIS_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        decode_responses=True,
+    )
+
+
+@lru_cache()
+def get_redis() -> Redis:
+    """Get the process wide asyncio Redis client.
+
+    Returns:
+        Redis: The client, bound to the shared pool.
+    """
+    return Redis(connection_pool=get_redis_pool())
+
+
+async def mget(keys: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Reads several keys in one round trip.
+
+    Args:
+        keys (Iterable[str]): The keys to read.
+
+    Returns:
+        Dict[str, Optional[str]]: The values by key, None for missing keys.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    return dict(zip(keys, await get_redis().mget(keys)))
+
+
+async def mset(mapping: Mapping[str, str], ttl: Optional[int] = None) -> None:
+    """Writes several keys in one round trip.
+
+    Args:
+        mapping (Mapping[str, str]): The values by key.
+        ttl (int): The expiry in seconds. Defaults to no expiry.
+    """
+    if not mapping:
+        return
+    if ttl is None:
+        await get_redis().mset(dict(mapping))
+        return
+
+    async with get_redis().pipeline(transaction=False) as pipe:
+        for key, value in mapping.items():
+            pipe.set(key, value, ex=ttl)
+        await pipe.execute()
+
+
+async def delete_many(keys: Iterable[str]) -> int:
+    """Deletes several keys in one round trip.
+
+    Args:
+        keys (Iterable[str]): The keys to delete.
+
+    Returns:
+        int: The number of keys that existed.
+    """
+    keys = list(keys)
+    if not keys:
+        return 0
+    return await get_redis().delete(*keys)
+
+
+def redis_pool_metrics() -> Dict[str, Union[int, float]]:
+    """Returns the utilisation of the Redis pool, or an empty dict if it has not been created yet.
+
+    Returns:
+        Dict[str, Union[int, float]]: The pool metrics.
+    """
+    if not get_redis_pool.cache_info().currsize:
+        return {}
+    return get_redis_pool().snapshot()
+
+
+async def close_redis() -> None:
+    """Closes every pooled connection. Call on application shutdown."""
+    if get_redis_pool.cache_info().currsize:
+        await get_redis_pool().disconnect()
@@ -1,14 +1,96 @@
 """Base model for all models in the app."""
 
+import io
 import re
 import logging
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
-from sqlalchemy import inspect, select
+from types import MappingProxyType
+from typing import (Any, Dict, FrozenSet, Iterator, List, Literal, Mapping, NamedTuple, Optional, Sequence, Tuple,
+                    Type, Union)
+
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import ColumnElement, event, inspect, select
 from sqlalchemy.orm import declared_attr
 from sqlmodel import SQLModel
 
+from bettr.database.engine import get_sync_engine, sync_connection
+from bettr.models.validation import ValidationReport, validate_frame
+
+
+class UpsertResult(NamedTuple):
+    """Row counts of a bulk upsert."""
+
+    inserted: int
+    updated: int
+    skipped: int
+
+
+@dataclass(frozen=True)
+class ModelMetadata:
+    """Table metadata of a model, computed once per class."""
+
+    primary_keys: Tuple[str, ...]
+    columns: Tuple[str, ...]
+    column_set: FrozenSet[str]
+    dtypes: Mapping[str, Optional[type]]
+    nullable: FrozenSet[str]
+    relationships: Mapping[str, str]
+
+
+_MODEL_METADATA: Dict[type, ModelMetadata] = {}
+
+
+def build_model_metadata(cls) -> ModelMetadata:
+    """Reflects a mapped model's table and relationships into a ModelMetadata."""
+    mapper = inspect(cls)
+    columns = tuple(column.name for column in cls.__table__.columns)
+
+    dtypes = {}
+    for column in cls.__table__.columns:
+        try:
+            dtypes[column.name] = column.type.python_type
+        except NotImplementedError:
+            dtypes[column.name] = None
+
+    return ModelMetadata(
+        primary_keys=tuple(column.name for column in cls.__table__.primary_key.columns),
+        columns=columns,
+        column_set=frozenset(columns),
+        dtypes=MappingProxyType(dtypes),
+        nullable=frozenset(column.name for column in cls.__table__.columns if column.nullable),
+        relationships=MappingProxyType(
+            {relationship.key: relationship.mapper.class_.__name__ for relationship in mapper.relationships}),
+    )
+
+
+def restore_dtypes(df: pd.DataFrame, dtypes: Mapping[str, Optional[type]]) -> pd.DataFrame:
+    """Casts integer and boolean columns back to their table types, as pandas' nullable Int64 and boolean.
+
+    Integer columns that hold a NaN, or arrive as floats like nba_api's PLUS_MINUS, are float64 and would be
+    written as 10.0, which COPY rejects for an INTEGER column and JSON clients read as a float.
+
+    Args:
+        df (pd.DataFrame): The rows to load.
+        dtypes (Mapping[str, Optional[type]]): The python type of each table column, see ModelMetadata.
+
+    Returns:
+        pd.DataFrame: The frame with Int64 and boolean columns where the table expects them.
+
+    Raises:
+        TypeError: If an integer column holds fractional values.
+    """
+    casts = {}
+    for column in df.columns:
+        python_type = dtypes.get(column)
+        if python_type is bool and not pd.api.types.is_bool_dtype(df[column]):
+            casts[column] = df[column].astype('boolean')
+        elif python_type is int and not pd.api.types.is_integer_dtype(df[column]):
+            casts[column] = pd.to_numeric(df[column]).astype('Int64')
+    return df.assign(**casts) if casts else df
+
 
 class BaseModel(SQLModel, ABC):
     @declared_attr.directive
@@ -21,79 +103,228 @@ class BaseModel(SQLModel, ABC):
         raise NotImplementedError(
             f"Populate method not implemented for {cls.__name__}")
 
+    @classmethod
+    @property
+    def model_meta(cls) -> ModelMetadata:
+        """Returns the model's precomputed, immutable table metadata."""
+        meta = _MODEL_METADATA.get(cls)
+        if meta is None:
+            meta = _MODEL_METADATA[cls] = build_model_metadata(cls)
+        return meta
+
     @classmethod
     @property
     def primary_key(cls) -> str:
-        """Returns the primary key for the model."""
-        return inspect(cls).primary_key[0].name
+        """Returns the primary key for the model. See primary_keys for composite keys."""
+        return cls.model_meta.primary_keys[0]
+
+    @classmethod
+    @property
+    def primary_keys(cls) -> Tuple[str, ...]:
+        """Returns every primary key column for the model, in table order."""
+        return cls.model_meta.primary_keys
 
     @classmethod
     @property
-    def columns(cls) -> List[str]:
+    def columns(cls) -> Tuple[str, ...]:
         """Returns the columns for the model."""
-        return [column.name for column in inspect(cls).columns]
+        return cls.model_meta.columns
 
     @classmethod
     @property
-    def relationships(cls) -> List[str]:
+    def relationships(cls) -> Tuple[str, ...]:
         """Returns the relationships for the model."""
-        return [relationship.key for relationship in inspect(cls).relationships]
+        return tuple(cls.model_meta.relationships)
 
     @classmethod
-    def save_dfs(cls, df):
-        df_save = df.merge(
-            cls.primary_key,
-            how='left',
-            indicator=True
+    def bulk_upsert(cls, df, engine=None, on_conflict: Literal['update', 'nothing'] = 'update',
+                    chunk_size: int = 100_000) -> UpsertResult:
+        """Bulk loads a DataFrame through PostgreSQL COPY and a single INSERT ... ON CONFLICT.
+
+        The frame is streamed in CSV chunks into a temporary table, then merged into the model's table on its
+        primary key. With on_conflict='update' only rows whose values actually changed are rewritten, so
+        re-loading the same frame is idempotent and reports every row as skipped.
+
+        Args:
+            df (pd.DataFrame): The rows to load. Columns that are not on the table are ignored.
+            engine (sqlalchemy.engine.Engine): A sync PostgreSQL engine (psycopg2). Defaults to the shared
+                sync engine.
+            on_conflict (str): 'update' to overwrite existing rows, 'nothing' to keep them.
+            chunk_size (int): The number of rows per COPY chunk.
+
+        Returns:
+            UpsertResult: The inserted, updated and skipped row counts.
+        """
+        table = cls.__table__
+        preparer = (engine or get_sync_engine()).dialect.identifier_preparer
+        pk_columns = list(cls.model_meta.primary_keys)
+        columns = [column for column in cls.model_meta.columns if column in df.columns]
+        update_columns = [column for column in columns if column not in pk_columns]
 
+        # ON CONFLICT cannot touch the same row twice in one statement, so the last row per key wins
+        df_load = restore_dtypes(df[columns].drop_duplicates(subset=pk_columns, keep='last'), cls.model_meta.dtypes)
+
+        target = preparer.format_table(table)
+        staging = preparer.quote(f"_stage_{table.name}")
+        column_list = ', '.join(preparer.quote(column) for column in columns)
+        pk_list = ', '.join(preparer.quote(column) for column in pk_columns)
+
+        if on_conflict == 'update' and update_columns:
+            assignments = ', '.join(
+                f"{preparer.quote(column)} = EXCLUDED.{preparer.quote(column)}" for column in update_columns)
+            current = ', '.join(f"{target}.{preparer.quote(column)}" for column in update_columns)
+            excluded = ', '.join(f"EXCLUDED.{preparer.quote(column)}" for column in update_columns)
+            conflict_action = f"DO UPDATE SET {assignments} WHERE ROW({current}) IS DISTINCT FROM ROW({excluded})"
+        else:
+            conflict_action = "DO NOTHING"
+
+        upsert_sql = (
+            f"WITH upserted AS ("
+            f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT ({pk_list}) {conflict_action} "
+            f"RETURNING (xmax = 0) AS inserted) "
+            f"SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted"
         )
-        df_save = df_save[df_save['_merge'] == 'left_only']
+
+        # COPY needs the driver's cursor, which runs inside the connection's transaction
+        with sync_connection(engine) as connection, connection.begin():
+            with connection.connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {staging} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP")
+
+                for start in range(0, len(df_load), chunk_size):
+                    buffer = io.StringIO()
+                    df_load.iloc[start:start + chunk_size].to_csv(buffer, index=False, header=False)
+                    buffer.seek(0)
+                    cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+                cursor.execute(upsert_sql)
+                inserted, updated = cursor.fetchone()
+
+        result = UpsertResult(inserted=inserted, updated=updated, skipped=len(df) - inserted - updated)
+        logging.info(f"Upserted {len(df)} rows into {cls.__tablename__}: {result}")
+        return result
+
+    @classmethod
+    def save_dfs(cls, df, engine=None, on_conflict: Literal['update', 'nothing'] = 'nothing') -> UpsertResult:
+        """Validates a DataFrame and bulk loads it into the model's table, see bulk_upsert.
+
+        Args:
+            df (pd.DataFrame): The rows to save. Columns that are not on the table are dropped.
+            engine (sqlalchemy.engine.Engine): A sync PostgreSQL engine (psycopg2). Defaults to the shared
+                sync engine.
+            on_conflict (str): 'nothing' to keep rows whose primary key already exists, 'update' to overwrite them.
+
+        Returns:
+            UpsertResult: The inserted, updated and skipped row counts.
+        """
+        columns_to_drop = [column for column in df.columns if column not in cls.model_meta.column_set]
+        df_save = df.drop(columns=columns_to_drop, axis=1)
 
         if df_save.empty:
-            logging.info(f"All primary keys already in {cls.__name__}")
-            return
-
-        columns_to_drop = set(df_save.columns) - \
-            set(cls.__table__.columns.keys())
-        df_save = df_save.drop(columns=columns_to_drop, axis=1)
-        cls.model_validate(df_save)
-        df_save.to_sql(
-            cls.__tablename__,
-            con=cls.db,
-            if_exists='append',
-            index=False
-        )
-        logging.info(f"Successfully saved {
-                     len(df_save)} rows to {cls.__tablename__}")
+            logging.info(f"No rows to save to {cls.__tablename__}")
+            return UpsertResult(inserted=0, updated=0, skipped=0)
+
+        cls.validate_df_model(df_save)
+        return cls.bulk_upsert(df_save, engine, on_conflict=on_conflict)
 
     @classmethod
-    def validate_df_model(cls, df) -> None:
-        """Validates the model's data."""
-        class DataFrameModel(BaseModel):
-            __tablename__: str = cls.__tablename__
-            __table__ = cls.__table__
-            __database__ = cls.__database__
-            __root__: list[cls]
+    def validate_df_model(cls, df) -> ValidationReport:
+        """Validates a DataFrame against the model's columns, see bettr.models.validation.
 
-        try:
-            df_model = df.to_dict(orient='records')
-            DataFrameModel.from_list(df_model)
-        except Exception as e:
-            raise ValueError(f"Validation failed for {cls.__name__}") from e
+        Args:
+            df (pd.DataFrame): The rows to validate.
+
+        Returns:
+            ValidationReport: The report, which is always ok when this returns.
+
+        Raises:
+            ValueError: If any row fails validation.
+        """
+        report = validate_frame(cls, df)
+        if not report.ok:
+            raise ValueError(
+                f"Validation failed for {cls.__name__} on {len(report.failing_rows)} rows: {report.summary()}")
         logging.info(f"DataFrame validation passed for {cls.__name__}")
+        return report
 
     @classmethod
-    def model_validate(cls, model) -> None:
-        """Validates the model's data."""
-        try:
-            cls.from_orm(model)
-        except Exception as e:
-            raise ValueError(f"Model validation failed for {
-                             cls.__name__}") from e
+    def _where_clauses(cls, filters: Optional[Dict[str, Any]] = None,
+                       where: Optional[Sequence[ColumnElement]] = None) -> List[ColumnElement]:
+        """Turns column filters into SQL where clauses.
+
+        Args:
+            filters (Dict[str, Any]): Column name to value. A list, tuple or set becomes IN, None becomes IS NULL,
+                anything else becomes equality.
+            where (Sequence[ColumnElement]): Extra SQLAlchemy expressions, e.g. [Model.game_date >= start].
+
+        Returns:
+            List[ColumnElement]: The where clauses.
+        """
+        clauses = list(where or [])
+        for name, value in (filters or {}).items():
+            column = cls.__table__.c[name]
+            if value is None:
+                clauses.append(column.is_(None))
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                clauses.append(column.in_(list(value)))
+            else:
+                clauses.append(column == value)
+        return clauses
+
+    @classmethod
+    def iter_frames(cls, columns: Optional[Sequence[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                    where: Optional[Sequence[ColumnElement]] = None, order_by: Optional[Sequence[str]] = None,
+                    chunk_size: int = 50_000, engine=None) -> Iterator[pd.DataFrame]:
+        """Streams the model's rows as DataFrames of at most chunk_size rows.
+
+        The query runs over a server-side cursor and only selects the requested columns, so memory stays
+        constant no matter how many rows match and no ORM objects are built.
+
+        Args:
+            columns (Sequence[str]): The columns to read. Defaults to every column.
+            filters (Dict[str, Any]): Column filters pushed into the SQL, see _where_clauses.
+            where (Sequence[ColumnElement]): Extra SQLAlchemy where expressions.
+            order_by (Sequence[str]): The columns to order by. Defaults to no ordering.
+            chunk_size (int): The number of rows per chunk.
+            engine (sqlalchemy.engine.Engine): The engine to read with. Defaults to the shared sync engine.
+
+        Yields:
+            pd.DataFrame: The next chunk of rows.
+        """
+        table = cls.__table__
+        statement = select(*[table.c[name] for name in columns] if columns else table.c)
+        for clause in cls._where_clauses(filters, where):
+            statement = statement.where(clause)
+        if order_by:
+            statement = statement.order_by(*[table.c[name] for name in order_by])
+
+        with sync_connection(engine) as connection:
+            result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(statement)
+            keys = list(result.keys())
+            for rows in result.partitions():
+                yield pd.DataFrame.from_records(rows, columns=keys)
+
+    @classmethod
+    def iter_record_batches(cls, columns: Optional[Sequence[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                            where: Optional[Sequence[ColumnElement]] = None, order_by: Optional[Sequence[str]] = None,
+                            chunk_size: int = 50_000, engine=None) -> Iterator[pa.RecordBatch]:
+        """Streams the model's rows as Arrow record batches, see iter_frames for the arguments."""
+        for df in cls.iter_frames(columns, filters, where, order_by, chunk_size, engine):
+            yield pa.RecordBatch.from_pandas(df, preserve_index=False)
+
+    @classmethod
+    def read_df(cls, columns: Optional[Sequence[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                where: Optional[Sequence[ColumnElement]] = None, order_by: Optional[Sequence[str]] = None,
+                engine=None) -> pd.DataFrame:
+        """Reads the matching rows into a single DataFrame, see iter_frames for the arguments."""
+        frames = list(cls.iter_frames(columns, filters, where, order_by, engine=engine))
+        if not frames:
+            return pd.DataFrame(columns=list(columns or cls.model_meta.columns))
+        return pd.concat(frames, ignore_index=True)
 
-        logging.info(f"Model validation passed for {cls.__name__}")
 
-#   @classmethod
-#   def get(cls, **kwargs) -> Optional[SQLModel]:
-#       """Returns a single model from the database."""
-#       return cls.db.execute(select(cls).filter_by(**kwargs)).first()
+@event.listens_for(BaseModel, 'mapper_configured', propagate=True)
+def _cache_model_metadata(mapper, cls) -> None:
+    """Builds each model's metadata as soon as its mapper is configured, so the hot paths never reflect."""
+    _MODEL_METADATA[cls] = build_model_metadata(cls)
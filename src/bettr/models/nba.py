@@ -0,0 +1,126 @@
+"""NBA game log and player prop aggregate models.
+
+The game log tables are list partitioned by season_year, one partition per season (see bettr.database.partitions), so the
+partition key is part of their primary keys. Their indexes are declared on the parent and cascade to every partition."""
+
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import Column, DateTime, Float, Index, func, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import Field
+
+from bettr.models.base import BaseModel
+
+# Box score columns carried in the player index so last-N prop lookups are index only scans
+PROP_INDEX_COLUMNS = ['game_id', 'pts', 'reb', 'ast', 'fg3m', 'stl', 'blk', 'tov']
+
+
+class PlayerGameLog(BaseModel, table=True):
+    """One player's box score line in one game, as returned by the PlayerGameLogs endpoint."""
+
+    __table_args__ = (
+        Index('ix_player_game_log_player_id_game_date', 'player_id', text('game_date DESC'),
+              postgresql_include=PROP_INDEX_COLUMNS),
+        Index('ix_player_game_log_team_id_game_date', 'team_id', text('game_date DESC')),
+        Index('ix_player_game_log_game_id', 'game_id'),
+        Index('ix_player_game_log_game_date_brin', 'game_date', postgresql_using='brin'),
+        {'postgresql_partition_by': 'LIST (season_year)'},
+    )
+
+    player_id: int = Field(primary_key=True)
+    game_id: str = Field(primary_key=True, max_length=10)
+    season_year: str = Field(primary_key=True, max_length=7)
+    season_type: str = Field(max_length=20)
+    player_name: Optional[str] = Field(default=None, max_length=100)
+    team_id: int
+    team_abbreviation: Optional[str] = Field(default=None, max_length=3)
+    game_date: date
+    matchup: Optional[str] = Field(default=None, max_length=20)
+    wl: Optional[str] = Field(default=None, max_length=1)
+    min: Optional[float] = Field(default=None, ge=0)
+    fgm: Optional[int] = Field(default=None, ge=0)
+    fga: Optional[int] = Field(default=None, ge=0)
+    fg_pct: Optional[float] = Field(default=None, ge=0, le=1)
+    fg3m: Optional[int] = Field(default=None, ge=0)
+    fg3a: Optional[int] = Field(default=None, ge=0)
+    fg3_pct: Optional[float] = Field(default=None, ge=0, le=1)
+    ftm: Optional[int] = Field(default=None, ge=0)
+    fta: Optional[int] = Field(default=None, ge=0)
+    ft_pct: Optional[float] = Field(default=None, ge=0, le=1)
+    oreb: Optional[int] = Field(default=None, ge=0)
+    dreb: Optional[int] = Field(default=None, ge=0)
+    reb: Optional[int] = Field(default=None, ge=0)
+    ast: Optional[int] = Field(default=None, ge=0)
+    tov: Optional[int] = Field(default=None, ge=0)
+    stl: Optional[int] = Field(default=None, ge=0)
+    blk: Optional[int] = Field(default=None, ge=0)
+    blka: Optional[int] = Field(default=None, ge=0)
+    pf: Optional[int] = Field(default=None, ge=0)
+    pfd: Optional[int] = Field(default=None, ge=0)
+    pts: Optional[int] = Field(default=None, ge=0)
+    plus_minus: Optional[int] = None
+
+
+class TeamGameLog(BaseModel, table=True):
+    """One team's box score line in one game, as returned by the TeamGameLogs endpoint."""
+
+    __table_args__ = (
+        Index('ix_team_game_log_team_id_game_date', 'team_id', text('game_date DESC'),
+              postgresql_include=['game_id', 'wl', 'pts', 'plus_minus']),
+        Index('ix_team_game_log_game_id', 'game_id'),
+        Index('ix_team_game_log_game_date_brin', 'game_date', postgresql_using='brin'),
+        {'postgresql_partition_by': 'LIST (season_year)'},
+    )
+
+    team_id: int = Field(primary_key=True)
+    game_id: str = Field(primary_key=True, max_length=10)
+    season_year: str = Field(primary_key=True, max_length=7)
+    season_type: str = Field(max_length=20)
+    team_abbreviation: Optional[str] = Field(default=None, max_length=3)
+    team_name: Optional[str] = Field(default=None, max_length=50)
+    game_date: date
+    matchup: Optional[str] = Field(default=None, max_length=20)
+    wl: Optional[str] = Field(default=None, max_length=1)
+    min: Optional[float] = Field(default=None, ge=0)
+    fgm: Optional[int] = Field(default=None, ge=0)
+    fga: Optional[int] = Field(default=None, ge=0)
+    fg_pct: Optional[float] = Field(default=None, ge=0, le=1)
+    fg3m: Optional[int] = Field(default=None, ge=0)
+    fg3a: Optional[int] = Field(default=None, ge=0)
+    fg3_pct: Optional[float] = Field(default=None, ge=0, le=1)
+    ftm: Optional[int] = Field(default=None, ge=0)
+    fta: Optional[int] = Field(default=None, ge=0)
+    ft_pct: Optional[float] = Field(default=None, ge=0, le=1)
+    oreb: Optional[int] = Field(default=None, ge=0)
+    dreb: Optional[int] = Field(default=None, ge=0)
+    reb: Optional[int] = Field(default=None, ge=0)
+    ast: Optional[int] = Field(default=None, ge=0)
+    tov: Optional[int] = Field(default=None, ge=0)
+    stl: Optional[int] = Field(default=None, ge=0)
+    blk: Optional[int] = Field(default=None, ge=0)
+    blka: Optional[int] = Field(default=None, ge=0)
+    pf: Optional[int] = Field(default=None, ge=0)
+    pfd: Optional[int] = Field(default=None, ge=0)
+    pts: Optional[int] = Field(default=None, ge=0)
+    plus_minus: Optional[int] = None
+
+
+class PlayerPropAggregate(BaseModel, table=True):
+    """A player's last-N-games values of one prop stat, kept up to date after every ingestion."""
+
+    player_id: int = Field(primary_key=True)
+    stat: str = Field(primary_key=True, max_length=20)
+    window_size: int = Field(primary_key=True, gt=0)
+    games: int = Field(ge=0)
+    average: Optional[float] = None
+    stat_values: List[float] = Field(default_factory=list, sa_column=Column(ARRAY(Float), nullable=False))
+    last_game_date: Optional[date] = None
+    updated_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False))
+
+    def hit_rate(self, line: float) -> Optional[float]:
+        """Returns the share of the window's games in which the stat went over the line."""
+        if not self.stat_values:
+            return None
+        return sum(value > line for value in self.stat_values) / len(self.stat_values)
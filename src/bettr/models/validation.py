@@ -0,0 +1,244 @@
+"""Vectorized, column-wise DataFrame validation for SQLModel table models.
+
+Column rules (nullability, type, length, enum choices and numeric bounds) are derived once per model from its table and
+pydantic field metadata, then checked a whole column at a time with pandas/NumPy operations. Null, length, choice and
+bound violations are final. Rows that only fail a type check are re-validated one by one through the model's own
+pydantic validation, which decides whether the value can be coerced."""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Type
+
+import annotated_types
+import numpy as np
+import pandas as pd
+from pydantic import ValidationError
+from sqlalchemy import Enum as SAEnum
+
+
+logger = logging.getLogger(__name__)
+
+# Suffix of the rules that only flag candidates for pydantic's coercion, see validate_frame
+TYPE_RULE = ': type'
+
+
+@dataclass(frozen=True)
+class ColumnRule:
+    """Validation rules for a single table column."""
+
+    name: str
+    required: bool
+    nullable: bool
+    python_type: Optional[type] = None
+    max_length: Optional[int] = None
+    choices: Optional[Tuple[Any, ...]] = None
+    ge: Optional[float] = None
+    gt: Optional[float] = None
+    le: Optional[float] = None
+    lt: Optional[float] = None
+
+
+@dataclass
+class ValidationReport:
+    """Result of validating a DataFrame against a model."""
+
+    violations: Dict[str, pd.Index] = field(default_factory=dict)
+    errors: Dict[Any, str] = field(default_factory=dict)
+
+    @property
+    def failing_rows(self) -> pd.Index:
+        """Returns the index labels of the rows that failed validation."""
+        return pd.Index(list(self.errors))
+
+    @property
+    def ok(self) -> bool:
+        """Returns whether every row passed."""
+        return not self.errors
+
+    def summary(self) -> str:
+        """Returns a short description of the violated rules."""
+        return '; '.join(f"{rule}: {len(index)} rows" for rule, index in self.violations.items())
+
+
+def _python_type(column) -> Optional[type]:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def rules_for_model(model: Type) -> Tuple[ColumnRule, ...]:
+    """
+    Derives the column rules of a SQLModel table model.
+
+    Parameters:
+    model (Type[SQLModel]): The table model.
+
+    Returns:
+    Tuple[ColumnRule, ...]: One rule per table column.
+    """
+    rules = []
+    for column in model.__table__.columns:
+        bounds: Dict[str, Any] = {}
+        max_length = getattr(column.type, 'length', None)
+
+        model_field = model.model_fields.get(column.name)
+        for constraint in (model_field.metadata if model_field is not None else []):
+            if isinstance(constraint, annotated_types.Ge):
+                bounds['ge'] = constraint.ge
+            elif isinstance(constraint, annotated_types.Gt):
+                bounds['gt'] = constraint.gt
+            elif isinstance(constraint, annotated_types.Le):
+                bounds['le'] = constraint.le
+            elif isinstance(constraint, annotated_types.Lt):
+                bounds['lt'] = constraint.lt
+            elif isinstance(constraint, annotated_types.MaxLen):
+                max_length = constraint.max_length
+
+        has_default = (
+            column.default is not None
+            or column.server_default is not None
+            or (column.primary_key and column.autoincrement in (True, 'auto') and _python_type(column) is int)
+        )
+        rules.append(ColumnRule(
+            name=column.name,
+            required=not column.nullable and not has_default,
+            nullable=bool(column.nullable),
+            python_type=_python_type(column),
+            max_length=max_length,
+            choices=tuple(column.type.enums) if isinstance(column.type, SAEnum) else None,
+            **bounds,
+        ))
+    return tuple(rules)
+
+
+def _type_violations(series: pd.Series, python_type: Optional[type]) -> pd.Series:
+    """Returns a mask of the non-null values that cannot be stored as python_type."""
+    present = series.notna()
+    if python_type is None or not present.any():
+        return pd.Series(False, index=series.index)
+
+    if python_type is bool:
+        if pd.api.types.is_bool_dtype(series):
+            return pd.Series(False, index=series.index)
+        return present & ~series.isin([True, False, 0, 1])
+
+    if python_type in (int, float):
+        numbers = series if pd.api.types.is_numeric_dtype(series) else pd.to_numeric(series, errors='coerce')
+        bad = present & numbers.isna()
+        if python_type is int and pd.api.types.is_float_dtype(numbers):
+            bad |= present & (np.mod(numbers.fillna(0), 1) != 0)
+        return bad
+
+    if python_type in (datetime, date):
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return pd.Series(False, index=series.index)
+        return present & pd.to_datetime(series, errors='coerce').isna()
+
+    if python_type is str:
+        if pd.api.types.is_string_dtype(series) and pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+            return pd.Series(False, index=series.index)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return pd.Series(False, index=series.index)
+        return present & ~series.map(lambda value: isinstance(value, str), na_action='ignore').fillna(True).astype(bool)
+
+    return pd.Series(False, index=series.index)
+
+
+def check_frame(model: Type, df: pd.DataFrame) -> Dict[str, pd.Index]:
+    """
+    Checks every column rule of a model against a DataFrame with vectorized operations.
+
+    Parameters:
+    model (Type[SQLModel]): The table model.
+    df (pd.DataFrame): The rows to check.
+
+    Returns:
+    Dict[str, pd.Index]: The index labels of the offending rows, keyed by '<column>: <rule>'.
+    """
+    violations: Dict[str, pd.Index] = {}
+
+    def record(rule: str, mask: pd.Series) -> None:
+        if mask.any():
+            violations[rule] = df.index[mask.to_numpy()]
+
+    for rule in rules_for_model(model):
+        if rule.name not in df.columns:
+            if rule.required:
+                violations[f"{rule.name}: missing"] = df.index
+            continue
+
+        series = df[rule.name]
+        present = series.notna()
+
+        if not rule.nullable:
+            record(f"{rule.name}: null", ~present)
+
+        record(f"{rule.name}{TYPE_RULE}", _type_violations(series, rule.python_type))
+
+        if rule.max_length is not None:
+            lengths = series.astype('string').str.len()
+            record(f"{rule.name}: length > {rule.max_length}", present & (lengths > rule.max_length).fillna(False))
+
+        if rule.choices is not None:
+            record(f"{rule.name}: not in choices", present & ~series.isin(rule.choices))
+
+        bounds = [('ge', np.less), ('gt', np.less_equal), ('le', np.greater), ('lt', np.greater_equal)]
+        if any(getattr(rule, name) is not None for name, _ in bounds):
+            numbers = pd.to_numeric(series, errors='coerce')
+            for name, breaks in bounds:
+                limit = getattr(rule, name)
+                if limit is not None:
+                    record(f"{rule.name}: {name} {limit}", present & breaks(numbers, limit).fillna(False))
+
+    return violations
+
+
+def validate_frame(model: Type, df: pd.DataFrame) -> ValidationReport:
+    """
+    Validates a DataFrame against a SQLModel table model.
+
+    The column rules are checked vectorized first. A row that breaks a null, length, choice or bound rule fails. Rows
+    that only break a type rule are validated individually with the model's pydantic validation, so values pydantic
+    can coerce (e.g. '12' for an int) are still accepted.
+
+    Parameters:
+    model (Type[SQLModel]): The table model.
+    df (pd.DataFrame): The rows to validate.
+
+    Returns:
+    ValidationReport: The violated rules and the per-row errors of the rows that failed.
+    """
+    report = ValidationReport(violations=check_frame(model, df))
+    if not report.violations:
+        return report
+
+    for rule, index in report.violations.items():
+        if not rule.endswith(TYPE_RULE):
+            for label in index:
+                report.errors[label] = f"{report.errors[label]}; {rule}" if label in report.errors else rule
+
+    type_rules = [rule for rule in report.violations if rule.endswith(TYPE_RULE)]
+    suspects = pd.Index([]).append([report.violations[rule] for rule in type_rules]).unique()
+    suspects = suspects.difference(pd.Index(list(report.errors)), sort=False)
+    if len(suspects):
+        columns = [rule.name for rule in rules_for_model(model) if rule.name in df.columns]
+        rows = df.loc[suspects, columns].astype(object).where(df.loc[suspects, columns].notna(), None)
+        for label, row in zip(rows.index, rows.to_dict(orient='records')):
+            try:
+                model.model_validate(row)
+            except ValidationError as e:
+                report.errors[label] = str(e)
+
+    # Type rules only flag candidates; a row pydantic accepts is not a violation
+    failing = pd.Index(list(report.errors))
+    for rule in type_rules:
+        index = report.violations[rule].intersection(failing)
+        if len(index):
+            report.violations[rule] = index
+        else:
+            del report.violations[rule]
+    return report
@@ -0,0 +1,176 @@
+"""Player prop aggregates: last-N-games values, averages and hit rates per player and stat.
+
+player_prop_aggregate holds one row per player x stat x window, maintained incrementally: after each ingestion only the
+players who appeared in the new games are recomputed, in a single set-based statement. API reads are then a primary key
+lookup plus a hit rate over at most a few dozen values."""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from bettr.api.cache import invalidate_tags_sync, player_tag
+from bettr.database.engine import get_sync_engine
+from bettr.database.partitions import ensure_season_partitions
+from bettr.models.base import UpsertResult
+from bettr.models.nba import PROP_INDEX_COLUMNS, PlayerGameLog, PlayerPropAggregate
+
+
+logger = logging.getLogger(__name__)
+
+# Prop stat name -> SQL expression over player_game_log columns
+PROP_STATS: Dict[str, str] = {
+    'pts': 'pts',
+    'reb': 'reb',
+    'ast': 'ast',
+    'fg3m': 'fg3m',
+    'stl': 'stl',
+    'blk': 'blk',
+    'tov': 'tov',
+    'pts_reb_ast': 'pts + reb + ast',
+    'pts_reb': 'pts + reb',
+    'pts_ast': 'pts + ast',
+    'reb_ast': 'reb + ast',
+    'stl_blk': 'stl + blk',
+}
+
+PROP_WINDOWS: Tuple[int, ...] = (5, 10, 20)
+
+
+def _refresh_sql() -> str:
+    """Builds the upsert that recomputes the aggregates of the affected players."""
+    game_log = PlayerGameLog.__tablename__
+    aggregate = PlayerPropAggregate.__tablename__
+    columns = ', '.join(f'g.{column}' for column in PROP_INDEX_COLUMNS if column != 'game_id')
+    stat_values = ',\n                '.join(
+        f"('{stat}', ({expression})::float8)" for stat, expression in PROP_STATS.items())
+
+    return f"""
+        WITH affected AS (
+            SELECT DISTINCT player_id FROM {game_log} WHERE game_id = ANY(:game_ids)
+            UNION
+            SELECT unnest(CAST(:player_ids AS bigint[]))
+        ),
+        ranked AS (
+            SELECT g.player_id, g.game_date, {columns},
+                   row_number() OVER (PARTITION BY g.player_id ORDER BY g.game_date DESC, g.game_id DESC) AS rn
+            FROM {game_log} g
+            WHERE g.player_id IN (SELECT player_id FROM affected)
+        ),
+        recent AS (
+            SELECT r.player_id, r.game_date, r.rn, s.stat, s.value
+            FROM ranked r
+            CROSS JOIN LATERAL (VALUES
+                {stat_values}
+            ) AS s(stat, value)
+            WHERE r.rn <= :max_window
+        )
+        INSERT INTO {aggregate} (player_id, stat, window_size, games, average, stat_values, last_game_date, updated_at)
+        SELECT recent.player_id, recent.stat, w.window_size, count(*), avg(recent.value),
+               COALESCE(array_agg(recent.value ORDER BY recent.rn) FILTER (WHERE recent.value IS NOT NULL), '{{}}'),
+               max(recent.game_date), now()
+        FROM recent
+        JOIN unnest(CAST(:windows AS integer[])) AS w(window_size) ON recent.rn <= w.window_size
+        GROUP BY recent.player_id, recent.stat, w.window_size
+        ON CONFLICT (player_id, stat, window_size) DO UPDATE SET
+            games = EXCLUDED.games,
+            average = EXCLUDED.average,
+            stat_values = EXCLUDED.stat_values,
+            last_game_date = EXCLUDED.last_game_date,
+            updated_at = EXCLUDED.updated_at
+    """
+
+
+def refresh_player_prop_aggregates(game_ids: Optional[Iterable[str]] = None,
+                                   player_ids: Optional[Iterable[int]] = None, engine=None) -> int:
+    """
+    Recomputes the prop aggregates of the players who played in the given games.
+
+    Parameters:
+    game_ids (Iterable[str]): The newly ingested games. Every player in them is refreshed.
+    player_ids (Iterable[int]): Additional players to refresh.
+    engine (sqlalchemy.engine.Engine): The engine to use. Defaults to the shared sync engine.
+
+    Returns:
+    int: The number of aggregate rows written.
+    """
+    game_ids = [str(game_id) for game_id in game_ids or []]
+    player_ids = [int(player_id) for player_id in player_ids or []]
+    if not game_ids and not player_ids:
+        return 0
+
+    statement = text(_refresh_sql()).bindparams(
+        bindparam('game_ids', value=game_ids),
+        bindparam('player_ids', value=player_ids),
+        bindparam('windows', value=list(PROP_WINDOWS)),
+        bindparam('max_window', value=max(PROP_WINDOWS)),
+    )
+    engine = engine or get_sync_engine()
+    with engine.begin() as connection:
+        rows = connection.execute(statement).rowcount
+
+    logger.info(f"Refreshed {rows} player prop aggregates for {len(game_ids)} games")
+    return rows
+
+
+def ingest_player_game_logs(df: pd.DataFrame, engine=None) -> UpsertResult:
+    """
+    Loads player game logs and refreshes the aggregates of the players in them.
+
+    Parameters:
+    df (pd.DataFrame): Player game logs, e.g. from the PlayerGameLogs endpoint. Column names are matched
+        case-insensitively and must include SEASON_YEAR and SEASON_TYPE.
+    engine (sqlalchemy.engine.Engine): The engine to use. Defaults to the shared sync engine.
+
+    Returns:
+    UpsertResult: The inserted, updated and skipped row counts of the game log load.
+    """
+    df = df.rename(columns=str.lower)
+    ensure_season_partitions(PlayerGameLog.__tablename__, df['season_year'].unique(), engine=engine)
+    result = PlayerGameLog.save_dfs(df, engine=engine, on_conflict='update')
+
+    # Unchanged rows cannot move any aggregate, so only refresh when something was written
+    if result.inserted or result.updated:
+        refresh_player_prop_aggregates(game_ids=df['game_id'].unique(), engine=engine)
+        invalidate_tags_sync(player_tag(player_id) for player_id in df['player_id'].unique())
+    return result
+
+
+async def get_player_prop(session: AsyncSession, player_id: int, stat: str,
+                          window_size: int) -> Optional[PlayerPropAggregate]:
+    """
+    Looks up one player's aggregate for a stat and window by primary key.
+
+    Parameters:
+    session (AsyncSession): The database session.
+    player_id (int): The player.
+    stat (str): The prop stat, see PROP_STATS.
+    window_size (int): The number of most recent games, see PROP_WINDOWS.
+
+    Returns:
+    Optional[PlayerPropAggregate]: The aggregate, or None if the player has no games.
+    """
+    return await session.get(PlayerPropAggregate, (player_id, stat, window_size))
+
+
+async def get_player_props(session: AsyncSession, player_id: int,
+                           stats: Optional[Sequence[str]] = None) -> List[PlayerPropAggregate]:
+    """
+    Returns every window of a player's aggregates, optionally limited to some stats.
+
+    Parameters:
+    session (AsyncSession): The database session.
+    player_id (int): The player.
+    stats (Sequence[str]): The prop stats to return. Defaults to all.
+
+    Returns:
+    List[PlayerPropAggregate]: The aggregates, ordered by stat and window.
+    """
+    statement = select(PlayerPropAggregate).where(PlayerPropAggregate.player_id == player_id)
+    if stats:
+        statement = statement.where(PlayerPropAggregate.stat.in_(list(stats)))
+    result = await session.execute(statement.order_by(PlayerPropAggregate.stat, PlayerPropAggregate.window_size))
+    return list(result.scalars())
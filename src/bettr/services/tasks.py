@@ -0,0 +1,98 @@
+"""Celery application and the long running jobs the API dispatches to it.
+
+The API only publishes tasks (delay / apply_async) and returns their id. Workers run them and keep their state and
+progress in the Redis result backend configured in base_settings, where GET /tasks/{task_id} reads it. Start a worker
+with: celery -A bettr.services.tasks worker --loglevel=info"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from celery import Celery, Task
+from celery.result import AsyncResult
+
+from bettr.config.base_settings import settings as base_settings
+from bettr.data.nba.games.games import sync_nba_game_data
+from bettr.data.nba.players import fetch_player_game_logs
+from bettr.services.player_props import ingest_player_game_logs, refresh_player_prop_aggregates
+
+
+logger = logging.getLogger(__name__)
+
+# Custom state for tasks that report how far along they are
+PROGRESS = 'PROGRESS'
+
+
+def _backend_url() -> str:
+    password = f":{base_settings.CELERY_REDIS_PASSWORD}@" if base_settings.CELERY_REDIS_PASSWORD else ''
+    return (f"redis://{password}{base_settings.CELERY_REDIS_HOST}:{base_settings.CELERY_REDIS_PORT}"
+            f"/{base_settings.CELERY_BACKEND_REDIS_DB}")
+
+
+celery_app = Celery('bettr', broker=base_settings.CELERY_BROKER_URL, backend=_backend_url())
+celery_app.conf.update(
+    task_serializer='json',
+    result_serializer='json',
+    accept_content=['json'],
+    # Report STARTED, so a queued job can be told apart from a running one
+    task_track_started=True,
+    result_extended=True,
+    result_expires=60 * 60 * 24,
+    # Jobs run for minutes: hand them out one at a time and only acknowledge them once done
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+)
+
+
+@celery_app.task
+def add(x: int, y: int) -> int:
+    return x + y
+
+
+@celery_app.task(bind=True)
+def ingest_player_game_logs_task(self: Task, seasons: Sequence[str], season_type: str = 'Regular Season') -> Dict:
+    """Pulls and loads the player game logs of the given seasons, refreshing the affected prop aggregates."""
+    totals = {'inserted': 0, 'updated': 0, 'skipped': 0}
+    for done, season in enumerate(seasons):
+        self.update_state(state=PROGRESS, meta={'current': done, 'total': len(seasons), 'season': season})
+        result = ingest_player_game_logs(fetch_player_game_logs(season, season_type))
+        for key, value in result._asdict().items():
+            totals[key] += value
+
+    return {'seasons': list(seasons), 'season_type': season_type, **totals}
+
+
+@celery_app.task(bind=True)
+def sync_team_game_logs_task(self: Task, start_year: int = 2010, season_type: str = 'Regular Season') -> Dict:
+    """Appends the team game logs played since the last sync to the Parquet dataset."""
+    self.update_state(state=PROGRESS, meta={'stage': 'sync', 'start_year': start_year})
+    new_rows = sync_nba_game_data(start_year=start_year, season_type=season_type)
+    return {'start_year': start_year, 'season_type': season_type, 'rows': len(new_rows)}
+
+
+@celery_app.task
+def refresh_player_prop_aggregates_task(game_ids: Optional[List[str]] = None,
+                                        player_ids: Optional[List[int]] = None) -> Dict:
+    """Recomputes the prop aggregates of the given games' players."""
+    return {'rows': refresh_player_prop_aggregates(game_ids=game_ids, player_ids=player_ids)}
+
+
+def task_status(task_id: str) -> Dict[str, Any]:
+    """
+    Returns the state of a task as stored in the result backend.
+
+    Parameters:
+    task_id (str): The id returned when the task was dispatched.
+
+    Returns:
+    Dict[str, Any]: The task id and state, plus the progress while running, the result once it succeeded or the error
+        once it failed. Unknown ids report PENDING, like tasks that have not been picked up yet.
+    """
+    result = AsyncResult(task_id, app=celery_app)
+    status = {'task_id': task_id, 'state': result.state}
+    if result.state == PROGRESS:
+        status['progress'] = result.info
+    elif result.successful():
+        status['result'] = result.result
+    elif result.failed():
+        status['error'] = repr(result.result)
+    return status
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+
+import pytest
+
+for module in ('pandas', 'aiohttp', 'lxml', 'dotenv', 'pydantic_settings'):
+    pytest.importorskip(module)
+
+from bettr.data.nba.games.bball_ref import DEFAULT_RETRY_AFTER, parse_retry_after  # noqa: E402
+
+NOW = datetime(2026, 10, 21, 7, 27, tzinfo=timezone.utc)
+
+
+def test_retry_after_in_seconds():
+    assert parse_retry_after('120', now=NOW) == 120
+
+
+def test_retry_after_as_an_http_date():
+    assert parse_retry_after('Wed, 21 Oct 2026 07:28:00 GMT', now=NOW) == 60
+
+
+def test_retry_after_in_the_past_does_not_wait():
+    assert parse_retry_after('Wed, 21 Oct 2026 07:00:00 GMT', now=NOW) == 0
+
+
+@pytest.mark.parametrize('value', [None, '', 'soon', '-5', '1.5e3'])
+def test_missing_or_malformed_retry_after_uses_the_default(value):
+    assert parse_retry_after(value, now=NOW) == DEFAULT_RETRY_AFTER
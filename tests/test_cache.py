@@ -0,0 +1,116 @@
+import pytest
+
+pytest.importorskip('pandas')
+for module in ('dotenv', 'pydantic_settings'):
+    pytest.importorskip(module)
+
+from bettr.data.nba import cache as cache_module  # noqa: E402
+from bettr.data.nba.cache import CacheMissError, ResponseCache, fetch_endpoint  # noqa: E402
+
+PAYLOAD = {'resultSets': [{'name': 'TeamGameLogs', 'headers': ['TEAM_ID', 'PTS'], 'rowSet': [[1, 110], [2, 98]]}]}
+
+
+class TeamGameLogs:
+    """Stands in for an nba_api endpoint class, counting how often it is called."""
+
+    calls = 0
+
+    def __init__(self, **params):
+        TeamGameLogs.calls += 1
+        self.params = params
+
+    def get_dict(self):
+        return PAYLOAD
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    TeamGameLogs.calls = 0
+
+
+def test_get_counts_misses_then_hits(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), offline=False)
+    params = {'season_nullable': '2010-11'}
+
+    assert cache.get('TeamGameLogs', params) is None
+    cache.set('TeamGameLogs', params, PAYLOAD)
+
+    assert cache.get('TeamGameLogs', params) == PAYLOAD
+    assert cache.get('TeamGameLogs', params) == PAYLOAD
+    assert cache.stats == {'hits': 2, 'misses': 1}
+
+
+def test_entries_are_keyed_by_params(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), offline=False)
+    cache.set('TeamGameLogs', {'season_nullable': '2010-11'}, PAYLOAD)
+
+    assert cache.get('TeamGameLogs', {'season_nullable': '2011-12'}) is None
+    assert cache.get('PlayerGameLogs', {'season_nullable': '2010-11'}) is None
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    cache = ResponseCache(cache_dir=str(tmp_path), offline=False)
+    now = 1_700_000_000.0
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now)
+    cache.set('TeamGameLogs', {}, PAYLOAD, ttl=60)
+
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now + 59)
+    assert cache.get('TeamGameLogs', {}) == PAYLOAD
+
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now + 61)
+    assert cache.get('TeamGameLogs', {}) is None
+    assert cache.stats == {'hits': 1, 'misses': 1}
+
+
+def test_entries_without_ttl_never_expire(tmp_path, monkeypatch):
+    cache = ResponseCache(cache_dir=str(tmp_path), offline=False)
+    cache.set('TeamGameLogs', {}, PAYLOAD, ttl=None)
+
+    monkeypatch.setattr(cache_module.time, 'time', lambda: 4_000_000_000.0)
+    assert cache.get('TeamGameLogs', {}) == PAYLOAD
+
+
+def test_fetch_endpoint_calls_the_endpoint_once(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), offline=False)
+
+    first = fetch_endpoint(TeamGameLogs, cache=cache, season_nullable='2010-11')[0]
+    second = fetch_endpoint(TeamGameLogs, cache=cache, season_nullable='2010-11')[0]
+
+    assert TeamGameLogs.calls == 1
+    assert first.equals(second)
+    assert first['PTS'].tolist() == [110, 98]
+
+
+def test_fetch_endpoint_refresh_skips_the_cache(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), offline=False)
+
+    fetch_endpoint(TeamGameLogs, cache=cache, season_nullable='2010-11')
+    fetch_endpoint(TeamGameLogs, cache=cache, refresh=True, season_nullable='2010-11')
+
+    assert TeamGameLogs.calls == 2
+
+
+@pytest.mark.parametrize('value', ['1', 'true', 'YES'])
+def test_offline_env_var_enables_offline_mode(tmp_path, monkeypatch, value):
+    monkeypatch.setenv('BETTR_NBA_CACHE_OFFLINE', value)
+
+    assert ResponseCache(cache_dir=str(tmp_path)).offline
+
+
+def test_offline_mode_raises_on_a_miss(tmp_path, monkeypatch):
+    monkeypatch.setenv('BETTR_NBA_CACHE_OFFLINE', '1')
+    cache = ResponseCache(cache_dir=str(tmp_path))
+
+    with pytest.raises(CacheMissError):
+        fetch_endpoint(TeamGameLogs, cache=cache, season_nullable='2010-11')
+    assert TeamGameLogs.calls == 0
+
+
+def test_offline_mode_serves_a_warm_cache(tmp_path, monkeypatch):
+    fetch_endpoint(TeamGameLogs, cache=ResponseCache(cache_dir=str(tmp_path), offline=False), season_nullable='2010-11')
+    monkeypatch.setenv('BETTR_NBA_CACHE_OFFLINE', '1')
+
+    df = fetch_endpoint(TeamGameLogs, cache=ResponseCache(cache_dir=str(tmp_path)), season_nullable='2010-11')[0]
+
+    assert TeamGameLogs.calls == 1
+    assert len(df) == 2
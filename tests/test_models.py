@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+for module in ('pyarrow', 'sqlmodel', 'greenlet'):
+    pytest.importorskip(module)
+
+from sqlalchemy.dialects import postgresql  # noqa: E402
+
+from bettr.models.base import restore_dtypes  # noqa: E402
+from bettr.models.nba import PlayerGameLog  # noqa: E402
+
+
+class FakeCursor:
+    """Records the statements and COPY payloads of a bulk upsert."""
+
+    def __init__(self):
+        self.statements = []
+        self.copied = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql):
+        self.statements.append(sql)
+
+    def copy_expert(self, sql, buffer):
+        self.copied.append(buffer.read())
+
+    def fetchone(self):
+        return 3, 0
+
+
+class FakeConnection:
+    """Stands in for a SQLAlchemy Connection and, as its .connection, for the driver connection."""
+
+    def __init__(self, cursor):
+        self.connection = self
+        self._cursor = cursor
+        self.committed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @contextmanager
+    def begin(self):
+        yield
+        self.committed = True
+
+    def cursor(self):
+        return self._cursor
+
+
+class FakeEngine:
+    dialect = postgresql.psycopg2.dialect()
+
+    def __init__(self):
+        self.cursor = FakeCursor()
+        self.connection = FakeConnection(self.cursor)
+
+    def connect(self):
+        return self.connection
+
+
+def _player_game_logs():
+    return pd.DataFrame({
+        'player_id': [1, 2, 3],
+        'game_id': ['0022300001'] * 3,
+        'season_year': ['2023-24'] * 3,
+        'season_type': ['Regular Season'] * 3,
+        'team_id': [1610612737] * 3,
+        'game_date': pd.to_datetime(['2023-10-25'] * 3).date,
+        'pts': [10.0, float('nan'), 5.0],
+        'plus_minus': [3.0, -2.0, 1.0],
+    })
+
+
+def test_restore_dtypes_writes_integer_columns_without_decimals():
+    df = restore_dtypes(_player_game_logs(), PlayerGameLog.model_meta.dtypes)
+
+    assert str(df['pts'].dtype) == 'Int64'
+    assert df[['player_id', 'pts', 'plus_minus']].to_csv(index=False, header=False) == '1,10,3\n2,,-2\n3,5,1\n'
+
+
+def test_restore_dtypes_rejects_fractional_integers():
+    df = _player_game_logs().assign(pts=[10.5, None, 5.0])
+
+    with pytest.raises(TypeError):
+        restore_dtypes(df, PlayerGameLog.model_meta.dtypes)
+
+
+def test_bulk_upsert_copies_nan_bearing_integer_columns_as_integers():
+    engine = FakeEngine()
+
+    result = PlayerGameLog.bulk_upsert(_player_game_logs(), engine=engine)
+
+    assert result == (3, 0, 0)
+    assert engine.connection.committed
+    rows = [line.split(',') for line in engine.cursor.copied[0].splitlines()]
+    columns = [column for column in PlayerGameLog.model_meta.columns if column in _player_game_logs().columns]
+    pts, plus_minus = columns.index('pts'), columns.index('plus_minus')
+    assert [row[pts] for row in rows] == ['10', '', '5']
+    assert [row[plus_minus] for row in rows] == ['3', '-2', '1']
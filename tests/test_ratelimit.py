@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+for module in ('starlette', 'redis', 'orjson', 'pydantic_settings'):
+    pytest.importorskip(module)
+
+from bettr.api import ratelimit  # noqa: E402
+from bettr.api.ratelimit import RateLimitMiddleware, client_ip  # noqa: E402
+from bettr.config.settings import settings  # noqa: E402
+
+NOW = 1_700_000_010.0
+
+
+class FakeCounter:
+    """Mirrors SLIDING_WINDOW_LUA for a single window, recording the cost of every check."""
+
+    def __init__(self):
+        self.count = 0
+        self.costs = []
+
+    async def __call__(self, client, rule, window_id, now, cost):
+        self.costs.append(cost)
+        if self.count + cost > rule.limit:
+            self.count += cost - 1
+            return False, self.count
+        self.count += cost
+        return True, self.count
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, 'time', lambda: NOW)
+    middleware = RateLimitMiddleware(app=None, rules={}, default=(10, 60), exempt_paths=[], local_fraction=0.5)
+    counter = FakeCounter()
+    middleware._check = counter
+    return middleware, counter
+
+
+def _hits(middleware, count):
+    return [asyncio.run(middleware.hit('ip:1.2.3.4', middleware.default)) for _ in range(count)]
+
+
+def test_local_budget_skips_redis_until_spent(limiter):
+    middleware, counter = limiter
+
+    results = _hits(middleware, 6)
+
+    # The first check leaves 9 of 10, half of which are admitted locally; the sixth request flushes them
+    assert counter.costs == [1, 5]
+    assert [remaining for _, remaining, _ in results] == [9, 8, 7, 6, 5, 4]
+    assert all(allowed for allowed, _, _ in results)
+
+
+def test_requests_over_the_limit_are_rejected(limiter):
+    middleware, counter = limiter
+
+    results = _hits(middleware, 12)
+
+    assert [allowed for allowed, _, _ in results] == [True] * 10 + [False] * 2
+    assert counter.count == 10
+
+
+def test_a_rejected_check_does_not_resend_pending_requests(limiter):
+    middleware, counter = limiter
+    counter.count = 5
+    budget_key = "default:ip:1.2.3.4"
+
+    _hits(middleware, 3)
+    assert middleware._budgets[budget_key].pending == 2
+    counter.count = 10
+
+    allowed, remaining, reset = asyncio.run(middleware.hit('ip:1.2.3.4', middleware.default))
+    assert not allowed
+    assert counter.costs[-1] == 3
+    assert counter.count == 12
+    assert middleware._budgets[budget_key].pending == 0
+
+    _hits(middleware, 2)
+    assert counter.costs[-2:] == [1, 1]
+
+
+def test_redis_errors_let_requests_through(limiter):
+    middleware, _ = limiter
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+    middleware._check = unavailable
+
+    assert asyncio.run(middleware.hit('ip:1.2.3.4', middleware.default)) == (True, 10, 30)
+
+
+def _scope(peer, forwarded=None):
+    headers = [(b'x-forwarded-for', forwarded.encode())] if forwarded else []
+    return {'type': 'http', 'client': (peer, 50000), 'headers': headers}
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers(monkeypatch):
+    monkeypatch.setattr(settings, 'LIMITER_TRUSTED_PROXIES', [])
+
+    assert client_ip(_scope('203.0.113.7', '198.51.100.1')) == '203.0.113.7'
+
+
+def test_forwarded_for_is_read_from_the_right_behind_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, 'LIMITER_TRUSTED_PROXIES', ['10.0.0.0/8'])
+
+    # The client prepended a fake hop; the first untrusted hop from the right is the real client
+    assert client_ip(_scope('10.0.0.2', '198.51.100.1, 203.0.113.7, 10.0.0.1')) == '203.0.113.7'
+    assert client_ip(_scope('10.0.0.2')) == '10.0.0.2'
@@ -0,0 +1,45 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+pa = pytest.importorskip('pyarrow')
+
+from bettr.data.nba.games.schema import GAME_LOG_SCHEMA, apply_game_log_schema, to_arrow_table  # noqa: E402
+
+
+def _game_logs(**columns):
+    frame = {
+        'SEASON_YEAR': ['2023-24'] * 3,
+        'TEAM_ID': [1610612737, 1610612738, 1610612739],
+        'GAME_ID': ['0022300001', '0022300002', '0022300003'],
+        'GAME_DATE': ['2023-10-25T00:00:00', '2023-10-26T00:00:00', '2023-10-27T00:00:00'],
+        'PTS': [110, 98, 121],
+    }
+    frame.update(columns)
+    return pd.DataFrame(frame)
+
+
+def test_ranks_above_int8_survive_the_schema():
+    df = apply_game_log_schema(_game_logs(PTS_RANK=[1200, 5, 2400]))
+
+    assert df['PTS_RANK'].tolist() == [1200, 5, 2400]
+    assert str(df['PTS_RANK'].dtype) == 'int16'
+
+
+def test_ranks_above_int8_survive_the_arrow_table():
+    table = to_arrow_table(_game_logs(PTS_RANK=[1200, 5, 2400]))
+
+    assert table.schema.field('PTS_RANK').type == pa.int16()
+    assert table['PTS_RANK'].to_pylist() == [1200, 5, 2400]
+    assert table.schema == GAME_LOG_SCHEMA
+
+
+def test_out_of_range_values_raise_instead_of_wrapping():
+    with pytest.raises(ValueError, match='PTS'):
+        apply_game_log_schema(_game_logs(PTS=[110, 40_000, 121]))
+
+
+def test_nullable_counts_use_extension_types():
+    df = apply_game_log_schema(_game_logs(PTS=[110, None, 121]))
+
+    assert str(df['PTS'].dtype) == 'Int16'
+    assert df['PTS'].isna().tolist() == [False, True, False]
@@ -0,0 +1,120 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+for module in ('nba_api', 'aiohttp', 'lxml', 'bs4', 'tqdm'):
+    pytest.importorskip(module)
+
+from bettr.data.nba.games import games  # noqa: E402
+from bettr.data.nba.games.watermarks import WatermarkStore  # noqa: E402
+from bettr.data.nba.seasons import current_season_start_year, get_seasons  # noqa: E402
+
+OPEN_SEASON = get_seasons(current_season_start_year(), current_season_start_year())[0]
+
+
+def _game_logs(rows):
+    return pd.DataFrame(rows, columns=['TEAM_ID', 'GAME_ID', 'GAME_DATE'])
+
+
+def _store(tmp_path, marks):
+    store = WatermarkStore(str(tmp_path / '_watermarks.json'))
+    store.advance(_game_logs(marks), OPEN_SEASON, 'Regular Season')
+    store.save()
+    return store
+
+
+def test_earliest_mark_is_the_oldest_team_mark(tmp_path):
+    store = _store(tmp_path, [(1, '002', '2024-11-02'), (2, '001', '2024-11-01')])
+
+    assert store.earliest_mark(OPEN_SEASON, 'Regular Season', ['1', '2']) == '2024-11-01'
+
+
+def test_earliest_mark_is_none_while_a_team_has_no_mark(tmp_path):
+    store = _store(tmp_path, [(1, '002', '2024-11-02')])
+
+    assert store.earliest_mark(OPEN_SEASON, 'Regular Season', ['1', '2']) is None
+
+
+def test_new_rows_keeps_only_games_past_each_teams_mark(tmp_path):
+    store = _store(tmp_path, [(1, '002', '2024-11-02')])
+    pulled = _game_logs([(1, '001', '2024-11-01'), (1, '002', '2024-11-02'), (1, '003', '2024-11-02'),
+                         (2, '001', '2024-11-01')])
+
+    new_rows = store.new_rows(pulled, OPEN_SEASON, 'Regular Season')
+
+    assert list(zip(new_rows['TEAM_ID'], new_rows['GAME_ID'])) == [(1, '003'), (2, '001')]
+
+
+def test_advance_never_moves_a_mark_back(tmp_path):
+    store = _store(tmp_path, [(1, '002', '2024-11-02')])
+    store.advance(_game_logs([(1, '001', '2024-11-01')]), OPEN_SEASON, 'Regular Season')
+
+    assert store.team_marks(OPEN_SEASON, 'Regular Season') == {'1': ('2024-11-02', '002')}
+
+
+@pytest.fixture
+def sync(tmp_path, monkeypatch):
+    """Runs sync_nba_game_data for the open season against a two team league, recording each pull's date_from and
+    each write."""
+    pulls, writes = [], []
+
+    def fetch(season, season_type, league_id='', team_id='', date_from=None):
+        pulls.append(date_from)
+        return _game_logs([(1, '001', '2024-11-01'), (1, '003', '2024-11-03'), (2, '002', '2024-11-02')])
+
+    def write(df, root=None, append=False):
+        writes.append((list(zip(df['TEAM_ID'], df['GAME_ID'])), append))
+
+    monkeypatch.setattr(games, '_fetch_season_game_logs', fetch)
+    monkeypatch.setattr(games, 'write_game_logs', write)
+    monkeypatch.setattr(games.teams, 'get_teams', lambda: [{'id': 1}, {'id': 2}])
+
+    def run():
+        return games.sync_nba_game_data(start_year=current_season_start_year(), root=str(tmp_path))
+
+    return pulls, writes, run
+
+
+def test_sync_pulls_the_open_season_in_full_while_a_team_has_no_mark(tmp_path, sync):
+    pulls, writes, run = sync
+    _store(tmp_path, [(1, '001', '2024-11-01')])
+
+    new_rows = run()
+
+    assert pulls == [None]
+    assert list(zip(new_rows['TEAM_ID'], new_rows['GAME_ID'])) == [(1, '003'), (2, '002')]
+    assert writes == [([(1, '001'), (1, '003'), (2, '002')], False)]
+
+
+def test_first_sync_over_an_existing_dataset_replaces_the_partition(tmp_path, sync):
+    pulls, writes, run = sync
+    # A dataset written by create_nba_parquet_dataset has partitions but no watermark file
+    assert not (tmp_path / '_watermarks.json').exists()
+
+    run()
+    run()
+
+    # The first run rewrites the whole season instead of appending it to the existing partition, the second run
+    # only appends what is new, which is nothing
+    assert pulls == [None, '2024-11-02']
+    assert writes == [([(1, '001'), (1, '003'), (2, '002')], False)]
+
+
+def test_sync_pulls_the_open_season_from_the_oldest_mark(tmp_path, sync):
+    pulls, writes, run = sync
+    _store(tmp_path, [(1, '001', '2024-11-01'), (2, '002', '2024-11-02')])
+
+    new_rows = run()
+
+    assert pulls == ['2024-11-01']
+    assert list(zip(new_rows['TEAM_ID'], new_rows['GAME_ID'])) == [(1, '003')]
+    assert writes == [([(1, '003')], True)]
+
+
+def test_sync_advances_the_marks_and_keeps_the_open_season_unfrozen(tmp_path, sync):
+    pulls, writes, run = sync
+
+    run()
+    store = WatermarkStore(str(tmp_path / '_watermarks.json'))
+
+    assert store.team_marks(OPEN_SEASON, 'Regular Season') == {'1': ('2024-11-03', '003'), '2': ('2024-11-02', '002')}
+    assert not store.is_frozen(OPEN_SEASON, 'Regular Season')